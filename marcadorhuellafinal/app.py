@@ -1,15 +1,30 @@
+import time
+
+# Inicio del proceso, para medir el arranque hasta la primera marca
+PROCESS_START = time.perf_counter()
+
 from PIL import Image, ImageTk
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 import os
-import pandas as pd
 import datetime
 import json
+import queue
+import threading
+
+# Sólo módulos livianos al importar: pandas, numpy y el SDK del lector se cargan
+# en el hilo de preparación o al abrir el panel de administración
+from monitoring.metrics import (STAGE_BOOT_FIRST_PUNCH, STAGE_BOOT_READY, STAGE_BOOT_SCREEN, STAGE_TOTAL,
+                                STAGE_UI, get_metrics)
+from sensors.capture_worker import RESULT_VERIFIED, RESULT_FAILED
+from ui.paged_table import PagedTable
 
 # Switch to light mode and blue theme
 ctk.set_appearance_mode("light")
 ctk.set_default_color_theme("blue")
 
+RECORD_TABLE_COLUMNS = ["RUT", "Nombre", "Fecha", "Hora", "Accion", "Lector"]
+
 # Data files
 ARCHIVO_USUARIOS = "data/usuarios.xlsx"
 ARCHIVO_REGISTROS = "data/registros_huellas.csv"
@@ -23,11 +38,18 @@ class RelojControlApp(ctk.CTk):
         self.title("Sistema de Reloj Control")
         self.configure_window()
         self.create_widgets()
-        self.setup_data()
         # Inicializar el sistema de detección de huellas
         self.fingerprint_scan_active = False
-        self.last_verification_time = None
         self.verification_cooldown = 3  # segundos entre verificaciones
+        self.capture_worker = None
+        self.capture_poll_interval = 100  # ms entre revisiones de la cola de resultados
+        self.after(self.capture_poll_interval, self.check_for_fingerprint)
+        # Datos, galería y lector se preparan en segundo plano con el reloj ya visible
+        self.ready = False
+        self.first_punch_shown = False
+        self.warmup_results = queue.Queue()
+        self.outbox_syncer = None
+        self.after_idle(self.start_warmup)
 
     def configure_window(self):
         """Configure main window"""
@@ -42,18 +64,22 @@ class RelojControlApp(ctk.CTk):
 
     def setup_data(self):
         """Initialize data files"""
+        import pandas as pd
         os.makedirs("data", exist_ok=True)
         if not os.path.exists(ARCHIVO_USUARIOS):
             df = pd.DataFrame(columns=["ID", "Nombre", "Rol", "Huella"])
             df.to_excel(ARCHIVO_USUARIOS, index=False)
         if not os.path.exists(ARCHIVO_REGISTROS):
-            df = pd.DataFrame(columns=["RUT", "Nombre", "Fecha", "Hora", "Accion", "Metodo"])
+            df = pd.DataFrame(columns=["RUT", "Nombre", "Fecha", "Hora", "Accion", "Metodo", "Lector"])
             df.to_csv(ARCHIVO_REGISTROS, index=False)
         if not os.path.exists(CONFIG_PATH):
             default_config = {
                 "entry_time": "08:00",
                 "exit_time": "17:00",
-                "break_duration": "60"
+                "break_duration": "60",
+                "storage_backend": "csv",
+                "reader_device": "dpfp",
+                "central_server": ""
             }
             with open(CONFIG_PATH, "w", encoding="utf-8") as f:
                 json.dump(default_config, f, indent=4)
@@ -155,7 +181,7 @@ class RelojControlApp(ctk.CTk):
 
         self.status_label = ctk.CTkLabel(
             self.center_frame,
-            text="Sistema listo - Coloque su dedo en el lector",
+            text="Preparando el sistema...",
             font=("Arial", 16),
             text_color="#2986cc"
         )
@@ -173,7 +199,8 @@ class RelojControlApp(ctk.CTk):
             fg_color="#28a745",
             hover_color="#218838",
             height=35,
-            width=150
+            width=150,
+            state="disabled"
         )
         self.scan_btn.pack(side="left", padx=10)
 
@@ -185,12 +212,65 @@ class RelojControlApp(ctk.CTk):
             fg_color="#2986cc",
             hover_color="#1a5f96",
             height=35,
-            width=150
+            width=150,
+            state="disabled"
         )
         self.admin_btn.pack(side="left", padx=10)
 
-        # Iniciar escaneo automáticamente
-        self.after(1000, self.start_fingerprint_scan)
+    def start_warmup(self):
+        """Lanza la preparación en segundo plano una vez dibujada la pantalla del reloj."""
+        self.update_idletasks()
+        get_metrics().observe(STAGE_BOOT_SCREEN, time.perf_counter() - PROCESS_START)
+        threading.Thread(target=self.warm_up, name="Warmup", daemon=True).start()
+        self.after(100, self.check_warmup)
+
+    def warm_up(self):
+        """Crea los archivos de datos y carga personal, estado de marcas, galería y lector (fuera de Tk)."""
+        try:
+            self.setup_data()
+            from database import data_handler
+            from database.punch_state import get_punch_state
+            from database.roster import get_roster
+            from sensors.template_store import get_gallery
+            from server.sync import start_outbox_sync
+            get_roster().refresh()
+            # Los meses cerrados se archivan antes de cargar las vistas derivadas
+            success, message = data_handler.archive_records()
+            if not success:
+                print(message)
+            get_punch_state()
+            get_gallery()
+            # Con servidor central, las marcas también pasan por la bandeja de salida
+            self.outbox_syncer = start_outbox_sync()
+        except Exception as e:
+            self.warmup_results.put((False, f"Error al preparar los datos: {str(e)}"))
+            return
+        # El SDK del lector se carga al final; si falla, el panel de administración sigue disponible
+        try:
+            from sensors.devices import get_readers
+            get_readers()
+            self.warmup_results.put((True, None))
+        except Exception as e:
+            self.warmup_results.put((True, f"Lector no disponible: {str(e)}"))
+
+    def check_warmup(self):
+        """Revisa si terminó la preparación y habilita el escaneo."""
+        try:
+            ok, message = self.warmup_results.get_nowait()
+        except queue.Empty:
+            self.after(100, self.check_warmup)
+            return
+        get_metrics().observe(STAGE_BOOT_READY, time.perf_counter() - PROCESS_START)
+        self.ready = True
+        self.admin_btn.configure(state="normal")
+        if not ok or message:
+            print(message)
+            self.status_label.configure(text=message, text_color="#dc3545")
+        if ok:
+            self.scan_btn.configure(state="normal")
+            if not message:
+                # Iniciar escaneo automáticamente
+                self.start_fingerprint_scan()
 
     def animate_scanning(self):
         current_text = self.scanning_label.cget("text")
@@ -214,52 +294,45 @@ class RelojControlApp(ctk.CTk):
             self.start_fingerprint_scan()
 
     def start_fingerprint_scan(self):
-        """Inicia el escaneo periódico de huellas digitales."""
+        """Inicia el escaneo de huellas digitales en el hilo de captura."""
         self.fingerprint_scan_active = True
         self.scan_btn.configure(text="Detener Escaneo", fg_color="#dc3545", hover_color="#c82333")
         self.status_label.configure(text="Escaneando... Coloque su dedo en el lector", text_color="#28a745")
-        self.check_for_fingerprint()
+        if self.capture_worker is None:
+            self.capture_worker = self.create_capture_worker()
+            self.capture_worker.start()
+        self.capture_worker.resume()
     
     def stop_fingerprint_scan(self):
-        """Detiene el escaneo periódico de huellas digitales."""
+        """Detiene el escaneo de huellas digitales."""
         self.fingerprint_scan_active = False
+        if self.capture_worker is not None:
+            self.capture_worker.pause()
         self.scan_btn.configure(text="Iniciar Escaneo", fg_color="#28a745", hover_color="#218838")
         self.status_label.configure(text="Escaneo detenido", text_color="#dc3545")
 
+    def create_capture_worker(self):
+        """Crea un hilo de captura e identificación por lector (la marca se guarda en esos hilos)."""
+        from sensors.devices import get_readers
+        from sensors.identification import verify_and_record
+        from sensors.reader_pool import ReaderPool
+        return ReaderPool(get_readers(), verify_and_record, cooldown=self.verification_cooldown)
+
     def check_for_fingerprint(self):
-        """Verifica periódicamente si hay una huella digital en el lector."""
-        if not self.fingerprint_scan_active:
-            return
-            
-        # Verificar si se ha pasado suficiente tiempo desde la última verificación
-        now = datetime.datetime.now()
-        if self.last_verification_time and (now - self.last_verification_time).total_seconds() < self.verification_cooldown:
-            # Todavía en enfriamiento, programar la próxima verificación
-            self.after(500, self.check_for_fingerprint)
-            return
-            
-        # Intentar capturar y verificar una huella
-        try:
-            from sensors.biometric import simulate_fingerprint_scan, verify_fingerprint
-            
-            # Esta función normalmente se ejecuta en un hilo separado para no bloquear la interfaz,
-            # pero para simplificar, aquí se ejecuta en el hilo principal
-            fingerprint_data = simulate_fingerprint_scan()
-            
-            if fingerprint_data:
-                self.last_verification_time = now
-                success, user_info, message = verify_fingerprint(fingerprint_data)
-                
-                if success and user_info is not None:
+        """Revisa (sin bloquear) los resultados publicados por el hilo de captura."""
+        if self.capture_worker is not None:
+            for kind, user_info, message in self.capture_worker.drain():
+                if not self.fingerprint_scan_active:
+                    continue
+                if kind == RESULT_VERIFIED:
                     self.show_user_verified(user_info)
-                else:
+                elif kind == RESULT_FAILED:
                     self.show_verification_failed(message)
-        except Exception as e:
-            print(f"Error al verificar huella: {str(e)}")
-            self.status_label.configure(text=f"Error: {str(e)}", text_color="#dc3545")
-            
-        # Programar la próxima verificación
-        self.after(500, self.check_for_fingerprint)
+                else:
+                    print(f"Error al verificar huella: {message}")
+                    self.status_label.configure(text=f"Error: {message}", text_color="#dc3545")
+
+        self.after(self.capture_poll_interval, self.check_for_fingerprint)
 
     def show_user_verified(self, user_info):
         """Muestra la información del usuario verificado."""
@@ -269,7 +342,10 @@ class RelojControlApp(ctk.CTk):
         self.user_role_label.configure(text=f"Rol: {user_info['Rol']}")
         
         now = datetime.datetime.now()
-        self.record_time_label.configure(text=f"Registro: {now.strftime('%H:%M:%S')}")
+        record_text = f"{user_info.get('Accion', 'Registro')}: {now.strftime('%H:%M:%S')}"
+        if self.capture_worker is not None and len(self.capture_worker) > 1 and user_info.get('Lector'):
+            record_text += f" - {user_info['Lector']}"
+        self.record_time_label.configure(text=record_text)
         
         # Mostrar el marco de información del usuario
         self.user_info_frame.pack(pady=20, fill="x", padx=40)
@@ -277,6 +353,18 @@ class RelojControlApp(ctk.CTk):
         # Actualizar estado
         self.status_label.configure(text="¡Usuario verificado correctamente!", text_color="#28a745")
         
+        # Tiempo hasta que el panel queda dibujado (incluye la espera en la cola de resultados)
+        timings = user_info.get('Tiempos')
+        if timings:
+            self.update_idletasks()
+            shown = time.perf_counter()
+            metrics = get_metrics()
+            metrics.observe(STAGE_UI, shown - timings["guardado"])
+            metrics.observe(STAGE_TOTAL, shown - timings.get("toque", timings["muestra"]))
+            if not self.first_punch_shown:
+                self.first_punch_shown = True
+                metrics.observe(STAGE_BOOT_FIRST_PUNCH, shown - PROCESS_START)
+
         # Ocultar la información después de un tiempo
         self.after(5000, self.hide_user_info)
         
@@ -339,6 +427,9 @@ class AdminPanel(ctk.CTkToplevel):
         self.config_tab = self.tabview.add("Configuración")
         self.setup_config_tab()
 
+        self.metrics_tab = self.tabview.add("Rendimiento")
+        self.setup_metrics_tab()
+
     def setup_user_tab(self):
         form_frame = ctk.CTkFrame(self.user_tab)
         form_frame.pack(fill="x", padx=10, pady=10)
@@ -360,14 +451,25 @@ class AdminPanel(ctk.CTkToplevel):
         ctk.CTkButton(btn_frame, text="Agregar", command=self.add_user).pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="Editar", command=self.edit_user).pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="Eliminar", command=self.delete_user).pack(side="left", padx=5)
-        ctk.CTkButton(btn_frame, text="Registrar Huella", command=self.register_fingerprint).pack(side="right", padx=5)
+        self.enroll_btn = ctk.CTkButton(btn_frame, text="Registrar Huella", command=self.register_fingerprint)
+        self.enroll_btn.pack(side="right", padx=5)
+
+        # Avance del enrolamiento (varias muestras capturadas en segundo plano)
+        self.enroll_status = ctk.CTkLabel(form_frame, text="")
+        self.enroll_status.pack(fill="x")
+        self.enroll_worker = None
+        self.enroll_poll = None
+        self.resume_kiosk = False
 
-        self.user_table_frame = ctk.CTkScrollableFrame(self.user_tab, height=300)
-        self.user_table_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        # Tabla paginada: las altas, ediciones y bajas actualizan sólo su fila
+        self.user_table = PagedTable(self.user_tab, ["ID", "Nombre", "Rol"], page_size=12,
+                                     on_select=self.select_user, fg_color="transparent")
+        self.user_table.pack(fill="both", expand=True, padx=10, pady=10)
 
         self.load_users()
 
     def setup_records_tab(self):
+        from ui.virtual_table import VirtualTable
         filter_frame = ctk.CTkFrame(self.records_tab)
         filter_frame.pack(fill="x", padx=10, pady=10)
 
@@ -385,15 +487,23 @@ class AdminPanel(ctk.CTkToplevel):
         filter_btn = ctk.CTkButton(filter_frame, text="Aplicar", width=80, command=self.filter_records)
         filter_btn.pack(side="right", padx=5)
 
-        self.records_table_frame = ctk.CTkScrollableFrame(self.records_tab, height=400)
-        self.records_table_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        # Tabla virtual: sólo crea widgets para las filas visibles
+        self.records_table = VirtualTable(self.records_tab, RECORD_TABLE_COLUMNS, fg_color="transparent")
+        self.records_table.pack(fill="both", expand=True, padx=10, pady=10)
 
         export_frame = ctk.CTkFrame(self.records_tab)
         export_frame.pack(fill="x", padx=10, pady=10)
 
-        ctk.CTkButton(export_frame, text="Exportar a Excel", command=self.export_to_excel).pack(side="left", padx=5)
+        self.export_btn = ctk.CTkButton(export_frame, text="Exportar", command=self.export_to_excel)
+        self.export_btn.pack(side="left", padx=5)
         ctk.CTkButton(export_frame, text="Generar Reporte", command=self.generate_report).pack(side="left", padx=5)
 
+        # Avance de la exportación en segundo plano (oculto hasta que se exporta)
+        self.export_progress = ctk.CTkProgressBar(export_frame, width=200)
+        self.export_progress.set(0)
+        self.export_status = ctk.CTkLabel(export_frame, text="")
+        self.export_worker = None
+
         self.load_records()
 
     def setup_config_tab(self):
@@ -427,6 +537,35 @@ class AdminPanel(ctk.CTkToplevel):
         save_btn = ctk.CTkButton(config_frame, text="Guardar Configuración", command=self.save_config)
         save_btn.pack(pady=20)
 
+    def setup_metrics_tab(self):
+        """Latencias por etapa (p50/p95/p99, en ms) y contadores del kiosko."""
+        btn_frame = ctk.CTkFrame(self.metrics_tab, fg_color="transparent")
+        btn_frame.pack(fill="x", padx=10, pady=10)
+        ctk.CTkButton(btn_frame, text="Actualizar", command=self.refresh_metrics).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="Exportar Métricas", command=self.export_metrics).pack(side="left", padx=5)
+
+        self.metrics_text = ctk.CTkTextbox(self.metrics_tab, font=("Courier", 13))
+        self.metrics_text.pack(fill="both", expand=True, padx=10, pady=10)
+        self.refresh_metrics()
+
+    def refresh_metrics(self):
+        self.metrics_text.configure(state="normal")
+        self.metrics_text.delete("1.0", "end")
+        self.metrics_text.insert("1.0", get_metrics().format_table())
+        self.metrics_text.configure(state="disabled")
+
+    def export_metrics(self):
+        try:
+            metrics_path = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json"), ("Prometheus text", "*.prom"), ("All files", "*.*")]
+            )
+            if metrics_path:
+                get_metrics().dump(metrics_path)
+                messagebox.showinfo("Métricas", f"Métricas guardadas en:\n{metrics_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron guardar las métricas: {str(e)}")
+
     def load_config(self):
         try:
             with open(CONFIG_PATH, "r", encoding="utf-8") as f:
@@ -438,107 +577,46 @@ class AdminPanel(ctk.CTkToplevel):
             messagebox.showerror("Error", f"Error al cargar configuración: {str(e)}")
 
     def load_users(self):
+        from database.roster import get_roster
         try:
-            for widget in self.user_table_frame.winfo_children():
-                widget.destroy()
-
-            df_docente = pd.read_csv(ARCHIVO_DOCENTE)
-            df_asistente = pd.read_csv(ARCHIVO_ASISTENTE)
-
-            docentes = pd.DataFrame({
-                'ID': df_docente['RUN'],
-                'Nombre': df_docente['Nombre'],
-                'Rol': 'Docente',
-                'Huella': ''
-            })
-
-            asistentes = pd.DataFrame({
-                'ID': df_asistente['RUN'],
-                'Nombre': df_asistente['Nombre'],
-                'Rol': df_asistente['Estamento'],
-                'Huella': ''
-            })
-
-            df_combined = pd.concat([docentes, asistentes], ignore_index=True)
-
-            for _, row in df_combined.iterrows():
-                user_frame = ctk.CTkFrame(self.user_table_frame, fg_color="transparent")
-                user_frame.pack(fill="x", pady=2)
-
-                ctk.CTkLabel(user_frame, text=str(row['ID'])).pack(side="left", expand=True)
-                ctk.CTkLabel(user_frame, text=str(row['Nombre'])).pack(side="left", expand=True)
-                ctk.CTkLabel(user_frame, text=str(row['Rol'])).pack(side="left", expand=True)
+            self.user_table.set_rows(
+                (user['ID'], (user['ID'], user['Nombre'], user['Rol']))
+                for user in get_roster().personnel()
+            )
 
         except Exception as e:
             messagebox.showerror("Error", f"No se pudieron cargar los usuarios: {str(e)}")
 
+    def select_user(self, user_id, values):
+        """Completa el formulario con el usuario seleccionado en la tabla."""
+        self.user_id.delete(0, 'end')
+        self.user_id.insert(0, user_id)
+        self.user_name.delete(0, 'end')
+        self.user_name.insert(0, values[1])
+
     def load_records(self):
+        from database.query import get_record_index
         try:
-            for widget in self.records_table_frame.winfo_children():
-                widget.destroy()
-
-            df = pd.read_csv(ARCHIVO_REGISTROS)
-
-            headers = ["RUT", "Nombre", "Fecha", "Hora", "Accion"]
-            header_frame = ctk.CTkFrame(self.records_table_frame, fg_color="transparent")
-            header_frame.pack(fill="x", pady=(0, 5))
-
-            for header in headers:
-                ctk.CTkLabel(header_frame, text=header, font=("Arial", 12, "bold")).pack(side="left", expand=True)
-
-            for _, row in df.iterrows():
-                record_frame = ctk.CTkFrame(self.records_table_frame, fg_color="transparent")
-                record_frame.pack(fill="x", pady=2)
-
-                ctk.CTkLabel(record_frame, text=str(row['RUT'])).pack(side="left", expand=True)
-                ctk.CTkLabel(record_frame, text=str(row['Nombre'])).pack(side="left", expand=True)
-                ctk.CTkLabel(record_frame, text=str(row['Fecha'])).pack(side="left", expand=True)
-                ctk.CTkLabel(record_frame, text=str(row['Hora'])).pack(side="left", expand=True)
-                ctk.CTkLabel(record_frame, text=str(row['Accion'])).pack(side="left", expand=True)
-
+            self.records_table.set_data(get_record_index().frame)
         except Exception as e:
             messagebox.showerror("Error", f"No se pudieron cargar los registros: {str(e)}")
 
     def filter_records(self):
+        from database.query import get_record_index
         try:
             user_filter = self.filter_user.get()
             date_from = self.filter_date_from.get()
             date_to = self.filter_date_to.get()
 
-            df = pd.read_csv(ARCHIVO_REGISTROS)
-
-            if user_filter:
-                mask = df["RUT"].str.contains(user_filter, na=False) | df["Nombre"].str.contains(user_filter, na=False)
-                df = df[mask]
-            if date_from:
-                df = df[pd.to_datetime(df["Fecha"]) >= pd.to_datetime(date_from)]
-            if date_to:
-                df = df[pd.to_datetime(df["Fecha"]) <= pd.to_datetime(date_to)]
-
-            for widget in self.records_table_frame.winfo_children():
-                widget.destroy()
-
-            headers = ["RUT", "Nombre", "Fecha", "Hora", "Accion"]
-            header_frame = ctk.CTkFrame(self.records_table_frame, fg_color="transparent")
-            header_frame.pack(fill="x", pady=(0, 5))
-
-            for header in headers:
-                ctk.CTkLabel(header_frame, text=header, font=("Arial", 12, "bold")).pack(side="left", expand=True)
-
-            for _, row in df.iterrows():
-                record_frame = ctk.CTkFrame(self.records_table_frame, fg_color="transparent")
-                record_frame.pack(fill="x", pady=2)
-
-                ctk.CTkLabel(record_frame, text=str(row['RUT'])).pack(side="left", expand=True)
-                ctk.CTkLabel(record_frame, text=str(row['Nombre'])).pack(side="left", expand=True)
-                ctk.CTkLabel(record_frame, text=str(row['Fecha'])).pack(side="left", expand=True)
-                ctk.CTkLabel(record_frame, text=str(row['Hora'])).pack(side="left", expand=True)
-                ctk.CTkLabel(record_frame, text=str(row['Accion'])).pack(side="left", expand=True)
+            # Fechas por búsqueda binaria y texto por índice de n-gramas (sin releer el archivo)
+            df = get_record_index(date_from, date_to).filter(user_filter, date_from, date_to)
+            self.records_table.set_data(df)
 
         except Exception as e:
             messagebox.showerror("Error", f"Error al filtrar registros: {str(e)}")
 
     def add_user(self):
+        from database.roster import get_roster
         user_id = self.user_id.get()
         user_name = self.user_name.get()
         user_role = self.user_role.get()
@@ -553,34 +631,14 @@ class AdminPanel(ctk.CTkToplevel):
             return
 
         try:
-            # Verificar si el usuario ya existe en los archivos CSV
-            df_docente = pd.read_csv(ARCHIVO_DOCENTE)
-            df_asistente = pd.read_csv(ARCHIVO_ASISTENTE)
-            
-            if user_id in df_docente['RUN'].values or user_id in df_asistente['RUN'].values:
+            roster = get_roster()
+            # Verificar si el usuario ya existe en los archivos de personal
+            if roster.in_personnel(user_id):
                 messagebox.showerror("Error", "El RUT ya existe en la base de datos")
                 return
 
-            # Agregar el usuario al archivo correspondiente según su rol
-            new_user = pd.DataFrame({
-                'RUN': [user_id],
-                'Nombre': [user_name],
-                'Estamento': [user_role]
-            })
-
-            if user_role == "Docente":
-                df_docente = pd.concat([df_docente, new_user[['RUN', 'Nombre']]], ignore_index=True)
-                df_docente.to_csv(ARCHIVO_DOCENTE, index=False)
-            else:
-                df_asistente = pd.concat([df_asistente, new_user], ignore_index=True)
-                df_asistente.to_csv(ARCHIVO_ASISTENTE, index=False)
-
-            # También agregar al archivo de usuarios para las huellas
-            df_usuarios = pd.read_excel(ARCHIVO_USUARIOS)
-            new_user_huella = pd.DataFrame([[user_id, user_name, user_role, ""]],
-                                         columns=["ID", "Nombre", "Rol", "Huella"])
-            df_usuarios = pd.concat([df_usuarios, new_user_huella], ignore_index=True)
-            df_usuarios.to_excel(ARCHIVO_USUARIOS, index=False)
+            # Agregar al archivo de personal según su rol y al archivo de usuarios para las huellas
+            roster.add_user(user_id, user_name, user_role)
 
             messagebox.showinfo("Éxito", "Usuario agregado correctamente")
 
@@ -588,11 +646,12 @@ class AdminPanel(ctk.CTkToplevel):
             self.user_name.delete(0, 'end')
             self.user_role.set("Docente")
 
-            self.load_users()
+            self.user_table.upsert_row(user_id, (user_id, user_name, user_role))
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo agregar el usuario: {str(e)}")
 
     def edit_user(self):
+        from database.roster import get_roster
         user_id = self.user_id.get()
         user_name = self.user_name.get()
         user_role = self.user_role.get()
@@ -602,31 +661,25 @@ class AdminPanel(ctk.CTkToplevel):
             return
 
         try:
-            df = pd.read_excel(ARCHIVO_USUARIOS)
-
-            if user_id not in df['ID'].values:
+            if not get_roster().update_user(user_id, user_name, user_role):
                 messagebox.showerror("Error", "Usuario no encontrado")
                 return
 
-            mask = df['ID'] == user_id
-            if user_name:
-                df.loc[mask, 'Nombre'] = user_name
-            if user_role:
-                df.loc[mask, 'Rol'] = user_role
-
-            df.to_excel(ARCHIVO_USUARIOS, index=False)
-
             messagebox.showinfo("Éxito", "Usuario actualizado correctamente")
 
             self.user_id.delete(0, 'end')
             self.user_name.delete(0, 'end')
             self.user_role.set("Docente")
 
-            self.load_users()
+            current = self.user_table.model.get(user_id)
+            if current is not None:
+                self.user_table.upsert_row(user_id, (user_id, user_name or current[1], user_role or current[2]))
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo actualizar el usuario: {str(e)}")
 
     def delete_user(self):
+        from database.roster import get_roster
+        from sensors.template_store import remove_template
         user_id = self.user_id.get()
 
         if not user_id:
@@ -637,15 +690,10 @@ class AdminPanel(ctk.CTkToplevel):
             return
 
         try:
-            df = pd.read_excel(ARCHIVO_USUARIOS)
-
-            if user_id not in df['ID'].values:
+            if not get_roster().delete_user(user_id):
                 messagebox.showerror("Error", "Usuario no encontrado")
                 return
-
-            df = df[df['ID'] != user_id]
-
-            df.to_excel(ARCHIVO_USUARIOS, index=False)
+            remove_template(user_id)
 
             messagebox.showinfo("Éxito", "Usuario eliminado correctamente")
 
@@ -653,84 +701,167 @@ class AdminPanel(ctk.CTkToplevel):
             self.user_name.delete(0, 'end')
             self.user_role.set("Docente")
         
-            self.load_users()
+            self.user_table.delete_row(user_id)
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo eliminar el usuario: {str(e)}")
 
     def register_fingerprint(self):
-        from sensors.biometric import register_fingerprint, simulate_fingerprint_scan
-        
+        """Enrola la huella con varias muestras capturadas en segundo plano."""
+        from database.roster import get_roster
+        from sensors.devices import capture_sample
+        from sensors.enrollment import EnrollmentWorker
+        from sensors.identification import register_fingerprint
+
+        if self.enroll_worker is not None and self.enroll_worker.is_alive():
+            return
         user_id = self.user_id.get()
         if not user_id:
             messagebox.showwarning("Advertencia", "Por favor ingrese el RUT del usuario para registrar huella")
             return
 
         try:
-            df = pd.read_excel(ARCHIVO_USUARIOS)
-            if user_id not in df['ID'].values:
+            if user_id not in get_roster():
                 messagebox.showerror("Error", "Usuario no encontrado")
                 return
 
             # Mostrar mensaje de instrucción
             messagebox.showinfo("Registro de Huella", 
-                              "Por favor, coloque su dedo en el lector de huellas cuando esté listo.")
-            
-            # Simular escaneo de huella (en un sistema real, esto se conectaría con el hardware)
-            fingerprint_data = simulate_fingerprint_scan()
-            
-            # Registrar la huella
-            success, message = register_fingerprint(user_id, fingerprint_data)
-            
-            if success:
-                messagebox.showinfo("Éxito", "Huella registrada correctamente")
-                self.load_users()
-            else:
-                messagebox.showerror("Error", message)
-                
+                              "Coloque y retire el dedo del lector varias veces hasta completar las muestras.")
+
+            # El lector se comparte con el kiosko: su captura se pausa mientras se enrola
+            capture_worker = self.parent_app.capture_worker
+            self.resume_kiosk = capture_worker is not None and capture_worker.scanning
+            if self.resume_kiosk:
+                capture_worker.pause()
+
+            # Captura con el lector configurado (DigitalPersona o simulado)
+            self.enroll_worker = EnrollmentWorker(user_id, capture_sample, register_fingerprint)
+            self.enroll_worker.start()
+            self.enroll_btn.configure(state="disabled")
+            self.enroll_status.configure(text="Esperando muestras...")
+            self.enroll_poll = self.after(100, self.check_enrollment)
         except Exception as e:
             messagebox.showerror("Error", f"Error al registrar huella: {str(e)}")
 
+    def check_enrollment(self):
+        """Muestra el avance publicado por el hilo de enrolamiento."""
+        from sensors.enrollment import ENROLL_SAMPLE, ENROLL_REJECTED, ENROLL_DONE
+        worker = self.enroll_worker
+        while not worker.messages.empty():
+            kind, accepted, detail = worker.messages.get_nowait()
+            if kind in (ENROLL_SAMPLE, ENROLL_REJECTED):
+                self.enroll_status.configure(text=detail)
+                continue
+            self.enroll_btn.configure(state="normal")
+            self.enroll_status.configure(text="")
+            self.enroll_poll = None
+            self.resume_kiosk_capture()
+            if kind == ENROLL_DONE:
+                messagebox.showinfo("Éxito", detail)
+            else:
+                messagebox.showerror("Error", detail)
+            return
+        self.enroll_poll = self.after(100, self.check_enrollment)
+
+    def resume_kiosk_capture(self):
+        """Reanuda la captura del kiosko si el enrolamiento la pausó."""
+        if self.resume_kiosk:
+            self.resume_kiosk = False
+            self.parent_app.capture_worker.resume()
+
+    def destroy(self):
+        # Cerrar el panel a mitad de un enrolamiento lo cancela y devuelve el lector al kiosko
+        if self.enroll_poll is not None:
+            self.after_cancel(self.enroll_poll)
+            self.enroll_poll = None
+        if self.enroll_worker is not None and self.enroll_worker.is_alive():
+            self.enroll_worker.cancel()
+        self.resume_kiosk_capture()
+        super().destroy()
+
     def export_to_excel(self):
+        """Exporta los registros por bloques en segundo plano (Excel, CSV o Parquet)."""
+        from database.export import ExportWorker
+        if self.export_worker is not None and self.export_worker.is_alive():
+            return
         try:
-            df = pd.read_csv(ARCHIVO_REGISTROS)
             export_path = filedialog.asksaveasfilename(
                 defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
+                filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"),
+                           ("Parquet files", "*.parquet"), ("All files", "*.*")]
             )
             if export_path:
-                df.to_excel(export_path, index=False)
-                messagebox.showinfo("Éxito", f"Registros exportados a {export_path}")
+                self.export_worker = ExportWorker(export_path)
+                self.export_worker.start()
+                self.export_btn.configure(state="disabled")
+                self.export_progress.set(0)
+                self.export_progress.pack(side="left", padx=5)
+                self.export_status.configure(text="Exportando...")
+                self.export_status.pack(side="left", padx=5)
+                self.after(100, self.check_export_progress)
         except Exception as e:
-            messagebox.showerror("Error", f"No se pudo exportar a Excel: {str(e)}")
+            messagebox.showerror("Error", f"No se pudo exportar: {str(e)}")
+
+    def check_export_progress(self):
+        """Revisa los mensajes de avance publicados por la exportación."""
+        from database.export import EXPORT_PROGRESS, EXPORT_DONE
+        worker = self.export_worker
+        while not worker.messages.empty():
+            kind, rows, detail = worker.messages.get_nowait()
+            if kind == EXPORT_PROGRESS:
+                if detail:
+                    self.export_progress.set(min(rows / detail, 1))
+                self.export_status.configure(text=f"Exportando... {rows} registros")
+                continue
+            self.export_btn.configure(state="normal")
+            self.export_progress.pack_forget()
+            self.export_status.pack_forget()
+            if kind == EXPORT_DONE:
+                messagebox.showinfo("Éxito", f"{rows} registros exportados a {detail}")
+            else:
+                messagebox.showerror("Error", f"No se pudo exportar: {detail}")
+            return
+        self.after(100, self.check_export_progress)
 
     def generate_report(self):
+        import pandas as pd
+        from database.reports import compliance_summary, load_schedule, write_report
+        from database.rollups import get_rollups
+        from database.roster import get_roster
         try:
-            df = pd.read_csv(ARCHIVO_REGISTROS)
             report_path = filedialog.asksaveasfilename(
                 defaultextension=".txt",
-                filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+                filetypes=[("Text files", "*.txt"), ("Excel files", "*.xlsx"), ("All files", "*.*")]
             )
             if report_path:
-                with open(report_path, "w", encoding="utf-8") as f:
-                    f.write("Reporte de Asistencia\n")
-                    f.write("=====================\n\n")
-                    total_records = len(df)
-                    f.write(f"Total de registros: {total_records}\n\n")
-                    roles = df['Accion'].value_counts()
-                    f.write("Resumen de acciones:\n")
-                    for accion, count in roles.items():
-                        f.write(f"  {accion}: {count}\n")
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+                personnel = pd.DataFrame(
+                    [{"RUT": user["ID"], "Horas de Contrato": user["Horas de Contrato"]}
+                     for user in get_roster().personnel()],
+                    columns=["RUT", "Horas de Contrato"])
+                # El reporte se arma desde los rollups diarios, no desde las marcas crudas
+                rollups = get_rollups()
+                daily = rollups.daily(schedule=load_schedule(config))
+                summary = compliance_summary(daily, personnel)
+                write_report(report_path, rollups.action_counts(), daily, summary)
                 messagebox.showinfo("Reporte", f"Reporte generado y guardado en:\n{report_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Error al generar reporte: {str(e)}")
 
     def save_config(self):
         try:
-            config = {
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+            except (OSError, ValueError):
+                config = {}
+            # Conservar claves adicionales (p. ej. storage_backend)
+            config.update({
                 "entry_time": self.entry_time.get(),
                 "exit_time": self.exit_time.get(),
                 "break_duration": self.break_duration.get()
-            }
+            })
             with open(CONFIG_PATH, "w", encoding="utf-8") as f:
                 json.dump(config, f, indent=4)
             messagebox.showinfo("Configuración", "Configuración guardada correctamente")
@@ -744,3 +875,5 @@ class AdminPanel(ctk.CTkToplevel):
 if __name__ == "__main__":
     app = RelojControlApp()
     app.mainloop()
+    from database import data_handler
+    data_handler.close_storage()
@@ -0,0 +1 @@
+# This file makes 'benchmarks' a Python package.
@@ -0,0 +1,92 @@
+"""Benchmark del almacén columnar: asistencia año a año desde el CSV y desde el formato columnar.
+
+Genera varios años de marcas sintéticas, las convierte con
+database.columnar y compara la consulta de asistencia por persona y año
+(días, atrasos) leyendo el CSV con pandas contra el almacén columnar
+mapeado en memoria, además de la carga completa y el tamaño en disco.
+
+Uso (desde marcadorhuellafinal/):
+    python -m benchmarks.bench_columnar [--staff 200] [--punches 2000000] [--json salida.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from benchmarks.bench_suite import _best_of
+from benchmarks.synthetic import write_dataset
+from database import columnar
+from database.reports import daily_attendance, load_schedule
+
+
+def csv_yearly_attendance(csv_path):
+    """La misma consulta que columnar.yearly_attendance, leyendo el CSV con pandas."""
+    records = pd.read_csv(csv_path, usecols=["RUT", "Nombre", "Fecha", "Hora", "Accion"])
+    daily = daily_attendance(records, load_schedule({}))
+    daily = daily[daily["primera_entrada"].notna()]
+    return daily.assign(anio=daily["primera_entrada"].dt.year).groupby(["RUT", "anio"]).agg(
+        dias=("Fecha", "size"), atrasos=("minutos_atraso", lambda s: int((s > 0).sum()))).reset_index()
+
+
+def _size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def run_columnar(staff, punches, repeat=3, seed=0):
+    tmp = tempfile.mkdtemp(prefix="bench_columnar_")
+    try:
+        write_dataset(tmp, staff, punches, seed)
+        csv_path = os.path.join(tmp, "registros_huellas.csv")
+        path = os.path.join(tmp, columnar.HISTORY_DIR)
+        results = {}
+        seconds, _ = _best_of(lambda: columnar.convert_csv(csv_path, path), 1)
+        history = columnar.load_history(path)
+        results["conversion"] = {"seconds": seconds}
+        results["bytes"] = {"csv": _size(csv_path), "columnar": _size(path)}
+        results["anios"] = sorted({history.manifest["desde"][:4], history.manifest["hasta"][:4]})
+
+        seconds, _ = _best_of(lambda: pd.read_csv(csv_path), repeat)
+        results["carga_csv"] = {"seconds": seconds}
+        # Cada repetición abre el almacén de nuevo (sin columnas ya mapeadas)
+        seconds, _ = _best_of(lambda: columnar.load_history(path).to_frame(), repeat)
+        results["carga_columnar"] = {"seconds": seconds}
+        seconds, _ = _best_of(lambda: csv_yearly_attendance(csv_path), repeat)
+        results["anual_csv"] = {"seconds": seconds}
+        seconds, yearly = _best_of(lambda: columnar.yearly_attendance(columnar.load_history(path)), repeat)
+        results["anual_columnar"] = {"seconds": seconds, "filas": len(yearly)}
+        return results
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--staff", type=int, default=200)
+    parser.add_argument("--punches", type=int, default=2_000_000, help="Marcas (200 personas: ~2500 días por millón)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Ruta donde guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    results = run_columnar(args.staff, args.punches, args.repeat, args.seed)
+    sizes = results["bytes"]
+    print(f"{args.punches} marcas de {args.staff} personas, años {'-'.join(results['anios'])}")
+    print(f"conversión            {results['conversion']['seconds']:.2f} s")
+    print(f"tamaño                CSV {sizes['csv'] / 1e6:.1f} MB, columnar {sizes['columnar'] / 1e6:.1f} MB")
+    for name in ("carga", "anual"):
+        csv_seconds, columnar_seconds = results[f"{name}_csv"]["seconds"], results[f"{name}_columnar"]["seconds"]
+        print(f"{name:<21} CSV {csv_seconds:.3f} s, columnar {columnar_seconds:.3f} s "
+              f"(x{csv_seconds / columnar_seconds:.1f})")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"parametros": vars(args), "resultados": results}, f, indent=4, ensure_ascii=False)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Benchmark del group commit de add_record: ráfaga de marcas concurrentes con y sin agrupar.
+
+Simula la llegada de las 07:55: `--threads` lectores guardan marcas a la vez
+con punch_state.record_punch (el camino del kiosko) sobre un directorio temporal, primero con un
+fsync por marca y luego con el group commit, y compara marcas por segundo y
+latencia hasta que la marca es durable. `--fsync-ms` suma una espera a cada
+fsync del diario CSV y de la bandeja para emular el disco del kiosko (en SSD
+o tmpfs el fsync casi no cuesta); SQLite sincroniza por su cuenta.
+
+Uso (desde marcadorhuellafinal/):
+    python -m benchmarks.bench_group_commit [--threads 8] [--punches 200] [--fsync-ms 5] [--backends csv sqlite] [--outbox]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from benchmarks.bench_suite import _latencies
+from benchmarks.synthetic import write_dataset
+from database import data_handler
+from database.group_commit import DEFAULT_COMMIT_DELAY
+from database.outbox import OUTBOX_FILE, PunchOutbox
+from database.punch_state import get_punch_state, record_punch
+
+# Modos comparados: nombre -> espera del group commit (None = sin agrupar)
+MODES = {
+    "sin_agrupar": None,
+    "agrupado": DEFAULT_COMMIT_DELAY,
+}
+
+
+def burst(threads, punches):
+    """`threads` hilos guardan `punches` marcas cada uno; retorna (segundos, latencias, errores)."""
+    latencies = [[] for _ in range(threads)]
+    errors = []
+    barrier = threading.Barrier(threads + 1)
+
+    def reader(index):
+        barrier.wait()
+        for i in range(punches):
+            start = time.perf_counter()
+            success, message, _ = record_punch(f"{index}-{i}", f"Persona {index}", lector=f"Lector {index}")
+            latencies[index].append(time.perf_counter() - start)
+            if not success:
+                errors.append(message)
+
+    workers = [threading.Thread(target=reader, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start, [value for values in latencies for value in values], errors
+
+
+def _slow_fsync(fsync_ms):
+    """Reemplaza os.fsync por uno que tarda `fsync_ms` milisegundos más."""
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        real_fsync(fd)
+        time.sleep(fsync_ms / 1000)
+
+    return mock.patch("os.fsync", fsync)
+
+
+def bench_mode(backend, delay, threads, punches, history, outbox, fsync_ms=0):
+    tmp = tempfile.mkdtemp(prefix="bench_group_commit_")
+    original_dir = data_handler.DATA_DIR
+    data_handler.DATA_DIR = tmp
+    data_handler.set_storage_backend(backend)
+    data_handler.set_commit_delay(delay)
+    box = None
+    try:
+        write_dataset(tmp, 50, history)
+        data_handler.count_records()
+        if outbox:
+            box = PunchOutbox(os.path.join(tmp, OUTBOX_FILE))
+            data_handler.set_outbox(box)
+        # Se abren el diario y la tabla de estado antes de medir
+        data_handler.get_storage().append_records([])
+        get_punch_state()
+        if fsync_ms:
+            with _slow_fsync(fsync_ms):
+                seconds, latencies, errors = burst(threads, punches)
+        else:
+            seconds, latencies, errors = burst(threads, punches)
+        stored = data_handler.count_records() - history
+        committer = data_handler._committer
+        return {
+            "lotes": committer.batches if committer is not None else stored,
+            "marcas": stored,
+            "errores": len(errors),
+            "segundos": seconds,
+            "marcas_por_segundo": stored / seconds,
+            "latencia": _latencies(latencies),
+        }
+    finally:
+        data_handler.set_outbox(None)
+        if box is not None:
+            box.close()
+        data_handler.close_storage()
+        data_handler.set_commit_delay(DEFAULT_COMMIT_DELAY)
+        data_handler.set_storage_backend(None)
+        data_handler.DATA_DIR = original_dir
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8, help="Lectores guardando marcas a la vez")
+    parser.add_argument("--punches", type=int, default=200, help="Marcas por lector")
+    parser.add_argument("--history", type=int, default=10_000, help="Marcas previas en el historial")
+    parser.add_argument("--fsync-ms", type=float, default=0, help="Milisegundos extra por fsync (disco lento)")
+    parser.add_argument("--backends", nargs="+", choices=sorted(data_handler.STORAGE_BACKENDS),
+                        default=sorted(data_handler.STORAGE_BACKENDS))
+    parser.add_argument("--outbox", action="store_true", help="Incluye la bandeja de salida del kiosko")
+    parser.add_argument("--json", help="Ruta donde guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for backend in args.backends:
+        for mode, delay in MODES.items():
+            result = bench_mode(backend, delay, args.threads, args.punches, args.history, args.outbox,
+                                args.fsync_ms)
+            results[f"{backend}/{mode}"] = result
+            latency = result["latencia"]
+            print(f"{backend:<7} {mode:<12} {result['marcas_por_segundo']:>9.0f} marcas/s  "
+                  f"lotes {result['lotes']:>5}  p50 {latency['p50_ms']:.2f} ms  p99 {latency['p99_ms']:.2f} ms  errores {result['errores']}")
+        base = results[f"{backend}/sin_agrupar"]["marcas_por_segundo"]
+        print(f"{backend:<7} aceleración del group commit: x{results[f'{backend}/agrupado']['marcas_por_segundo'] / base:.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"parametros": vars(args), "resultados": results}, f, indent=4, ensure_ascii=False)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Latencia de identificación 1:N según el tamaño de la galería.
+
+Uso (desde marcadorhuellafinal/):
+    python -m benchmarks.bench_identification [--sizes 100 1000 10000] [--json salida.json]
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import noisy_copy, synthetic_templates
+from sensors.matcher import FingerprintGallery
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _sequence_matcher_scan(templates, probe):
+    """Línea base: recorrido lineal con difflib.SequenceMatcher (implementación anterior)."""
+    from difflib import SequenceMatcher
+    scores = [SequenceMatcher(None, bytes(t), probe).ratio() * 100 for t in templates]
+    best = int(np.argmax(scores))
+    return best, scores[best]
+
+
+def bench_gallery(size, probes=200, noise=0.05, seed=0, baseline=False):
+    """Mide la latencia de `identify` para una galería de `size` usuarios."""
+    rng = np.random.default_rng(seed + 1)
+    templates = synthetic_templates(size, seed=seed)
+    ids = [f"U{i:06d}" for i in range(size)]
+
+    start = time.perf_counter()
+    gallery = FingerprintGallery()
+    gallery.add_many(ids, templates)
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    hits = 0
+    for _ in range(probes):
+        target = int(rng.integers(size))
+        probe = noisy_copy(templates[target], noise, rng)
+        start = time.perf_counter()
+        user_id, _ = gallery.identify(probe)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += user_id == ids[target]
+
+    result = {
+        "gallery_size": size,
+        "probes": probes,
+        "build_ms": round(build_seconds * 1000, 3),
+        "p50_ms": round(statistics.median(latencies), 4),
+        "p95_ms": round(_percentile(latencies, 95), 4),
+        "max_ms": round(max(latencies), 4),
+        "accuracy": hits / probes,
+    }
+
+    if baseline:
+        target = int(rng.integers(size))
+        probe = noisy_copy(templates[target], noise, rng)
+        start = time.perf_counter()
+        _sequence_matcher_scan(templates, probe)
+        result["sequence_matcher_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 10000])
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--baseline-max", type=int, default=200,
+                        help="Tamaño máximo de galería para medir la línea base con SequenceMatcher")
+    parser.add_argument("--json", help="Ruta donde guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'galería':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'acierto':>8} {'base ms':>10}")
+    for size in args.sizes:
+        result = bench_gallery(size, args.probes, baseline=size <= args.baseline_max)
+        results.append(result)
+        base = result.get("sequence_matcher_ms", "-")
+        print(f"{size:>8} {result['p50_ms']:>9} {result['p95_ms']:>9} {result['max_ms']:>9} "
+              f"{result['accuracy']:>8.2%} {base:>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+    return results
+
+
+if __name__ == "__main__":
+    main()
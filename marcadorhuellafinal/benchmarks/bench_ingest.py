@@ -0,0 +1,138 @@
+"""Arnés de carga del servicio central de ingesta: varios kioscos enviando marcas a la vez.
+
+Levanta el servidor en localhost sobre un directorio de datos temporal y
+simula `--kiosks` clientes que envían marcas (una por mensaje, o en lotes
+con --batch) a un ritmo dado; mide la latencia de confirmación (marca
+durable) y el rendimiento total.
+
+Uso (desde marcadorhuellafinal/):
+    python -m benchmarks.bench_ingest [--kiosks 8] [--rate 600] [--duration 20] [--json salida.json]
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.bench_suite import _latencies
+from benchmarks.synthetic import synthetic_roster, write_dataset
+from database import data_handler
+from monitoring.metrics import get_metrics
+from server.client import IngestClient
+from server.ingest import DEFAULT_BATCH_DELAY, DEFAULT_BATCH_SIZE, ServerThread
+
+
+def run_kiosk(port, kiosk, runs, rate, duration, batch, seed):
+    """Envía marcas durante `duration` segundos; retorna (latencias en segundos, marcas, errores)."""
+    rng = np.random.default_rng(seed)
+    client = IngestClient(port=port)
+    latencies, sent, errors = [], 0, 0
+    interval = 60 / rate * batch if rate else 0
+    start = time.perf_counter()
+    next_send = start
+    try:
+        while time.perf_counter() - start < duration:
+            if interval:
+                next_send += rng.exponential(interval)
+                wait = next_send - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+            now = time.localtime()
+            records = [{"RUT": runs[int(rng.integers(len(runs)))], "Nombre": "", "Fecha": time.strftime("%Y-%m-%d", now),
+                        "Hora": time.strftime("%H:%M:%S", now), "Accion": "Entrada", "Metodo": "Huella",
+                        "Lector": kiosk} for _ in range(batch)]
+            sent_at = time.perf_counter()
+            try:
+                success, _ = client.send_punches(records)
+            except OSError:
+                success = False
+            latencies.append(time.perf_counter() - sent_at)
+            if success:
+                sent += batch
+            else:
+                errors += 1
+    finally:
+        client.close()
+    return latencies, sent, errors
+
+
+def run_ingest(kiosks, rate, duration, batch=1, staff=200, server_options=None, seed=0):
+    """Ejecuta la carga contra un servidor local sobre el DATA_DIR activo; retorna los resultados."""
+    docentes, asistentes = synthetic_roster(staff, seed)
+    runs = list(docentes["RUN"]) + list(asistentes["RUN"])
+    server = ServerThread(**(server_options or {})).start()
+    results = [None] * kiosks
+
+    def kiosk(index):
+        results[index] = run_kiosk(server.port, f"Kiosco {index + 1}", runs, rate, duration, batch, seed + index)
+
+    threads = [threading.Thread(target=kiosk, args=(index,)) for index in range(kiosks)]
+    start = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.stop()
+    elapsed = time.perf_counter() - start
+    latencies = [value for result in results for value in result[0]]
+    punches = sum(result[1] for result in results)
+    return {
+        "marcas": punches,
+        "errores": sum(result[2] for result in results),
+        "segundos": elapsed,
+        "marcas_por_minuto": punches / elapsed * 60,
+        "latencia": _latencies(latencies) if latencies else {},
+        "lotes": get_metrics().snapshot()["contadores"].get("lotes_ingesta", 0),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kiosks", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=600, help="Marcas por minuto de cada kiosco (0 = sin pausa)")
+    parser.add_argument("--duration", type=float, default=20, help="Segundos de carga")
+    parser.add_argument("--batch", type=int, default=1, help="Marcas por mensaje")
+    parser.add_argument("--staff", type=int, default=200)
+    parser.add_argument("--backend", choices=sorted(data_handler.STORAGE_BACKENDS), default="csv")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Marcas máximas por escritura")
+    parser.add_argument("--batch-delay", type=float, default=DEFAULT_BATCH_DELAY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Ruta donde guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench_ingest_")
+    original_dir = data_handler.DATA_DIR
+    data_handler.DATA_DIR = tmp
+    data_handler.set_storage_backend(args.backend)
+    try:
+        write_dataset(tmp, args.staff, 0, args.seed)
+        get_metrics().reset()
+        result = run_ingest(args.kiosks, args.rate, args.duration, args.batch, args.staff,
+                            {"batch_size": args.batch_size, "batch_delay": args.batch_delay}, args.seed)
+        stored = data_handler.count_records()
+        latency = result["latencia"]
+        print(f"{result['marcas']} marcas de {args.kiosks} kioscos en {result['segundos']:.1f} s "
+              f"({result['marcas_por_minuto']:.0f}/min) en {result['lotes']} escrituras, errores {result['errores']}, "
+              f"guardadas {stored}")
+        if latency:
+            print(f"Confirmación: p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, "
+                  f"p99 {latency['p99_ms']:.1f} ms, máx {latency['max_ms']:.1f} ms")
+        result["parametros"] = vars(args)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=4, ensure_ascii=False)
+        return result
+    finally:
+        data_handler.close_storage()
+        data_handler.set_storage_backend(None)
+        data_handler.DATA_DIR = original_dir
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Arnés de carga: reproduce la hora punta de la mañana con lectores simulados.
+
+Recorre el camino completo captura → identificación → marca guardada con el
+mismo ReaderPool y la misma etapa de verificación del kiosko, sobre un
+directorio de datos temporal con personal enrolado sintético.
+
+Uso (desde marcadorhuellafinal/):
+    python -m benchmarks.bench_rush [--staff 300] [--rate 300] [--duration 60] [--json salida.json]
+    python -m benchmarks.bench_rush --readers 3 --rate 0                  (tres entradas sin pausa)
+    python -m benchmarks.bench_rush --record flujo.jsonl --samples 500   (graba un flujo)
+    python -m benchmarks.bench_rush --replay flujo.jsonl                  (lo reproduce)
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import noisy_copy, synthetic_templates, write_dataset
+from database import data_handler
+from monitoring.metrics import get_metrics
+from sensors.capture_worker import RESULT_ERROR, RESULT_FAILED, RESULT_VERIFIED
+from sensors.devices import (DEFAULT_READER_ID, ReplaySource, SimulatedReader, SyntheticSource, record_stream,
+                             set_readers)
+from sensors.reader_pool import ReaderPool
+
+
+def enroll_staff(data_dir, seed=0):
+    """Enrola un template sintético por persona del personal y retorna el almacén."""
+    from sensors.template_store import get_template_store
+    store = get_template_store()
+    runs = [user["ID"] for user in _roster_personnel()]
+    for run, template in zip(runs, synthetic_templates(len(runs), seed=seed)):
+        store.put(run, template)
+    return store
+
+
+def _roster_personnel():
+    from database.roster import get_roster
+    return get_roster().personnel()
+
+
+def run_rush(readers, duration, cooldown=0.0):
+    """Ejecuta el kiosko sin interfaz durante `duration` segundos; retorna los conteos.
+
+    `readers` es un lector o un diccionario {lector: lector simulado}.
+    """
+    from sensors.identification import verify_and_record
+
+    if not isinstance(readers, dict):
+        readers = {DEFAULT_READER_ID: readers}
+    counts = {"verificadas": 0, "rechazadas": 0, "errores": 0, "correctas": 0, "incorrectas": 0}
+    per_reader = dict.fromkeys(readers, 0)
+    counts_lock = threading.Lock()
+
+    def verify(sample, lector):
+        # Cada lector tiene su hilo: last_id aún corresponde a la muestra recién capturada
+        expected = readers[lector].last_id
+        success, user_info, message = verify_and_record(sample, lector)
+        if success and user_info is not None and expected is not None:
+            with counts_lock:
+                counts["correctas" if user_info["ID"] == expected else "incorrectas"] += 1
+        return success, user_info, message
+
+    def tally(results):
+        for kind, user_info, _ in results:
+            key = {RESULT_VERIFIED: "verificadas", RESULT_FAILED: "rechazadas", RESULT_ERROR: "errores"}[kind]
+            counts[key] += 1
+            if kind == RESULT_VERIFIED:
+                per_reader[user_info["Lector"]] += 1
+
+    pool = ReaderPool(readers, verify, cooldown=cooldown, idle_delay=0.01, error_delay=0.1)
+    set_readers(readers)
+    start = time.perf_counter()
+    pool.start()
+    pool.resume()
+    try:
+        while time.perf_counter() - start < duration:
+            time.sleep(0.1)
+            tally(pool.drain())
+    finally:
+        pool.stop()
+        for reader in readers.values():
+            reader.close()
+        pool.join(5)
+        set_readers(None)
+    tally(pool.drain())
+    counts["segundos"] = time.perf_counter() - start
+    counts["marcas_por_minuto"] = counts["verificadas"] / counts["segundos"] * 60
+    counts["por_lector"] = per_reader
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--staff", type=int, default=300)
+    parser.add_argument("--history", type=int, default=50_000, help="Marcas previas en el historial")
+    parser.add_argument("--backend", choices=sorted(data_handler.STORAGE_BACKENDS), default="csv")
+    parser.add_argument("--readers", type=int, default=1, help="Lectores (entradas) atendidos por el proceso")
+    parser.add_argument("--rate", type=float, default=300, help="Llegadas por minuto a cada lector (0 = sin pausa)")
+    parser.add_argument("--duration", type=float, default=60, help="Segundos de simulación")
+    parser.add_argument("--latency", type=float, default=0.05, help="Segundos que demora cada captura")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--quality", type=float, nargs=2, default=[85, 10], metavar=("MEDIA", "DESV"))
+    parser.add_argument("--noise", type=float, default=0.05, help="Fracción de bytes alterados por lectura")
+    parser.add_argument("--cooldown", type=float, default=0.0, help="Pausa del kiosko entre marcas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", help="Reproduce un flujo grabado en vez de generar lecturas")
+    parser.add_argument("--record", help="Graba un flujo sintético en esta ruta y termina")
+    parser.add_argument("--samples", type=int, default=500, help="Capturas a grabar con --record")
+    parser.add_argument("--json", help="Ruta donde guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench_rush_")
+    original_dir = data_handler.DATA_DIR
+    data_handler.DATA_DIR = tmp
+    data_handler.set_storage_backend(args.backend)
+    try:
+        write_dataset(tmp, args.staff, args.history, args.seed)
+        store = enroll_staff(tmp, args.seed)
+
+        if args.record:
+            rng = np.random.default_rng(args.seed + 1)
+            ids = store.ids()
+            picks = rng.integers(len(ids), size=args.samples)
+            record_stream(args.record, [(noisy_copy(np.frombuffer(store.get(ids[i]), dtype=np.uint8),
+                                                    args.noise, rng), 90, ids[i]) for i in picks])
+            print(f"{args.samples} capturas grabadas en {args.record}")
+            return None
+
+        readers = {}
+        for index in range(args.readers):
+            seed = args.seed + index
+            source = (ReplaySource(args.replay) if args.replay
+                      else SyntheticSource.from_store(store, args.noise, seed))
+            reader_id = DEFAULT_READER_ID if index == 0 else f"Entrada {index + 1}"
+            readers[reader_id] = SimulatedReader(source, rate=args.rate or None, latency=args.latency,
+                                                 jitter=args.jitter, quality=tuple(args.quality), seed=seed)
+        get_metrics().reset()
+        counts = run_rush(readers, args.duration, args.cooldown)
+        result = {"parametros": vars(args), "conteos": counts, "metricas": get_metrics().snapshot()}
+
+        print(f"{counts['verificadas']} marcas en {counts['segundos']:.1f} s "
+              f"({counts['marcas_por_minuto']:.0f}/min), rechazadas {counts['rechazadas']}, "
+              f"errores {counts['errores']}, identificaciones incorrectas {counts['incorrectas']}")
+        if len(readers) > 1:
+            print("Por lector: " + ", ".join(f"{reader_id} {count}" for reader_id, count in counts["por_lector"].items()))
+        print(get_metrics().format_table())
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=4, ensure_ascii=False)
+        return result
+    finally:
+        data_handler.close_storage()
+        data_handler.set_storage_backend(None)
+        data_handler.DATA_DIR = original_dir
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
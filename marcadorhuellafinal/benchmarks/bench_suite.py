@@ -0,0 +1,257 @@
+"""Suite de benchmarks reproducible con personal y marcas sintéticas (sin lector ni DLLs).
+
+Genera el personal en el formato de personal_docente.csv/personal_asistente.csv
+y un historial de marcas, y mide add_record, load_records, filtros, reportes,
+exportación e identificación 1:N en cada backend de almacenamiento.
+
+Uso (desde marcadorhuellafinal/):
+    python -m benchmarks.bench_suite [--scales chica mediana] [--backends csv sqlite] [--json salida.json]
+    python -m benchmarks.bench_suite --compare anterior.json nuevo.json
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_identification import bench_gallery
+from benchmarks.synthetic import write_dataset
+from database import data_handler
+
+# Escalas: (personal, marcas)
+SCALES = {
+    "chica": (100, 10_000),
+    "mediana": (1_000, 500_000),
+    "grande": (10_000, 5_000_000),
+}
+DEFAULT_SCALES = ["chica", "mediana"]
+# Sobre este tamaño no se exporta a Excel (openpyxl escribe ~50 mil filas por segundo)
+EXCEL_MAX_PUNCHES = 200_000
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _best_of(fn, repeat):
+    """Ejecuta `fn` `repeat` veces; retorna (mejor tiempo en segundos, último resultado)."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _latencies(values):
+    return {
+        "p50_ms": round(statistics.median(values) * 1000, 4),
+        "p95_ms": round(_percentile(values, 95) * 1000, 4),
+        "p99_ms": round(_percentile(values, 99) * 1000, 4),
+        "max_ms": round(max(values) * 1000, 4),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def bench_storage(data_dir, backend, punches, appends=500, repeat=3, export_dir=None):
+    """Mide las operaciones de almacenamiento, filtros, reportes y exportación sobre `data_dir`."""
+    from database.export import export_records
+    from database.query import get_record_index
+    from database.reports import build_report
+    from database.rollups import get_rollups
+    from database.roster import get_roster
+
+    results = {}
+    original_dir = data_handler.DATA_DIR
+    data_handler.DATA_DIR = data_dir
+    data_handler.set_storage_backend(backend)
+    try:
+        # La primera apertura de SQLite importa los CSV existentes
+        seconds, storage = _best_of(data_handler.get_storage, 1)
+        if backend == "sqlite":
+            results["importacion"] = {"seconds": seconds}
+
+        seconds, df = _best_of(data_handler.load_records, repeat)
+        results["load_records"] = {"seconds": seconds, "rows": len(df)}
+        last_day = df["Fecha"].max()
+        month_start = (pd.Timestamp(last_day) - pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+        rut = df["RUT"].iloc[len(df) // 2]
+        name = df["Nombre"].iloc[len(df) // 3]
+        seconds, ranged = _best_of(lambda: data_handler.load_records(month_start, last_day), repeat)
+        results["load_records_mes"] = {"seconds": seconds, "rows": len(ranged)}
+        seconds, by_rut = _best_of(lambda: data_handler.load_records(rut=rut), repeat)
+        results["load_records_rut"] = {"seconds": seconds, "rows": len(by_rut)}
+
+        seconds, index = _best_of(get_record_index, 1)
+        results["indice_registros"] = {"seconds": seconds}
+        queries = [name.split()[0].lower(), name.split()[2].lower(), rut[:5], rut]
+        times = []
+        for query in queries * 5:
+            start = time.perf_counter()
+            index.filter(query, month_start, last_day)
+            times.append(time.perf_counter() - start)
+        results["filter_records"] = _latencies(times)
+
+        personnel = pd.DataFrame([{"RUT": user["ID"], "Horas de Contrato": user["Horas de Contrato"]}
+                                  for user in get_roster().personnel()])
+        seconds, _ = _best_of(lambda: build_report(df, {}, personnel), repeat)
+        results["reporte_marcas"] = {"seconds": seconds}
+        for name_ in ("rollups_diarios.json", "estado_marcas.json"):
+            path = os.path.join(data_dir, name_)
+            if os.path.exists(path):
+                os.remove(path)
+        seconds, rollups = _best_of(get_rollups, 1)
+        results["rollups_reconstruccion"] = {"seconds": seconds}
+        seconds, _ = _best_of(rollups.daily, repeat)
+        results["reporte_rollups"] = {"seconds": seconds}
+        del df, ranged, by_rut
+
+        export_dir = export_dir or data_dir
+        formats = ["csv"]
+        if importlib.util.find_spec("pyarrow"):
+            formats.append("parquet")
+        if punches <= EXCEL_MAX_PUNCHES:
+            formats.append("xlsx")
+        for fmt in formats:
+            path = os.path.join(export_dir, f"exportacion.{fmt}")
+            seconds, rows = _best_of(lambda: export_records(path, fmt), 1)
+            results[f"exportacion_{fmt}"] = {"seconds": seconds, "rows": rows}
+            os.remove(path)
+
+        times = []
+        for i in range(appends):
+            start = time.perf_counter()
+            success, message = data_handler.add_record(rut, "BENCHMARK", "Entrada" if i % 2 else "Salida")
+            times.append(time.perf_counter() - start)
+            if not success:
+                raise RuntimeError(message)
+        results["add_record"] = _latencies(times)
+
+        if backend == "csv":
+            # Meses cerrados archivados: el último mes queda en el diario, como en el kiosko
+            seconds, _ = _best_of(lambda: data_handler.archive_records(last_day[:8] + "01"), 1)
+            results["archivado"] = {"seconds": seconds}
+            seconds, ranged = _best_of(lambda: data_handler.load_records(month_start, last_day), repeat)
+            results["load_records_mes_archivado"] = {"seconds": seconds, "rows": len(ranged)}
+            seconds, df = _best_of(data_handler.load_records, repeat)
+            results["load_records_archivado"] = {"seconds": seconds, "rows": len(df)}
+    finally:
+        data_handler.close_storage()
+        data_handler.set_storage_backend(None)
+        data_handler.DATA_DIR = original_dir
+    return results
+
+
+def run_suite(scales, backends, appends=500, probes=200, seed=0, workdir=None):
+    """Ejecuta la suite y retorna un diccionario serializable con metadatos y resultados."""
+    report = {
+        "meta": {
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "semilla": seed,
+        },
+        "resultados": [],
+    }
+    for scale in scales:
+        staff, punches = SCALES[scale]
+        base = {"escala": scale, "personal": staff, "marcas": punches}
+        print(f"== {scale}: {staff} personas, {punches} marcas", flush=True)
+
+        result = bench_gallery(staff, probes, seed=seed)
+        report["resultados"].append(dict(base, backend=None, operacion="identificacion", **result))
+        print(f"   identificación 1:N  p50 {result['p50_ms']} ms, acierto {result['accuracy']:.2%}", flush=True)
+
+        for backend in backends:
+            tmp = tempfile.mkdtemp(prefix=f"bench_{scale}_{backend}_", dir=workdir)
+            try:
+                start = time.perf_counter()
+                write_dataset(tmp, staff, punches, seed)
+                print(f"   datos sintéticos generados en {time.perf_counter() - start:.1f} s ({backend})", flush=True)
+                for operation, values in bench_storage(tmp, backend, punches, appends,
+                                                       repeat=1 if punches > 1_000_000 else 3).items():
+                    report["resultados"].append(dict(base, backend=backend, operacion=operation, **values))
+                    metric = values.get("seconds", values.get("p50_ms"))
+                    unit = "s" if "seconds" in values else "ms (p50)"
+                    print(f"   {backend:<7}{operation:<26}{metric:>12.4f} {unit}", flush=True)
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+    return report
+
+
+def _primary(result):
+    for key in ("seconds", "p50_ms"):
+        if key in result:
+            return key, result[key]
+    return None, None
+
+
+def compare(previous_path, current_path):
+    """Compara dos ejecuciones por (escala, backend, operación); retorna las filas comparadas."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {(r["escala"], r["backend"], r["operacion"]): r for r in json.load(f)["resultados"]}
+    with open(current_path, encoding="utf-8") as f:
+        current = json.load(f)["resultados"]
+    rows = []
+    print(f"{'escala':<9}{'backend':<8}{'operación':<26}{'anterior':>12}{'actual':>12}{'razón':>8}")
+    for result in current:
+        key = (result["escala"], result["backend"], result["operacion"])
+        if key not in previous:
+            continue
+        metric, value = _primary(result)
+        old = previous[key].get(metric)
+        if metric is None or not old:
+            continue
+        ratio = value / old
+        rows.append({"clave": key, "metrica": metric, "anterior": old, "actual": value, "razon": ratio})
+        print(f"{key[0]:<9}{str(key[1] or '-'):<8}{key[2]:<26}{old:>12.4f}{value:>12.4f}{ratio:>8.2f}")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=DEFAULT_SCALES)
+    parser.add_argument("--backends", nargs="+", choices=sorted(data_handler.STORAGE_BACKENDS), default=["csv"])
+    parser.add_argument("--appends", type=int, default=500, help="Marcas agregadas con add_record por escala")
+    parser.add_argument("--probes", type=int, default=200, help="Identificaciones 1:N por escala")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Directorio para los datos temporales (por defecto el del sistema)")
+    parser.add_argument("--json", help="Ruta donde guardar los resultados en JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTERIOR", "ACTUAL"),
+                        help="Compara dos archivos JSON de resultados en vez de ejecutar")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare)
+
+    report = run_suite(args.scales, args.backends, args.appends, args.probes, args.seed, args.workdir)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+    return report
+
+
+if __name__ == "__main__":
+    main()
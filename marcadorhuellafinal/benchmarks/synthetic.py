@@ -0,0 +1,128 @@
+import numpy as np
+
+TEMPLATE_SIZE = 2048
+
+
+def synthetic_templates(count, size=TEMPLATE_SIZE, seed=0):
+    """Genera una matriz (count x size) de templates aleatorios reproducibles."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(count, size), dtype=np.uint8)
+
+
+def noisy_copy(template, noise=0.05, rng=None):
+    """Simula una nueva lectura del mismo dedo alterando una fracción de los bytes."""
+    rng = rng if rng is not None else np.random.default_rng()
+    sample = np.array(template, dtype=np.uint8, copy=True)
+    positions = rng.random(sample.size) < noise
+    sample[positions] = rng.integers(0, 256, size=int(positions.sum()), dtype=np.uint8)
+    return sample.tobytes()
+
+
+_FIRST_NAMES = ["ANA", "BRAULIO", "CAROLINA", "DIEGO", "ESTEFANÍA", "FELIPE", "GLORIA", "HÉCTOR", "ISABEL",
+                "JAVIER", "KARINA", "LUIS", "MARÍA", "NICOLÁS", "OLGA", "PABLO", "ROCÍO", "SANDRA",
+                "TOMÁS", "VALENTINA"]
+_LAST_NAMES = ["ÁLVAREZ", "BARRIENTOS", "CARRASCO", "DÍAZ", "ESPINOZA", "FUENTES", "GONZÁLEZ", "HERRERA",
+               "MUÑOZ", "NÚÑEZ", "PÉREZ", "ROJAS", "SOTO", "TAPIA", "VÁSQUEZ", "ZÚÑIGA"]
+_CONTRACTS = ["Contrato Indefinido", "Contrato a Plazo Fijo", "Reemplazante"]
+_DOCENTE_FUNCTIONS = ["Docente de aula", "Planta Directiva", "Jefe Unidad Técnico Pedagógica"]
+_ASISTENTE_FUNCTIONS = ["Asistente/Técnico", "Inspector/a", "Auxiliar de Aseo", "Monitor/a Taller"]
+_ESTAMENTOS = ["Profesional", "Paradocente", "Auxiliar", "Técnico", "Administrativo"]
+
+
+def rut_check_digit(number):
+    """Dígito verificador (módulo 11) de un RUN chileno."""
+    total, factor = 0, 2
+    for digit in reversed(str(number)):
+        total += int(digit) * factor
+        factor = 2 if factor == 7 else factor + 1
+    remainder = 11 - total % 11
+    return {11: "0", 10: "K"}.get(remainder, str(remainder))
+
+
+def synthetic_roster(count, seed=0):
+    """Genera personal sintético con el formato de personal_docente.csv y personal_asistente.csv.
+
+    Retorna (docentes, asistentes) como DataFrames; cerca de la mitad es docente.
+    """
+    rng = np.random.default_rng(seed)
+    numbers = rng.choice(np.arange(5_000_000, 25_000_000), size=count, replace=False)
+    runs = [f"{n}-{rut_check_digit(n)}" for n in numbers]
+    names = [" ".join((rng.choice(_LAST_NAMES), rng.choice(_LAST_NAMES), rng.choice(_FIRST_NAMES),
+                       rng.choice(_FIRST_NAMES))) for _ in range(count)]
+    hours = rng.choice([18, 30, 38, 44], size=count)
+    contracts = rng.choice(_CONTRACTS, size=count)
+    docente = rng.random(count) < 0.5
+
+    import pandas as pd
+    docentes = pd.DataFrame({
+        "RUN": np.array(runs)[docente],
+        "Nombre": np.array(names)[docente],
+        "Función Principal": rng.choice(_DOCENTE_FUNCTIONS, size=int(docente.sum())),
+        "Tipo de Contrato": contracts[docente],
+        "Horas de Contrato": hours[docente],
+        "Título": "Titulado en Educación Básica",
+    })
+    asistentes = pd.DataFrame({
+        "RUN": np.array(runs)[~docente],
+        "Nombre": np.array(names)[~docente],
+        "Función Principal": rng.choice(_ASISTENTE_FUNCTIONS, size=int((~docente).sum())),
+        "Tipo de Contrato": contracts[~docente],
+        "Horas de Contrato": hours[~docente].astype(float),
+        "Estamento": rng.choice(_ESTAMENTOS, size=int((~docente).sum())),
+    })
+    return docentes, asistentes
+
+
+def synthetic_punches(runs, names, rows, start="2024-03-01", seed=0):
+    """Genera `rows` marcas en orden cronológico: Entrada, Colación, Entrada y Salida por día hábil.
+
+    Las horas tienen dispersión alrededor de 08:00, 13:00 (colación de 30 a
+    60 minutos) y 17:00; el resultado tiene las columnas de RECORD_COLUMNS.
+    """
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    staff = len(runs)
+    per_day = staff * 4
+    days = pd.bdate_range(start, periods=max(1, -(-rows // per_day)))
+
+    shape = (len(days), staff)
+    entry = 8 * 3600 + rng.normal(0, 600, shape)
+    lunch = 13 * 3600 + rng.normal(0, 900, shape)
+    back = lunch + rng.uniform(1800, 3600, shape)
+    leave = 17 * 3600 + rng.normal(0, 1200, shape)
+    seconds = np.stack([entry, lunch, back, leave], axis=2).clip(0, 86399).astype(np.int64)
+
+    day_index = np.broadcast_to(np.arange(len(days))[:, None, None], seconds.shape).ravel()
+    staff_index = np.broadcast_to(np.arange(staff)[None, :, None], seconds.shape).ravel()
+    action_index = np.broadcast_to(np.arange(4)[None, None, :], seconds.shape).ravel()
+    seconds = seconds.ravel()
+    order = np.lexsort((staff_index, seconds, day_index))[:rows]
+
+    runs, names = np.asarray(runs, dtype=object), np.asarray(names, dtype=object)
+    # Tabla con las 86400 horas del día ya formateadas
+    clock = np.array([f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(86400)], dtype=object)
+    return pd.DataFrame({
+        "RUT": runs[staff_index[order]],
+        "Nombre": names[staff_index[order]],
+        "Fecha": days.strftime("%Y-%m-%d").to_numpy(dtype=object)[day_index[order]],
+        "Hora": clock[seconds[order]],
+        "Accion": np.array(["Entrada", "Colación", "Entrada", "Salida"], dtype=object)[action_index[order]],
+        "Metodo": "Huella",
+        "Lector": "Principal",
+        "Clave": None,
+    })
+
+
+def write_dataset(data_dir, staff, rows, seed=0):
+    """Escribe en `data_dir` un personal y un historial de marcas sintéticos; retorna (personal, marcas)."""
+    import os
+    from database import data_handler
+    os.makedirs(data_dir, exist_ok=True)
+    docentes, asistentes = synthetic_roster(staff, seed)
+    docentes.to_csv(os.path.join(data_dir, data_handler.PERSONNEL_FILES["docente"]), index=False)
+    asistentes.to_csv(os.path.join(data_dir, data_handler.PERSONNEL_FILES["asistente"]), index=False)
+    personnel = np.concatenate([docentes["RUN"], asistentes["RUN"]])
+    names = np.concatenate([docentes["Nombre"], asistentes["Nombre"]])
+    punches = synthetic_punches(personnel, names, rows, seed=seed)
+    punches.to_csv(os.path.join(data_dir, "registros_huellas.csv"), index=False)
+    return docentes, asistentes, punches
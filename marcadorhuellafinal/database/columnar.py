@@ -0,0 +1,335 @@
+"""Almacén columnar del historial de marcas para consultas de varios años.
+
+Cada columna es un archivo binario que se abre con memoria mapeada: RUT,
+Nombre, Accion, Metodo y Lector como códigos de diccionario (int32), Fecha y
+Hora juntas como segundos int64 y Clave como texto (desplazamientos + bytes).
+Una consulta sólo abre las columnas que usa, sin volver a interpretar texto.
+
+Uso (desde marcadorhuellafinal/):
+    python -m database.columnar [--data-dir data] [--csv registros.csv] [--salida data/historico]
+"""
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from database import data_handler
+from database.reports import ENTRADA, load_schedule
+from database.storage import RECORD_COLUMNS, as_iso_date
+
+HISTORY_DIR = "historico"
+MANIFEST_FILE = "columnas.json"
+FORMAT_VERSION = 1
+
+# Columna con Fecha y Hora como segundos desde 1970-01-01 (hora local del kiosko)
+TIMESTAMP_COLUMN = "Marca"
+DICTIONARY_COLUMNS = ["RUT", "Nombre", "Accion", "Metodo", "Lector"]
+TEXT_COLUMNS = ["Clave"]
+CODE_DTYPE = np.int32
+# Marca de hora para filas con Fecha u Hora ilegibles
+NO_TIMESTAMP = np.iinfo(np.int64).min
+
+SECONDS_PER_DAY = 86400
+
+
+def _timestamps(chunk):
+    """Segundos desde 1970-01-01 de Fecha + Hora; NO_TIMESTAMP si no se pueden interpretar."""
+    stamps = pd.to_datetime(chunk["Fecha"].astype(str) + " " + chunk["Hora"].astype(str),
+                            format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    values = stamps.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    values[stamps.isna().to_numpy()] = NO_TIMESTAMP
+    return values
+
+
+def _format_stamps(stamps, date):
+    """Fecha (AAAA-MM-DD) u Hora (HH:MM:SS) de cada marca; se formatea una vez por valor distinto."""
+    days = stamps // SECONDS_PER_DAY
+    parts = days if date else stamps - days * SECONDS_PER_DAY
+    uniques, inverse = np.unique(parts, return_inverse=True)
+    if date:
+        labels = [str(day) for day in uniques.astype("datetime64[D]")]
+    else:
+        labels = [f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}" for second in uniques.tolist()]
+    labels = np.array(labels + [None], dtype=object)
+    # Las filas sin marca de hora toman el último elemento: None
+    inverse = inverse.reshape(-1)
+    inverse[stamps == NO_TIMESTAMP] = len(labels) - 1
+    return labels[inverse]
+
+
+def _to_seconds(fecha):
+    return np.datetime64(as_iso_date(fecha), "s").astype(np.int64)
+
+
+class ColumnarWriter:
+    """Escribe el almacén columnar por bloques (DataFrames) con memoria acotada.
+
+    Los archivos se escriben en un directorio temporal que reemplaza al
+    almacén anterior sólo al cerrar.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        self.rows = 0
+        self.sorted = True
+        self._last = NO_TIMESTAMP
+        self._min = None
+        self._max = None
+        self._codes = {column: {} for column in DICTIONARY_COLUMNS}
+        self._text_size = {column: 0 for column in TEXT_COLUMNS}
+        self._files = {}
+        for column in DICTIONARY_COLUMNS + [TIMESTAMP_COLUMN] + TEXT_COLUMNS:
+            self._files[column] = open(os.path.join(self.tmp_path, column + ".bin"), "wb")
+        for column in TEXT_COLUMNS:
+            self._files[column + ".offsets"] = open(os.path.join(self.tmp_path, column + ".offsets"), "wb")
+            np.zeros(1, dtype=np.int64).tofile(self._files[column + ".offsets"])
+
+    def write(self, chunk):
+        """Agrega un bloque de registros con las columnas de RECORD_COLUMNS."""
+        chunk = chunk.reindex(columns=RECORD_COLUMNS)
+        for column in DICTIONARY_COLUMNS:
+            codes, uniques = pd.factorize(chunk[column])
+            # Códigos del bloque -> códigos globales (-1 = vacío)
+            known = self._codes[column]
+            mapping = np.array([known.setdefault(str(value), len(known)) for value in uniques] + [-1],
+                               dtype=CODE_DTYPE)
+            mapping[codes].tofile(self._files[column])
+
+        stamps = _timestamps(chunk)
+        stamps.tofile(self._files[TIMESTAMP_COLUMN])
+        if len(stamps):
+            # Ordenado: las filas sin marca de hora (NO_TIMESTAMP) sólo pueden estar al inicio
+            self.sorted = self.sorted and bool(stamps[0] >= self._last and np.all(stamps[1:] >= stamps[:-1]))
+            self._last = stamps[-1]
+        valid = stamps[stamps != NO_TIMESTAMP]
+        if len(valid):
+            low, high = int(valid.min()), int(valid.max())
+            self._min = low if self._min is None else min(self._min, low)
+            self._max = high if self._max is None else max(self._max, high)
+
+        for column in TEXT_COLUMNS:
+            values = [b"" if pd.isna(value) else str(value).encode("utf-8") for value in chunk[column]]
+            lengths = np.fromiter((len(value) for value in values), dtype=np.int64, count=len(values))
+            (np.cumsum(lengths) + self._text_size[column]).tofile(self._files[column + ".offsets"])
+            self._files[column].write(b"".join(values))
+            self._text_size[column] += int(lengths.sum())
+        self.rows += len(chunk)
+
+    def _date(self, seconds):
+        if seconds is None:
+            return None
+        return str(np.datetime64(seconds, "s").astype("datetime64[D]"))
+
+    def close(self):
+        """Escribe el manifiesto y reemplaza el almacén anterior; retorna la cantidad de filas."""
+        for f in self._files.values():
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+        columns = {column: {"tipo": "diccionario", "dtype": np.dtype(CODE_DTYPE).name,
+                            "valores": list(self._codes[column])}
+                   for column in DICTIONARY_COLUMNS}
+        columns[TIMESTAMP_COLUMN] = {"tipo": "marca", "dtype": "int64"}
+        for column in TEXT_COLUMNS:
+            columns[column] = {"tipo": "texto"}
+        manifest = {"version": FORMAT_VERSION, "filas": self.rows, "ordenado": self.sorted,
+                    "desde": self._date(self._min), "hasta": self._date(self._max), "columnas": columns}
+        with open(os.path.join(self.tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.tmp_path, self.path)
+        return self.rows
+
+
+def convert_records(path, chunks):
+    """Convierte bloques de registros (DataFrames) al almacén columnar en `path`; retorna las filas escritas."""
+    writer = ColumnarWriter(path)
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+    except Exception:
+        for f in writer._files.values():
+            f.close()
+        shutil.rmtree(writer.tmp_path, ignore_errors=True)
+        raise
+    return writer.close()
+
+
+def convert_csv(csv_path, path, chunksize=200000):
+    """Convierte un CSV de registros (formato registros_huellas.csv) al almacén columnar."""
+    return convert_records(path, pd.read_csv(csv_path, chunksize=chunksize, dtype=str))
+
+
+class ColumnarRecords:
+    """Lectura del almacén columnar: cada columna se mapea en memoria sólo cuando se pide."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Versión de almacén columnar no soportada: {self.manifest.get('version')}")
+        self.rows = self.manifest["filas"]
+        self._arrays = {}
+
+    def __len__(self):
+        return self.rows
+
+    def _map(self, filename, dtype, count):
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, filename), dtype=dtype, mode="r", shape=(count,))
+
+    def codes(self, column):
+        """Códigos de diccionario de una columna (memoria mapeada; -1 = vacío)."""
+        if column not in self._arrays:
+            dtype = self.manifest["columnas"][column]["dtype"]
+            self._arrays[column] = self._map(column + ".bin", dtype, self.rows)
+        return self._arrays[column]
+
+    def dictionary(self, column):
+        """Valores distintos de una columna codificada, en el orden de sus códigos."""
+        return self.manifest["columnas"][column]["valores"]
+
+    def code_of(self, column, value):
+        """Código de un valor (-2 si no aparece, para que ninguna fila coincida)."""
+        try:
+            return self.dictionary(column).index(str(value))
+        except ValueError:
+            return -2
+
+    def timestamps(self):
+        """Segundos desde 1970-01-01 de cada marca (memoria mapeada)."""
+        if TIMESTAMP_COLUMN not in self._arrays:
+            self._arrays[TIMESTAMP_COLUMN] = self._map(TIMESTAMP_COLUMN + ".bin", np.int64, self.rows)
+        return self._arrays[TIMESTAMP_COLUMN]
+
+    def text(self, column, rows=None):
+        """Valores de una columna de texto (de todas las filas o de `rows`)."""
+        offsets = self._map(column + ".offsets", np.int64, self.rows + 1)
+        rows = np.arange(self.rows) if rows is None else np.asarray(rows)
+        if len(rows) == 0:
+            return np.empty(0, dtype=object)
+        starts, ends = offsets[rows].tolist(), offsets[rows + 1].tolist()
+        # Sólo se copia el tramo de bytes que cubre las filas pedidas
+        base = min(starts)
+        data = self._map(column + ".bin", np.uint8, int(offsets[-1]))[base:max(ends)].tobytes()
+        values = np.empty(len(rows), dtype=object)
+        values[:] = [data[start - base:end - base].decode("utf-8") or None for start, end in zip(starts, ends)]
+        return values
+
+    def date_rows(self, fecha_desde=None, fecha_hasta=None):
+        """Filas dentro del rango de fechas (inclusivo); búsqueda binaria si el almacén está ordenado."""
+        stamps = self.timestamps()
+        low = None if fecha_desde in (None, "") else _to_seconds(fecha_desde)
+        high = None if fecha_hasta in (None, "") else _to_seconds(fecha_hasta) + SECONDS_PER_DAY
+        if low is None and high is None:
+            return np.arange(self.rows)
+        if self.manifest["ordenado"]:
+            start = int(np.searchsorted(stamps, NO_TIMESTAMP if low is None else low,
+                                        "right" if low is None else "left"))
+            end = self.rows if high is None else int(np.searchsorted(stamps, high, "left"))
+            return np.arange(start, end)
+        mask = stamps != NO_TIMESTAMP
+        if low is not None:
+            mask &= stamps >= low
+        if high is not None:
+            mask &= stamps < high
+        return np.flatnonzero(mask)
+
+    def to_frame(self, columns=None, fecha_desde=None, fecha_hasta=None):
+        """Registros como DataFrame con las columnas pedidas (RECORD_COLUMNS por defecto).
+
+        Las columnas codificadas se entregan como categorías, sin crear un
+        texto por fila.
+        """
+        columns = list(columns or RECORD_COLUMNS)
+        rows = self.date_rows(fecha_desde, fecha_hasta)
+        data = {}
+        stamps = None
+        for column in columns:
+            if column in DICTIONARY_COLUMNS:
+                data[column] = pd.Categorical.from_codes(np.asarray(self.codes(column)[rows]),
+                                                         categories=pd.Index(self.dictionary(column), dtype=object))
+            elif column in TEXT_COLUMNS:
+                data[column] = self.text(column, rows)
+            elif column in ("Fecha", "Hora"):
+                if stamps is None:
+                    stamps = np.asarray(self.timestamps()[rows])
+                data[column] = _format_stamps(stamps, column == "Fecha")
+            elif column == TIMESTAMP_COLUMN:
+                data[column] = np.asarray(self.timestamps()[rows])
+            else:
+                raise KeyError(column)
+        return pd.DataFrame(data, columns=columns)
+
+
+def load_history(path=None):
+    """Abre el almacén columnar del directorio de datos (o de `path`); None si aún no se convirtió."""
+    path = path or os.path.join(data_handler.DATA_DIR, HISTORY_DIR)
+    if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return None
+    return ColumnarRecords(path)
+
+
+def yearly_attendance(history, config=None, rut=None, fecha_desde=None, fecha_hasta=None):
+    """Asistencia por persona y año: días con entrada, atrasos y minutos de atraso.
+
+    Lee sólo las columnas RUT, Accion y Marca del almacén columnar; la
+    primera Entrada de cada día define el atraso según el horario de
+    config.json (como en `reports.daily_attendance`).
+    """
+    rows = history.date_rows(fecha_desde, fecha_hasta)
+    accion = np.asarray(history.codes("Accion")[rows])
+    ruts = np.asarray(history.codes("RUT")[rows])
+    stamps = np.asarray(history.timestamps()[rows])
+    mask = (accion == history.code_of("Accion", ENTRADA)) & (stamps != NO_TIMESTAMP)
+    if rut is not None:
+        mask &= ruts == history.code_of("RUT", rut)
+    ruts, stamps = ruts[mask], stamps[mask]
+
+    days = stamps // SECONDS_PER_DAY
+    first = pd.DataFrame({"rut": ruts, "dia": days, "segundo": stamps - days * SECONDS_PER_DAY})
+    first = first.groupby(["rut", "dia"], sort=False)["segundo"].min().reset_index()
+    entry = int(load_schedule(config)["entry"].total_seconds())
+    first["anio"] = first["dia"].to_numpy().astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64) + 1970
+    first["atraso"] = ((first["segundo"] - entry) / 60).clip(lower=0).round(1)
+    yearly = first.groupby(["rut", "anio"]).agg(
+        dias=("dia", "size"),
+        atrasos=("atraso", lambda s: int((s > 0).sum())),
+        minutos_atraso=("atraso", "sum"),
+    ).reset_index()
+    # El código -1 (RUT vacío) toma el último elemento: None
+    yearly["RUT"] = np.array(history.dictionary("RUT") + [None], dtype=object)[yearly["rut"].to_numpy(dtype=np.int64)]
+    yearly["minutos_atraso"] = yearly["minutos_atraso"].round(1)
+    return yearly[["RUT", "anio", "dias", "atrasos", "minutos_atraso"]].sort_values(
+        ["RUT", "anio"], kind="stable").reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=data_handler.DATA_DIR, help="Directorio de datos del reloj")
+    parser.add_argument("--csv", help="CSV de registros a convertir (por defecto, todo el historial del backend)")
+    parser.add_argument("--salida", help="Directorio del almacén columnar (por defecto, <data-dir>/historico)")
+    args = parser.parse_args(argv)
+    data_handler.DATA_DIR = args.data_dir
+    path = args.salida or os.path.join(args.data_dir, HISTORY_DIR)
+    try:
+        if args.csv:
+            rows = convert_csv(args.csv, path)
+        else:
+            rows = convert_records(path, data_handler.iter_records(200000))
+    finally:
+        data_handler.close_storage()
+    print(f"{rows} registros convertidos a {path}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
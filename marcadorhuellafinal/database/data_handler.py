@@ -1,54 +1,241 @@
-import pandas as pd
 import os
+import datetime
+import json
+import sys
+import threading
+import uuid
+
+from database.group_commit import DEFAULT_COMMIT_DELAY, GroupCommitWriter
+from database.storage import CsvStorage, RECORD_COLUMNS
+from database.sqlite_storage import SQLiteStorage
 
 DATA_DIR = "data"
+CONFIG_FILE = "config.json"
+PERSONNEL_FILES = {
+    "docente": "personal_docente.csv",
+    "asistente": "personal_asistente.csv",
+}
+
+# Backends de almacenamiento disponibles; se elige con "storage_backend" en config.json
+STORAGE_BACKENDS = {
+    CsvStorage.name: CsvStorage,
+    SQLiteStorage.name: SQLiteStorage,
+}
+DEFAULT_BACKEND = CsvStorage.name
+
+_storage = None
+_storage_name = None
+_storage_lock = threading.Lock()
+# Vistas derivadas (JournalView) que se actualizan con cada registro anexado
+_views = []
+# Bandeja de salida hacia el servidor central (None si el kiosko trabaja solo)
+_outbox = None
+# Group commit de add_record: segundos que se esperan marcas concurrentes (None = un fsync por marca)
+_commit_delay = DEFAULT_COMMIT_DELAY
+_committer = None
+# Serializa bandeja + diario: si el diario falla, lo recién escrito en la bandeja es lo último y se puede descartar
+_punch_write_lock = threading.Lock()
+# Cambia cada vez que se reescriben los registros (las posiciones del diario dejan de servir)
+_records_generation = 0
+
+def _configured_backend():
+    """Lee el backend configurado en config.json (csv por defecto)."""
+    try:
+        with open(os.path.join(DATA_DIR, CONFIG_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("storage_backend") or DEFAULT_BACKEND
+    except (OSError, ValueError):
+        return DEFAULT_BACKEND
+
+def get_storage():
+    """Obtiene el backend de almacenamiento activo."""
+    global _storage
+    with _storage_lock:
+        if _storage is not None and _storage.data_dir == DATA_DIR:
+            return _storage
+        if _storage is not None:
+            _storage.close()
+        name = _storage_name or _configured_backend()
+        if name not in STORAGE_BACKENDS:
+            raise ValueError(f"Backend de almacenamiento desconocido: {name}")
+        _storage = STORAGE_BACKENDS[name](DATA_DIR, PERSONNEL_FILES)
+        return _storage
+
+def set_storage_backend(name):
+    """Selecciona el backend de almacenamiento ('csv' o 'sqlite'); None vuelve a config.json."""
+    global _storage_name
+    if name is not None and name not in STORAGE_BACKENDS:
+        raise ValueError(f"Backend de almacenamiento desconocido: {name}")
+    close_storage()
+    _storage_name = name
+
+def close_storage():
+    """Cierra el backend activo (se reabre en el próximo acceso) y guarda sus vistas derivadas."""
+    global _storage
+    with _storage_lock:
+        for view in _views:
+            view.save()
+        # Las vistas quedan ligadas al backend cerrado; se recrean al volver a pedirlas
+        del _views[:]
+        if _storage is not None:
+            _storage.close()
+            _storage = None
+
+def register_view(view):
+    """Registra una vista derivada para que reciba cada registro anexado."""
+    with _storage_lock:
+        if view not in _views:
+            _views.append(view)
+
+def unregister_view(view):
+    """Deja de notificar a una vista derivada."""
+    with _storage_lock:
+        if view in _views:
+            _views.remove(view)
+
+def set_outbox(outbox):
+    """Activa (o con None desactiva) la bandeja de salida de marcas hacia el servidor central."""
+    global _outbox
+    _outbox = outbox
+
+def set_commit_delay(delay):
+    """Ajusta la espera del group commit de add_record; None escribe cada marca por separado."""
+    global _commit_delay, _committer
+    with _storage_lock:
+        _commit_delay = delay
+        _committer = None
+
+def _get_committer():
+    global _committer
+    with _storage_lock:
+        if _committer is None:
+            _committer = GroupCommitWriter(_write_punches, _commit_delay)
+        return _committer
+
+def _write_punches(records):
+    """Escribe un lote de marcas en la bandeja de salida y en el diario, y avisa a las vistas en orden."""
+    with _punch_write_lock:
+        outbox = _outbox
+        if outbox is None:
+            positions = get_storage().append_records(records)
+        else:
+            # La bandeja se escribe primero (una marca confirmada siempre termina llegando al
+            # servidor), pero el sincronizador sólo la ve si también quedó en el diario
+            start = outbox.stage(records)
+            try:
+                positions = get_storage().append_records(records)
+            except Exception:
+                outbox.discard(start)
+                raise
+            outbox.publish()
+    _notify_views(records, positions)
+    return positions
 
 def load_users():
     """Carga la lista de usuarios desde el archivo."""
-    file_path = os.path.join(DATA_DIR, "usuarios.xlsx")
-    if os.path.exists(file_path):
-        df = pd.read_excel(file_path)
-        # Asegurar que la columna 'Huella' sea de tipo string para evitar incompatibilidades
-        if 'Huella' in df.columns:
-            df['Huella'] = df['Huella'].astype(str)
-        return df
-    return pd.DataFrame(columns=["ID", "Nombre", "Rol", "Huella"])
+    return get_storage().load_users()
 
 
 def save_user(df):
     """Guarda la lista de usuarios en el archivo."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    df.to_excel(os.path.join(DATA_DIR, "usuarios.xlsx"), index=False)
+    get_storage().save_user(df)
+
+def load_personnel(kind):
+    """Carga el personal 'docente' o 'asistente'."""
+    return get_storage().load_personnel(kind)
 
-def load_records():
-    """Carga los registros desde el archivo."""
-    file_path = os.path.join(DATA_DIR, "registros_huellas.csv")
-    if os.path.exists(file_path):
-        return pd.read_csv(file_path)
-    return pd.DataFrame(columns=["RUT", "Nombre", "Fecha", "Hora", "Accion", "Metodo"])
+def save_personnel(kind, df):
+    """Guarda el personal 'docente' o 'asistente'."""
+    get_storage().save_personnel(kind, df)
+
+def load_records(fecha_desde=None, fecha_hasta=None, rut=None):
+    """Carga los registros desde el archivo, opcionalmente por rango de fechas y RUT."""
+    return get_storage().load_records(fecha_desde, fecha_hasta, rut)
+
+def iter_records(chunksize=50000):
+    """Recorre los registros en bloques (DataFrames) sin cargar todo el historial."""
+    return get_storage().iter_records(chunksize)
+
+def count_records():
+    """Cuenta los registros almacenados."""
+    return get_storage().count_records()
+
+def records_generation():
+    """Contador que cambia cuando save_record o archive_records reescriben los registros."""
+    return _records_generation
 
 def save_record(df):
-    """Guarda los registros en el archivo."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    df.to_csv(os.path.join(DATA_DIR, "registros_huellas.csv"), index=False)
+    """Guarda los registros en el archivo (las vistas derivadas se reconstruyen)."""
+    global _records_generation
+    storage = get_storage()
+    storage.save_record(df)
+    _records_generation += 1
+    for view in list(_views):
+        view.rebuild(storage)
+
+def archive_records(before=None):
+    """Archiva comprimidos los meses cerrados (anteriores a `before`) y reconstruye las vistas derivadas."""
+    global _records_generation
+    try:
+        storage = get_storage()
+        archived = storage.archive_closed(before)
+    except Exception as e:
+        return False, f"Error al archivar registros: {str(e)}"
+    if archived:
+        # Las posiciones en bytes del diario cambiaron
+        _records_generation += 1
+        for view in list(_views):
+            view.rebuild(storage)
+    return True, f"{archived} registros archivados"
+
+def add_record(rut, nombre, accion, metodo="Huella", lector=None):
+    """Agrega un nuevo registro al final del diario sin releer el historial.
 
-def add_record(rut, nombre, accion, metodo="Huella"):
-    """Agrega un nuevo registro."""
+    `lector` identifica el lector (entrada) donde se hizo la marca. Cada
+    marca recibe una clave única con la que el servidor central descarta
+    los reenvíos. Las marcas concurrentes (varios lectores) se guardan
+    juntas con un solo fsync; la función retorna cuando la marca es durable.
+    """
     try:
-        current_time = pd.Timestamp.now()
+        current_time = datetime.datetime.now()
         record = {
             "RUT": rut,
             "Nombre": nombre,
-            "Fecha": current_time.date(),
+            "Fecha": current_time.strftime('%Y-%m-%d'),
             "Hora": current_time.strftime('%H:%M:%S'),
             "Accion": accion,
-            "Metodo": metodo
+            "Metodo": metodo,
+            "Lector": lector,
+            "Clave": uuid.uuid4().hex
         }
-        
-        records_df = load_records()
-        new_record = pd.DataFrame([record])
-        records_df = pd.concat([records_df, new_record], ignore_index=True)
-        save_record(records_df)
-        return True, "Registro guardado exitosamente"
+
+        if _commit_delay is not None:
+            # Las vistas se actualizan en el hilo que escribe el lote
+            _get_committer().submit(record)
+            return True, "Registro guardado exitosamente"
+        _write_punches([record])
     except Exception as e:
         return False, f"Error al guardar registro: {str(e)}"
+
+    return True, "Registro guardado exitosamente"
+
+def add_records(records):
+    """Anexa registros ya armados (p. ej. recibidos de otros kioscos) con una sola escritura."""
+    records = [{column: record.get(column) for column in RECORD_COLUMNS} for record in records]
+    if not records:
+        return True, "Sin registros que guardar"
+    try:
+        positions = get_storage().append_records(records)
+    except Exception as e:
+        return False, f"Error al guardar registros: {str(e)}"
+
+    _notify_views(records, positions)
+    return True, f"{len(records)} registros guardados"
+
+def _notify_views(records, positions):
+    # Los registros ya son durables; un error en una vista no debe anular las marcas
+    for view in list(_views):
+        for record, position in zip(records, positions):
+            try:
+                view.record_appended(record, position)
+            except Exception as e:
+                print(f"Error al actualizar vista derivada: {e}", file=sys.stderr)
@@ -0,0 +1,155 @@
+import os
+import queue
+import threading
+
+from database import data_handler
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+DEFAULT_CHUNKSIZE = 50000
+
+# Máximo de filas de datos por hoja de Excel (1.048.576 menos el encabezado)
+EXCEL_MAX_ROWS = 1048575
+
+# Tipos de mensaje publicados por ExportWorker
+EXPORT_PROGRESS = "progreso"
+EXPORT_DONE = "listo"
+EXPORT_ERROR = "error"
+
+
+def export_format(path, fmt=None):
+    """Determina el formato de exportación a partir del parámetro o de la extensión."""
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación no soportado: {fmt or '(sin extensión)'}")
+    return fmt
+
+
+class _ExcelWriter:
+    """Escritor de Excel en modo sólo escritura (memoria constante)."""
+
+    def __init__(self, path):
+        from openpyxl import Workbook
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = None
+        self.sheet_rows = 0
+        self.sheets = 0
+        self.columns = None
+
+    def _new_sheet(self):
+        self.sheets += 1
+        self.sheet = self.workbook.create_sheet("Registros" if self.sheets == 1 else f"Registros {self.sheets}")
+        self.sheet.append(self.columns)
+        self.sheet_rows = 0
+
+    def write(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self._new_sheet()
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            if self.sheet_rows >= EXCEL_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def close(self):
+        if self.sheet is None:
+            self.workbook.create_sheet("Registros")
+        self.workbook.save(self.path)
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.header = True
+
+    def write(self, chunk):
+        chunk.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Exportar a Parquet requiere el paquete 'pyarrow'")
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.writer = None
+        self.schema = None
+
+    def write(self, chunk):
+        # Todas las columnas como texto para que los bloques compartan el mismo esquema
+        if self.writer is None:
+            self.schema = self.pa.schema([(str(column), self.pa.string()) for column in chunk.columns])
+            self.writer = self.pq.ParquetWriter(self.path, self.schema, compression="snappy")
+        table = self.pa.Table.from_pandas(chunk.astype("string"), schema=self.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is None:
+            self.pq.write_table(self.pa.table({}), self.path)
+        else:
+            self.writer.close()
+
+
+_WRITERS = {"xlsx": _ExcelWriter, "csv": _CsvWriter, "parquet": _ParquetWriter}
+
+
+def export_records(path, fmt=None, chunksize=DEFAULT_CHUNKSIZE, progress=None, chunks=None):
+    """Exporta los registros por bloques a xlsx, csv o parquet sin cargar todo el historial.
+
+    `progress(filas_escritas, total)` se llama después de cada bloque. Se
+    escribe a un archivo temporal que reemplaza al destino sólo si la
+    exportación termina bien, así un error no deja un archivo a medias.
+    Retorna el número de filas exportadas.
+    """
+    fmt = export_format(path, fmt)
+    total = None
+    if chunks is None:
+        total = data_handler.count_records()
+        chunks = data_handler.iter_records(chunksize)
+    temp_path = f"{path}.tmp"
+    writer = _WRITERS[fmt](temp_path)
+    rows = 0
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+            rows += len(chunk)
+            if progress is not None:
+                progress(rows, total)
+    except Exception:
+        try:
+            writer.close()
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        raise
+    writer.close()
+    os.replace(temp_path, path)
+    return rows
+
+
+class ExportWorker(threading.Thread):
+    """Exporta en segundo plano y publica el avance en una cola para la interfaz."""
+
+    def __init__(self, path, fmt=None, chunksize=DEFAULT_CHUNKSIZE):
+        super().__init__(name="ExportWorker", daemon=True)
+        self.path = path
+        self.fmt = fmt
+        self.chunksize = chunksize
+        self.messages = queue.Queue()
+
+    def run(self):
+        try:
+            rows = export_records(self.path, self.fmt, self.chunksize,
+                                  progress=lambda done, total: self.messages.put((EXPORT_PROGRESS, done, total)))
+            self.messages.put((EXPORT_DONE, rows, self.path))
+        except Exception as e:
+            self.messages.put((EXPORT_ERROR, None, str(e)))
@@ -0,0 +1,74 @@
+import threading
+
+# Espera extra del líder para juntar marcas antes de escribir (0 = sólo las que llegan
+# mientras se escribe el lote anterior, sin sumar latencia cuando no hay ráfaga)
+DEFAULT_COMMIT_DELAY = 0
+DEFAULT_MAX_BATCH = 500
+
+
+class _Pending:
+    __slots__ = ("record", "position", "error", "done")
+
+    def __init__(self, record):
+        self.record = record
+        self.position = None
+        self.error = None
+        self.done = False
+
+
+class GroupCommitWriter:
+    """Junta las marcas que llegan a la vez en una sola escritura durable (group commit).
+
+    El primer hilo que encuentra el escritor libre es el líder: espera
+    `delay` segundos (si es mayor que 0) a que lleguen más marcas y escribe
+    todas las pendientes con
+    `write(registros)`, que debe retornar la posición de cada uno. Los demás
+    hilos esperan a que su lote quede escrito; nadie retorna antes de que su
+    marca sea durable, y si la escritura falla todos los del lote reciben el
+    error.
+    """
+
+    def __init__(self, write, delay=DEFAULT_COMMIT_DELAY, max_batch=DEFAULT_MAX_BATCH):
+        self.write = write
+        self.delay = delay
+        self.max_batch = max_batch
+        self.batches = 0
+        self.records = 0
+        self._cond = threading.Condition()
+        self._queue = []
+        self._writing = False
+
+    def submit(self, record):
+        """Escribe un registro junto con los concurrentes y retorna su posición cuando es durable."""
+        entry = _Pending(record)
+        with self._cond:
+            self._queue.append(entry)
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+            while not entry.done:
+                if self._writing:
+                    self._cond.wait()
+                    continue
+                self._writing = True
+                if self.delay and len(self._queue) < self.max_batch:
+                    self._cond.wait(self.delay)
+                batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+                self._cond.release()
+                try:
+                    positions = self.write([pending.record for pending in batch])
+                    for pending, position in zip(batch, positions):
+                        pending.position = position
+                except Exception as e:
+                    for pending in batch:
+                        pending.error = e
+                finally:
+                    self._cond.acquire()
+                    for pending in batch:
+                        pending.done = True
+                    self.batches += 1
+                    self.records += len(batch)
+                    self._writing = False
+                    self._cond.notify_all()
+        if entry.error is not None:
+            raise entry.error
+        return entry.position
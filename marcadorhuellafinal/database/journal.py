@@ -0,0 +1,152 @@
+import csv
+import io
+import os
+import shutil
+import threading
+
+
+def _format_line(fields, record):
+    """Serializa un registro como una línea CSV según el orden de columnas del archivo."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(
+        ["" if record.get(field) is None else record.get(field) for field in fields])
+    return buffer.getvalue().encode("utf-8")
+
+
+class PunchJournal:
+    """Diario de marcas de solo anexado sobre el CSV de registros.
+
+    El archivo se abre una sola vez; cada marca se escribe como una línea y
+    se sincroniza a disco con fsync, sin volver a leer el historial.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+        self.fields = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Abre el diario, creando el archivo con encabezado si no existe."""
+        with self._lock:
+            if self._file is not None:
+                return self
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.fields = self._read_header()
+            if self.fields is not None:
+                missing = [column for column in self.columns if column not in self.fields]
+                if missing:
+                    self._extend_header(missing)
+            self._file = open(self.path, "ab")
+            if self.fields is None:
+                self.fields = list(self.columns)
+                self._file.write(_format_line(self.fields, dict(zip(self.fields, self.fields))))
+                self._sync()
+            elif not self._ends_with_newline():
+                self._file.write(b"\n")
+            return self
+
+    def _read_header(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return None
+        with open(self.path, "r", encoding="utf-8-sig", newline="") as f:
+            return next(csv.reader(f), None)
+
+    def _extend_header(self, missing):
+        """Agrega columnas nuevas al encabezado; las filas antiguas quedan con esos campos vacíos."""
+        fields = self.fields + missing
+        tmp_path = self.path + ".tmp"
+        with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+            src.readline()
+            dst.write(_format_line(fields, dict(zip(fields, fields))))
+            shutil.copyfileobj(src, dst, 1 << 20)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, self.path)
+        self.fields = fields
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def position(self):
+        """Posición (en bytes) del final del diario; siempre cae al final de una línea."""
+        if self._file is None:
+            self.open()
+        with self._lock:
+            return self._file.tell()
+
+    def append(self, record):
+        """Anexa un registro y retorna la posición (en bytes) del final del diario."""
+        if self._file is None:
+            self.open()
+        line = _format_line(self.fields, record)
+        with self._lock:
+            self._file.write(line)
+            self._sync()
+            return self._file.tell()
+
+    def append_many(self, records):
+        """Anexa varios registros con una sola escritura y un fsync; retorna la posición final de cada uno."""
+        if self._file is None:
+            self.open()
+        lines = [_format_line(self.fields, record) for record in records]
+        with self._lock:
+            start = self._file.tell()
+            self._file.write(b"".join(lines))
+            self._sync()
+        positions = []
+        for line in lines:
+            start += len(line)
+            positions.append(start)
+        return positions
+
+    def extract(self, select, store):
+        """Saca del diario los registros que cumplen `select(registro)` y reescribe el archivo con el resto.
+
+        `store(columnas, filas)` recibe las columnas del diario y los pares
+        (registro, línea CSV) extraídos antes de reescribir el diario; las
+        marcas que llegan mientras tanto esperan al candado.
+        Retorna la cantidad de registros extraídos.
+        """
+        if self._file is None:
+            self.open()
+        with self._lock:
+            with open(self.path, "rb") as f:
+                header = f.readline()
+                lines = f.read().split(b"\n")[:-1]
+            keep, taken = [], []
+            for line, values in zip(lines, csv.reader(line.decode("utf-8") for line in lines)):
+                record = dict(zip(self.fields, values))
+                if values and select(record):
+                    taken.append((record, line + b"\n"))
+                else:
+                    keep.append(line + b"\n")
+            if not taken:
+                return 0
+            store(self.fields, taken)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as dst:
+                dst.write(header)
+                dst.write(b"".join(keep))
+                dst.flush()
+                os.fsync(dst.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "ab")
+            return len(taken)
+
+    def close(self):
+        """Cierra el archivo del diario."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
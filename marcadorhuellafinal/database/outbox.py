@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+
+OUTBOX_FILE = "bandeja_salida.jsonl"
+CURSOR_SUFFIX = ".pos"
+# Sobre este tamaño, y con todo confirmado, el archivo de la bandeja se vacía
+COMPACT_BYTES = 1 << 20
+
+
+class PunchOutbox:
+    """Bandeja de salida durable de las marcas que aún no llegan al servidor central.
+
+    Cada marca se anexa (con fsync) como una línea JSON que incluye su
+    clave de idempotencia; un archivo de cursor guarda hasta qué byte
+    confirmó el servidor. Reenviar después de un corte es seguro porque el
+    servidor descarta las claves que ya guardó.
+
+    `stage` escribe marcas que el sincronizador todavía no ve: se publican
+    con `publish` cuando también quedaron en el diario, o se descartan con
+    `discard` si esa escritura falló.
+    """
+
+    def __init__(self, path, compact_bytes=COMPACT_BYTES):
+        self.path = path
+        self.cursor_path = path + CURSOR_SUFFIX
+        self.compact_bytes = compact_bytes
+        self._lock = threading.Lock()
+        self._available = threading.Event()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+        # Hasta dónde puede leer el sincronizador; lo escrito con stage queda después
+        self._visible = self._file.tell()
+        self._staged = 0
+        self._cursor = self._read_cursor()
+        self._pending = sum(1 for _ in self._read_from(self._cursor))
+        if self._pending:
+            self._available.set()
+
+    def __len__(self):
+        """Marcas pendientes de confirmar."""
+        return self._pending
+
+    def _read_cursor(self):
+        try:
+            with open(self.cursor_path, "r", encoding="utf-8") as f:
+                cursor = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+        # Un cursor más allá del archivo queda de una compactación interrumpida
+        return cursor if cursor <= os.path.getsize(self.path) else 0
+
+    def _write_cursor(self, cursor):
+        tmp_path = self.cursor_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(cursor))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.cursor_path)
+
+    def _read_from(self, offset, limit=None, end=None):
+        """Registros completos desde `offset` (y antes de `end`), como pares (registro, posición siguiente)."""
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n") or (end is not None and offset + len(line) > end):
+                    break
+                offset += len(line)
+                if line.strip():
+                    yield json.loads(line), offset
+                if limit is not None:
+                    limit -= 1
+                    if limit <= 0:
+                        break
+
+    def put(self, record):
+        """Anexa una marca (debe traer su clave en "Clave") de forma durable."""
+        self.put_many([record])
+
+    def put_many(self, records):
+        """Anexa varias marcas con una sola escritura y un fsync."""
+        self.stage(records)
+        self.publish()
+
+    def stage(self, records):
+        """Anexa marcas de forma durable sin entregarlas aún al sincronizador.
+
+        Retorna la posición previa a la escritura, para `discard`. Quien
+        llama debe publicar o descartar antes de que otro hilo use `stage`.
+        """
+        data = b"".join(json.dumps(record, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+                        for record in records)
+        with self._lock:
+            start = self._file.tell()
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._staged += len(records)
+        return start
+
+    def publish(self):
+        """Entrega al sincronizador las marcas escritas con `stage`."""
+        with self._lock:
+            self._visible = self._file.tell()
+            self._pending += self._staged
+            self._staged = 0
+            if self._pending:
+                self._available.set()
+
+    def discard(self, position):
+        """Elimina las marcas escritas con `stage` desde `position` (su escritura en el diario falló)."""
+        with self._lock:
+            self._file.truncate(position)
+            self._file.seek(0, os.SEEK_END)
+            os.fsync(self._file.fileno())
+            self._staged = 0
+
+    def pending(self, limit=100):
+        """Hasta `limit` marcas pendientes y la posición a confirmar cuando el servidor las guarde."""
+        with self._lock:
+            batch = list(self._read_from(self._cursor, limit, self._visible))
+        if not batch:
+            return [], self._cursor
+        return [record for record, _ in batch], batch[-1][1]
+
+    def acknowledge(self, position, count):
+        """Marca como confirmadas las `count` marcas hasta `position` (retornada por pending)."""
+        with self._lock:
+            if position <= self._cursor:
+                return
+            self._pending = max(self._pending - count, 0)
+            if (position >= self.compact_bytes and position == self._file.tell() and not self._pending
+                    and not self._staged):
+                # El cursor vuelve a 0 antes de vaciar el archivo: un corte entre ambos sólo provoca reenvíos
+                self._write_cursor(0)
+                self._file.truncate(0)
+                self._file.seek(0)
+                self._cursor = 0
+                self._visible = 0
+            else:
+                self._write_cursor(position)
+                self._cursor = position
+            if not self._pending:
+                self._available.clear()
+
+    def wait(self, timeout=None):
+        """Espera hasta que haya marcas pendientes; retorna True si las hay."""
+        return self._available.wait(timeout)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,138 @@
+import csv
+import gzip
+import json
+import os
+import threading
+
+import pandas as pd
+
+from database.journal import _format_line
+
+ARCHIVE_DIR = "archivo"
+MANIFEST_FILE = "manifiesto.json"
+PARTITION_PATTERN = "registros_{}.csv.gz"
+COMPRESS_LEVEL = 6
+
+
+def partition_key(fecha):
+    """Partición (mes AAAA-MM) de una fecha AAAA-MM-DD."""
+    return fecha[:7]
+
+
+class PartitionArchive:
+    """Particiones mensuales cerradas del historial de marcas, comprimidas con gzip.
+
+    Cada mes archivado es un CSV comprimido con las líneas tal como estaban
+    en el diario. El manifiesto guarda por partición el archivo, las fechas mínima
+    y máxima y la cantidad de filas, de modo que las consultas por rango de
+    fechas descartan particiones sin abrirlas. `generation` aumenta cada vez
+    que se archiva o se borra el archivo: las posiciones en bytes del diario
+    cambian y las vistas derivadas deben reconstruirse.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self._lock = threading.Lock()
+        self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.generation = manifest["generacion"]
+            self.partitions = manifest["particiones"]
+        except (OSError, ValueError, KeyError):
+            self.generation = 0
+            self.partitions = {}
+
+    def _save_manifest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"generacion": self.generation, "particiones": self.partitions}, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def path(self, key):
+        return os.path.join(self.directory, self.partitions[key]["archivo"])
+
+    def count(self):
+        """Filas archivadas según el manifiesto (sin descomprimir)."""
+        return sum(entry["filas"] for entry in self.partitions.values())
+
+    def select(self, fecha_desde=None, fecha_hasta=None):
+        """Particiones (en orden) cuyo rango de fechas se cruza con el rango pedido (fechas AAAA-MM-DD)."""
+        return [key for key, entry in sorted(self.partitions.items())
+                if (fecha_desde is None or entry["hasta"] >= fecha_desde)
+                and (fecha_hasta is None or entry["desde"] <= fecha_hasta)]
+
+    def read(self, key, chunksize=None):
+        """Lee una partición como DataFrame (o iterador de bloques si se indica `chunksize`)."""
+        return pd.read_csv(self.path(key), chunksize=chunksize)
+
+    def records(self, key):
+        """Recorre los registros de una partición como diccionarios de texto."""
+        with gzip.open(self.path(key), "rt", encoding="utf-8", newline="") as f:
+            for record in csv.DictReader(f):
+                yield record
+
+    def store(self, fields, rows, fecha_of):
+        """Archiva pares (registro, línea CSV con columnas `fields`) agrupados por mes.
+
+        `fecha_of(registro)` da la fecha AAAA-MM-DD de cada registro.
+        """
+        groups = {}
+        for record, line in rows:
+            fecha = fecha_of(record)
+            groups.setdefault(partition_key(fecha), []).append((fecha, line))
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            for key, group in sorted(groups.items()):
+                self._write_partition(key, fields, group)
+            self.generation += 1
+            self._save_manifest()
+
+    def _read_lines(self, key, fields):
+        """Líneas de una partición, reescritas con `fields` si sus columnas son otras."""
+        with gzip.open(self.path(key), "rb") as f:
+            header = next(csv.reader([f.readline().decode("utf-8-sig")]), [])
+            if header == list(fields):
+                return [line + b"\n" for line in f.read().split(b"\n")[:-1]]
+        return [_format_line(fields, record) for record in self.records(key)]
+
+    def _write_partition(self, key, fields, rows):
+        entry = self.partitions.get(key)
+        lines, fechas = [], [fecha for fecha, _ in rows]
+        if entry is not None:
+            lines = self._read_lines(key, fields)
+            fechas += [entry["desde"], entry["hasta"]]
+        # Una archivación interrumpida puede haber dejado las filas en el diario y en la partición
+        existing = set(lines)
+        lines += [line for _, line in rows if line not in existing]
+
+        filename = PARTITION_PATTERN.format(key)
+        path = os.path.join(self.directory, filename)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as raw:
+            with gzip.GzipFile(filename=filename, mode="wb", fileobj=raw, compresslevel=COMPRESS_LEVEL) as f:
+                f.write(_format_line(fields, dict(zip(fields, fields))))
+                f.write(b"".join(lines))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+        self.partitions[key] = {"archivo": filename, "desde": min(fechas), "hasta": max(fechas),
+                                "filas": len(lines), "bytes": os.path.getsize(path)}
+
+    def clear(self):
+        """Borra todas las particiones archivadas."""
+        with self._lock:
+            for key in list(self.partitions):
+                try:
+                    os.remove(self.path(key))
+                except OSError:
+                    pass
+            self.partitions = {}
+            self.generation += 1
+            self._save_manifest()
@@ -0,0 +1,77 @@
+import datetime
+import os
+import threading
+
+from database.storage import as_iso_date
+from database.views import JournalView, attach_view
+
+KEYS_FILE = "claves_marcas.json"
+# Días de claves que se recuerdan; un kiosko que pase más tiempo sin conexión podría duplicar marcas
+DEFAULT_RETENTION_DAYS = 60
+
+
+class PunchKeys(JournalView):
+    """Claves de idempotencia de las marcas ya guardadas, para descartar reenvíos de los kioscos.
+
+    Se mantiene con cada marca anexada como las demás vistas del diario y
+    olvida las claves con fecha anterior a `retention_days` días antes de la
+    marca más reciente.
+    """
+
+    def __init__(self, path, retention_days=DEFAULT_RETENTION_DAYS, save_every=200):
+        self.retention_days = retention_days
+        super().__init__(path, save_every)
+
+    def reset(self):
+        self._keys = {}
+        self._newest = ""
+        self._pruned = ""
+
+    def apply(self, record):
+        key = record.get("Clave")
+        if not key or not isinstance(key, str):
+            return
+        try:
+            fecha = as_iso_date(record.get("Fecha"))
+        except (ValueError, TypeError):
+            fecha = self._newest
+        self._keys[key] = fecha
+        if fecha > self._newest:
+            self._newest = fecha
+            self._prune()
+
+    def _prune(self):
+        # Una vez por día nuevo: se descartan las claves fuera de la ventana de retención
+        cutoff = (datetime.date.fromisoformat(self._newest)
+                  - datetime.timedelta(days=self.retention_days)).isoformat()
+        if cutoff <= self._pruned:
+            return
+        self._keys = {key: fecha for key, fecha in self._keys.items() if fecha >= cutoff}
+        self._pruned = cutoff
+
+    def state(self):
+        return {"claves": self._keys, "reciente": self._newest, "depurado": self._pruned}
+
+    def restore(self, state):
+        self._keys = dict(state["claves"])
+        self._newest = state["reciente"]
+        self._pruned = state["depurado"]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+_punch_keys = None
+_keys_lock = threading.Lock()
+
+
+def get_punch_keys():
+    """Claves de las marcas guardadas en el backend activo; se reconstruyen desde el diario la primera vez."""
+    global _punch_keys
+    with _keys_lock:
+        _punch_keys = attach_view(_punch_keys, lambda storage: PunchKeys(os.path.join(storage.data_dir, KEYS_FILE)))
+        return _punch_keys
@@ -0,0 +1,94 @@
+import datetime
+import os
+import threading
+
+from database import data_handler
+from database.reports import COLACION, ENTRADA, SALIDA
+from database.storage import as_iso_date
+from database.views import JournalView, attach_view
+
+STATE_FILE = "estado_marcas.json"
+
+# Posiciones dentro del estado de cada persona
+_ACCION, _FECHA, _HORA, _COLACION = range(4)
+
+
+def next_action(last_action, break_taken):
+    """Siguiente acción del ciclo Entrada → Colación → Entrada (regreso) → Salida."""
+    if last_action == ENTRADA:
+        return SALIDA if break_taken else COLACION
+    if last_action == COLACION:
+        return ENTRADA
+    return ENTRADA
+
+
+class PunchStateTable(JournalView):
+    """Última marca de cada persona (acción, fecha y hora) para decidir la siguiente.
+
+    Reemplaza la relectura del historial completo por una búsqueda en un
+    diccionario. La primera marca de cada día siempre es Entrada.
+    """
+
+    def reset(self):
+        self._users = {}
+
+    def apply(self, record):
+        accion = record.get("Accion")
+        if accion not in (ENTRADA, COLACION, SALIDA):
+            return
+        try:
+            fecha = as_iso_date(record.get("Fecha"))
+        except (ValueError, TypeError):
+            return
+        rut = str(record.get("RUT"))
+        state = self._users.get(rut)
+        break_taken = state is not None and state[_FECHA] == fecha and state[_COLACION]
+        self._users[rut] = [accion, fecha, str(record.get("Hora")), break_taken or accion == COLACION]
+
+    def state(self):
+        return self._users
+
+    def restore(self, state):
+        self._users = dict(state)
+
+    def last(self, rut):
+        """Última marca de la persona como (acción, 'AAAA-MM-DD HH:MM:SS'), o None."""
+        with self._lock:
+            state = self._users.get(str(rut))
+            return None if state is None else (state[_ACCION], f"{state[_FECHA]} {state[_HORA]}")
+
+    def next_action(self, rut, now=None):
+        """Acción que corresponde a la próxima marca de la persona."""
+        today = (now or datetime.datetime.now()).strftime('%Y-%m-%d')
+        with self._lock:
+            state = self._users.get(str(rut))
+            if state is None or state[_FECHA] != today:
+                return ENTRADA
+            return next_action(state[_ACCION], state[_COLACION])
+
+
+_state_table = None
+_state_lock = threading.Lock()
+# Un candado por RUT serializa decidir y guardar la marca: dos marcas de la misma persona no toman la
+# misma acción, y las de personas distintas se guardan a la vez (y se agrupan en un solo fsync)
+_rut_locks = {}
+_punch_lock = threading.Lock()
+
+
+def get_punch_state():
+    """Tabla de estado del backend activo; se reconstruye desde el diario la primera vez."""
+    global _state_table
+    with _state_lock:
+        _state_table = attach_view(_state_table, lambda storage: PunchStateTable(
+            os.path.join(storage.data_dir, STATE_FILE)))
+        return _state_table
+
+
+def record_punch(rut, nombre, metodo="Huella", lector=None):
+    """Guarda la marca con la acción que corresponde; retorna (success, message, accion)."""
+    with _punch_lock:
+        lock = _rut_locks.setdefault(str(rut), threading.Lock())
+    with lock:
+        accion = get_punch_state().next_action(rut)
+        success, message = data_handler.add_record(rut, nombre, accion, metodo, lector)
+        return success, message, accion
@@ -0,0 +1,194 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from database import data_handler
+from database.storage import as_iso_date, filter_records
+
+NGRAM = 3
+
+# Valor usado para fechas que no se pudieron interpretar (quedan al inicio del orden)
+_NO_DATE = np.iinfo(np.int64).min
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _to_day(value):
+    """Convierte una fecha de filtro a días desde 1970-01-01."""
+    return np.datetime64(as_iso_date(value), "D").astype(np.int64)
+
+
+def _days(fechas):
+    """Días desde 1970-01-01 de una columna Fecha (las ilegibles quedan en _NO_DATE)."""
+    fechas = pd.to_datetime(fechas.astype(str), format="%Y-%m-%d", errors="coerce")
+    days = fechas.to_numpy(dtype="datetime64[D]").astype(np.int64)
+    days[fechas.isna().to_numpy()] = _NO_DATE
+    return days
+
+
+class NgramIndex:
+    """Índice de n-gramas sobre los valores distintos de una columna de texto."""
+
+    def __init__(self, series):
+        self.codes = np.empty(0, dtype=np.int64)
+        self.values = []
+        self._ids = {}
+        self._postings = {}
+        self.extend(series)
+
+    def extend(self, series):
+        """Agrega filas al final; sólo los valores nuevos se parten en n-gramas."""
+        codes, uniques = pd.factorize(series.astype(str).str.lower())
+        # La última posición queda en -1 para los valores nulos (código -1 de factorize)
+        ids = np.full(len(uniques) + 1, -1, dtype=np.int64)
+        for i, value in enumerate(uniques):
+            value_id = self._ids.get(value)
+            if value_id is None:
+                value_id = self._ids[value] = len(self.values)
+                self.values.append(value)
+                for gram in _ngrams(value):
+                    self._postings.setdefault(gram, []).append(value_id)
+            ids[i] = value_id
+        self.codes = np.concatenate([self.codes, ids[codes]])
+
+    def matching_values(self, text):
+        """Ids de los valores que contienen `text` (sin distinguir mayúsculas)."""
+        text = text.lower()
+        if len(text) < NGRAM:
+            candidates = range(len(self.values))
+        else:
+            postings = sorted((self._postings.get(gram, []) for gram in _ngrams(text)), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+        return np.array([i for i in candidates if text in self.values[i]], dtype=np.int64)
+
+    def rows_mask(self, text, rows=None):
+        """Máscara de las filas (o de `rows`) cuyo valor contiene `text`."""
+        codes = self.codes if rows is None else self.codes[rows]
+        return np.isin(codes, self.matching_values(text))
+
+
+class RecordIndex:
+    """Registros con Fecha pre-parseada y ordenada, e índices de n-gramas de RUT y Nombre.
+
+    Los rangos de fechas se resuelven por búsqueda binaria y las búsquedas
+    de texto consultan el índice de n-gramas de los valores distintos.
+    `position` es la posición del diario hasta la que llegan los registros
+    indexados; `extend` agrega los anexados después sin reindexar el resto.
+    """
+
+    def __init__(self, df, position=None):
+        self.frame = df.reset_index(drop=True)
+        self.position = position
+        days = _days(self.frame["Fecha"])
+        self.order = np.argsort(days, kind="stable")
+        self.sorted_days = days[self.order]
+        self.rut_index = NgramIndex(self.frame["RUT"])
+        self.name_index = NgramIndex(self.frame["Nombre"])
+
+    def __len__(self):
+        return len(self.frame)
+
+    def extend(self, df, position=None):
+        """Agrega registros al final e intercala sus fechas en el orden existente."""
+        if len(df):
+            start = len(self.frame)
+            df = df.reset_index(drop=True)
+            self.frame = pd.concat([self.frame, df], ignore_index=True) if start else df
+            days = _days(df["Fecha"])
+            new_order = np.argsort(days, kind="stable")
+            days = days[new_order]
+            # "right": a igual fecha, los registros nuevos van después de los existentes
+            slots = np.searchsorted(self.sorted_days, days, "right")
+            self.sorted_days = np.insert(self.sorted_days, slots, days)
+            self.order = np.insert(self.order, slots, new_order + start)
+            self.rut_index.extend(df["RUT"])
+            self.name_index.extend(df["Nombre"])
+        self.position = position
+
+    def date_rows(self, fecha_desde=None, fecha_hasta=None):
+        """Posiciones de las filas dentro del rango de fechas (inclusivo)."""
+        lo = 0 if fecha_desde in (None, "") else np.searchsorted(self.sorted_days, _to_day(fecha_desde), "left")
+        hi = len(self.sorted_days)
+        if fecha_hasta not in (None, ""):
+            hi = np.searchsorted(self.sorted_days, _to_day(fecha_hasta), "right")
+        return np.sort(self.order[lo:hi])
+
+    def filter(self, text=None, fecha_desde=None, fecha_hasta=None):
+        """Filtra por texto (RUT o nombre) y rango de fechas, conservando el orden original."""
+        if fecha_desde in (None, "") and fecha_hasta in (None, ""):
+            rows = np.arange(len(self.frame))
+        else:
+            rows = self.date_rows(fecha_desde, fecha_hasta)
+        if text:
+            mask = self.rut_index.rows_mask(text, rows) | self.name_index.rows_mask(text, rows)
+            rows = rows[mask]
+        return self.frame.iloc[rows]
+
+
+def _catch_up(index, storage, fecha_desde=None, fecha_hasta=None, loaded=False):
+    """Agrega al índice los registros anexados al diario después de su posición.
+
+    Con `loaded`, los registros que ya trajo la carga inicial (anexados
+    mientras se leía el historial) se reconocen por su Clave y se descartan.
+    """
+    records = []
+    position = index.position
+    for record, position in storage.scan_records(index.position):
+        records.append(record)
+    if records:
+        # El diario CSV entrega texto: los campos vacíos quedan nulos, como al leerlo con pandas
+        df = filter_records(pd.DataFrame(records), fecha_desde, fecha_hasta).replace("", np.nan)
+        if loaded and len(df) and "Clave" in df.columns and "Clave" in index.frame.columns:
+            tail = index.frame["Clave"].iloc[-len(df):]
+            df = df[~(df["Clave"].notna() & df["Clave"].isin(tail))]
+        index.extend(df, position)
+    return index
+
+
+def _build_index(storage, fecha_desde=None, fecha_hasta=None):
+    # La posición se toma antes de cargar para no perder lo que se anexe durante la carga
+    position = storage.records_position()
+    index = RecordIndex(data_handler.load_records(fecha_desde, fecha_hasta), position)
+    return _catch_up(index, storage, fecha_desde, fecha_hasta, loaded=True)
+
+
+_index = None
+_index_journal = None
+# Índice del último rango de fechas pedido cuando no hay índice de todo el historial
+_range_index = None
+_range_key = None
+_index_lock = threading.Lock()
+
+def get_record_index(fecha_desde=None, fecha_hasta=None):
+    """Obtiene el índice de registros, agregando sólo lo anexado desde la última consulta.
+
+    El índice se reconstruye únicamente si cambia el backend o si los
+    registros se reescribieron (archivación o save_record). Con un rango de
+    fechas, si no hay índice de todo el historial se indexan sólo los
+    registros del rango (el almacenamiento descarta los meses archivados
+    que no lo cruzan); el índice retornado cubre al menos ese rango.
+    """
+    global _index, _index_journal, _range_index, _range_key
+    fecha_desde, fecha_hasta = as_iso_date(fecha_desde), as_iso_date(fecha_hasta)
+    with _index_lock:
+        storage = data_handler.get_storage()
+        # Se guarda el backend mismo y no su id(): un backend nuevo podría reutilizar el id de uno cerrado
+        journal = (storage, storage.epoch, data_handler.records_generation())
+        if _index is not None and journal == _index_journal:
+            return _catch_up(_index, storage)
+        if fecha_desde is None and fecha_hasta is None:
+            _index = _build_index(storage)
+            _index_journal = journal
+            _range_index = None
+            return _index
+        key = (journal, fecha_desde, fecha_hasta)
+        if _range_index is not None and key == _range_key:
+            return _catch_up(_range_index, storage, fecha_desde, fecha_hasta)
+        _range_index = _build_index(storage, fecha_desde, fecha_hasta)
+        _range_key = key
+        return _range_index
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+ENTRADA = "Entrada"
+COLACION = "Colación"
+SALIDA = "Salida"
+
+DEFAULT_SCHEDULE = {"entry_time": "08:00", "exit_time": "17:00", "break_duration": "60"}
+
+DAILY_COLUMNS = ["RUT", "Nombre", "Fecha", "primera_entrada", "ultima_salida", "minutos_colacion",
+                 "marcas", "horas_trabajadas", "minutos_atraso", "minutos_salida_anticipada", "incompleto"]
+
+
+def load_schedule(config):
+    """Horario (entrada, salida y colación) desde config.json, con valores por defecto si faltan."""
+    schedule = {key: (config or {}).get(key) or default for key, default in DEFAULT_SCHEDULE.items()}
+    return {
+        "entry": pd.Timedelta(f"{schedule['entry_time']}:00"),
+        "exit": pd.Timedelta(f"{schedule['exit_time']}:00"),
+        "break_minutes": float(schedule["break_duration"]),
+    }
+
+
+def _timestamps(records):
+    return pd.to_datetime(records["Fecha"].astype(str) + " " + records["Hora"].astype(str),
+                          format="%Y-%m-%d %H:%M:%S", errors="coerce")
+
+
+def daily_attendance(records, schedule):
+    """Agrega las marcas por persona y día: primera entrada, última salida, colación y marcas.
+
+    La colación medida es el tiempo entre una marca de Colación y la Entrada
+    siguiente del mismo día; si no hay regreso marcado se usa la duración
+    configurada. Todo el cálculo es vectorizado (sort + groupby).
+    """
+    df = records.loc[records["Accion"].isin([ENTRADA, COLACION, SALIDA]), ["RUT", "Nombre", "Fecha", "Accion"]]
+    df = df.assign(ts=_timestamps(records.loc[df.index]), Fecha=df["Fecha"].astype(str))
+    df = df.dropna(subset=["ts"]).sort_values(["RUT", "Fecha", "ts"], kind="stable")
+
+    same_day = (df["RUT"].shift(-1) == df["RUT"]) & (df["Fecha"].shift(-1) == df["Fecha"])
+    returned = same_day & (df["Accion"] == COLACION) & (df["Accion"].shift(-1) == ENTRADA)
+    break_minutes = ((df["ts"].shift(-1) - df["ts"]).dt.total_seconds() / 60).where(returned, 0.0)
+    # Las entradas de regreso de colación no cuentan como primera entrada
+    first_entry = df["Accion"].eq(ENTRADA) & ~(df["Accion"].shift(1).eq(COLACION) & same_day.shift(1, fill_value=False))
+
+    df = df.assign(
+        entrada_ts=df["ts"].where(first_entry),
+        salida_ts=df["ts"].where(df["Accion"] == SALIDA),
+        colacion=df["Accion"] == COLACION,
+        minutos_colacion=break_minutes,
+    )
+    daily = df.groupby(["RUT", "Fecha"], sort=False).agg(
+        Nombre=("Nombre", "last"),
+        primera_entrada=("entrada_ts", "min"),
+        ultima_salida=("salida_ts", "max"),
+        colaciones=("colacion", "sum"),
+        minutos_colacion=("minutos_colacion", "sum"),
+        marcas=("Accion", "size"),
+    ).reset_index()
+    return finish_daily(daily, schedule)
+
+
+def finish_daily(daily, schedule):
+    """Calcula horas trabajadas, atrasos y salidas anticipadas sobre agregados diarios."""
+    fecha = pd.to_datetime(daily["Fecha"], format="%Y-%m-%d")
+    measured = daily["minutos_colacion"].astype(float)
+    break_minutes = measured.where(measured > 0, schedule["break_minutes"])
+    span = (daily["ultima_salida"] - daily["primera_entrada"]).dt.total_seconds() / 3600
+    daily["minutos_colacion"] = break_minutes
+    daily["horas_trabajadas"] = (span - break_minutes / 60).clip(lower=0).round(2)
+    daily["minutos_atraso"] = ((daily["primera_entrada"] - (fecha + schedule["entry"]))
+                               .dt.total_seconds().div(60).clip(lower=0).round(1))
+    daily["minutos_salida_anticipada"] = (((fecha + schedule["exit"]) - daily["ultima_salida"])
+                                          .dt.total_seconds().div(60).clip(lower=0).round(1))
+    daily["incompleto"] = daily["primera_entrada"].isna() | daily["ultima_salida"].isna()
+    return daily[DAILY_COLUMNS].sort_values(["Fecha", "RUT"], kind="stable").reset_index(drop=True)
+
+
+def compliance_summary(daily, personnel=None):
+    """Resumen por persona: días, horas, atrasos y cumplimiento de las horas de contrato semanales."""
+    if daily.empty:
+        return pd.DataFrame(columns=["RUT", "Nombre", "dias", "horas_totales", "promedio_horas_semana",
+                                     "horas_contrato", "cumplimiento_pct", "atrasos", "minutos_atraso",
+                                     "dias_incompletos"])
+    semana = pd.to_datetime(daily["Fecha"], format="%Y-%m-%d").dt.to_period("W-SUN")
+    weekly = daily.assign(semana=semana).groupby(["RUT", "semana"])["horas_trabajadas"].sum()
+    promedio = weekly.groupby(level="RUT").mean().rename("promedio_horas_semana")
+
+    summary = daily.groupby("RUT").agg(
+        Nombre=("Nombre", "last"),
+        dias=("Fecha", "nunique"),
+        horas_totales=("horas_trabajadas", "sum"),
+        atrasos=("minutos_atraso", lambda s: int((s > 0).sum())),
+        minutos_atraso=("minutos_atraso", "sum"),
+        dias_incompletos=("incompleto", "sum"),
+    ).join(promedio)
+
+    if personnel is not None and not personnel.empty:
+        contract = (personnel.assign(RUT=personnel["RUT"].astype(str))
+                    .drop_duplicates("RUT").set_index("RUT")["Horas de Contrato"])
+        summary["horas_contrato"] = pd.to_numeric(contract.reindex(summary.index), errors="coerce")
+    else:
+        summary["horas_contrato"] = np.nan
+    summary["cumplimiento_pct"] = (summary["promedio_horas_semana"] / summary["horas_contrato"] * 100).round(1)
+    summary["horas_totales"] = summary["horas_totales"].round(2)
+    summary["promedio_horas_semana"] = summary["promedio_horas_semana"].round(2)
+    return summary.reset_index()[["RUT", "Nombre", "dias", "horas_totales", "promedio_horas_semana",
+                                  "horas_contrato", "cumplimiento_pct", "atrasos", "minutos_atraso",
+                                  "dias_incompletos"]]
+
+
+def build_report(records, config=None, personnel=None):
+    """Construye el detalle diario y el resumen por persona a partir de las marcas."""
+    schedule = load_schedule(config)
+    daily = daily_attendance(records, schedule)
+    return daily, compliance_summary(daily, personnel)
+
+
+def write_report(path, records, daily, summary):
+    """Guarda el reporte: hojas Resumen y Detalle en .xlsx, o texto en cualquier otra extensión.
+
+    `records` son las marcas (DataFrame) o directamente los totales por acción (dict).
+    """
+    if path.lower().endswith(".xlsx"):
+        with pd.ExcelWriter(path) as writer:
+            summary.to_excel(writer, sheet_name="Resumen", index=False)
+            daily.to_excel(writer, sheet_name="Detalle diario", index=False)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Reporte de Asistencia\n")
+        f.write("=====================\n\n")
+        counts = records if isinstance(records, dict) else records['Accion'].value_counts().to_dict()
+        f.write(f"Total de registros: {sum(counts.values())}\n\n")
+        f.write("Resumen de acciones:\n")
+        for accion, count in sorted(counts.items(), key=lambda item: -item[1]):
+            f.write(f"  {accion}: {count}\n")
+        f.write(f"\nDías-persona con marcas: {len(daily)} (incompletos: {int(daily['incompleto'].sum())})\n\n")
+        f.write("Resumen por persona:\n")
+        f.write(summary.to_string(index=False) if not summary.empty else "  (sin marcas de Entrada/Salida)")
+        f.write("\n")
@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+from collections import Counter
+
+import pandas as pd
+
+from database import data_handler
+from database.reports import COLACION, ENTRADA, SALIDA, finish_daily, load_schedule
+from database.storage import as_iso_date
+from database.views import JournalView, attach_view
+
+ROLLUP_FILE = "rollups_diarios.json"
+
+ROLLUP_COLUMNS = ["RUT", "Nombre", "Fecha", "primera_entrada", "ultima_salida", "colaciones",
+                  "minutos_colacion", "marcas", "atrasado"]
+
+# Posiciones dentro de cada fila del rollup (listas para que la instantánea sea JSON compacto)
+_NOMBRE, _ENTRADA, _SALIDA, _COLACIONES, _MINUTOS, _MARCAS, _ATRASADO, _ULTIMA_ACCION, _ULTIMA_HORA = range(9)
+
+
+def _seconds(hora):
+    """Segundos desde medianoche de una hora HH:MM:SS."""
+    h, m, s = (int(part) for part in hora.split(":"))
+    return h * 3600 + m * 60 + s
+
+
+class DailyRollups(JournalView):
+    """Agregados por persona y día mantenidos con cada marca.
+
+    Guarda primera entrada, última salida, colaciones, minutos de colación,
+    cantidad de marcas y si la persona llegó atrasada, con las mismas reglas
+    que `reports.daily_attendance`; los reportes y el panel los leen en vez de
+    recorrer las marcas crudas.
+    """
+
+    def __init__(self, path, config=None, save_every=200):
+        super().__init__(path, save_every)
+        self.schedule = load_schedule(config)
+        self._entry_seconds = int(self.schedule["entry"].total_seconds())
+
+    def reset(self):
+        self._days = {}
+        self._actions = Counter()
+
+    def apply(self, record):
+        accion = record.get("Accion")
+        self._actions[accion] += 1
+        if accion not in (ENTRADA, COLACION, SALIDA):
+            return
+        try:
+            fecha = as_iso_date(record.get("Fecha"))
+            hora = str(record.get("Hora"))
+            seconds = _seconds(hora)
+        except (ValueError, TypeError):
+            return
+        key = (str(record.get("RUT")), fecha)
+        day = self._days.get(key)
+        if day is None:
+            day = self._days[key] = [None, None, None, 0, 0.0, 0, False, None, None]
+        day[_NOMBRE] = record.get("Nombre")
+        returned = day[_ULTIMA_ACCION] == COLACION
+        if accion == ENTRADA and returned:
+            # Regreso de colación: mide la colación y no cuenta como primera entrada
+            day[_MINUTOS] += (seconds - _seconds(day[_ULTIMA_HORA])) / 60
+        elif accion == ENTRADA and (day[_ENTRADA] is None or hora < day[_ENTRADA]):
+            day[_ENTRADA] = hora
+            day[_ATRASADO] = seconds > self._entry_seconds
+        elif accion == SALIDA and (day[_SALIDA] is None or hora > day[_SALIDA]):
+            day[_SALIDA] = hora
+        elif accion == COLACION:
+            day[_COLACIONES] += 1
+        day[_MARCAS] += 1
+        day[_ULTIMA_ACCION], day[_ULTIMA_HORA] = accion, hora
+
+    def state(self):
+        return {
+            "dias": [[rut, fecha] + day for (rut, fecha), day in self._days.items()],
+            "acciones": dict(self._actions),
+        }
+
+    def restore(self, state):
+        self._days = {(row[0], row[1]): row[2:] for row in state["dias"]}
+        self._actions = Counter(state["acciones"])
+
+    def action_counts(self):
+        """Totales por acción sobre todo el diario (incluye acciones como 'Registro Huella')."""
+        with self._lock:
+            return dict(self._actions)
+
+    def get(self, rut, fecha):
+        """Rollup de una persona en un día, como diccionario, o None."""
+        with self._lock:
+            day = self._days.get((str(rut), as_iso_date(fecha)))
+            if day is None:
+                return None
+            return dict(zip(ROLLUP_COLUMNS, [str(rut), day[_NOMBRE], as_iso_date(fecha)] + day[_ENTRADA:_ATRASADO + 1]))
+
+    def to_frame(self, fecha_desde=None, fecha_hasta=None):
+        """Rollups como DataFrame (horas como Timestamp), opcionalmente por rango de fechas."""
+        fecha_desde, fecha_hasta = as_iso_date(fecha_desde), as_iso_date(fecha_hasta)
+        with self._lock:
+            rows = [[rut, day[_NOMBRE], fecha] + day[_ENTRADA:_ATRASADO + 1]
+                    for (rut, fecha), day in self._days.items()
+                    if (fecha_desde is None or fecha >= fecha_desde) and (fecha_hasta is None or fecha <= fecha_hasta)]
+        df = pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+        for column in ("primera_entrada", "ultima_salida"):
+            df[column] = pd.to_datetime(df["Fecha"] + " " + df[column].fillna(""),
+                                        format="%Y-%m-%d %H:%M:%S", errors="coerce")
+        return df
+
+    def daily(self, fecha_desde=None, fecha_hasta=None, schedule=None):
+        """Detalle diario (mismas columnas que `reports.daily_attendance`) calculado desde los rollups."""
+        return finish_daily(self.to_frame(fecha_desde, fecha_hasta), schedule or self.schedule)
+
+
+_rollups = None
+_rollups_lock = threading.Lock()
+
+
+def _load_config():
+    try:
+        with open(os.path.join(data_handler.DATA_DIR, data_handler.CONFIG_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_rollups():
+    """Rollups diarios del backend activo; se cargan (o reconstruyen) una vez y luego se mantienen solos."""
+    global _rollups
+    with _rollups_lock:
+        _rollups = attach_view(_rollups, lambda storage: DailyRollups(
+            os.path.join(storage.data_dir, ROLLUP_FILE), _load_config()))
+        return _rollups
@@ -0,0 +1,171 @@
+import threading
+
+import pandas as pd
+
+from database import data_handler
+
+USERS = "usuarios"
+PERSONNEL_KINDS = ("docente", "asistente")
+
+
+def _role(kind, row):
+    """Rol mostrado para una fila de personal."""
+    if kind == "docente":
+        return "Docente"
+    return row.get("Estamento") if pd.notna(row.get("Estamento")) else "Asistente"
+
+
+class RosterCache:
+    """Caché en memoria del personal y de usuarios.xlsx con índices por ID.
+
+    Cada archivo se vuelve a leer sólo si su firma (mtime y tamaño, o la
+    versión de la tabla en SQLite) cambió; las escrituras hechas a través de
+    la caché actualizan los índices en el lugar.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._storage = None
+        self._frames = {}
+        self._signatures = {}
+        self._personnel = {}
+        self._users = {}
+
+    def refresh(self):
+        """Recarga los archivos que cambiaron desde la última lectura."""
+        with self._lock:
+            storage = data_handler.get_storage()
+            if storage is not self._storage:
+                self._storage = storage
+                self._signatures = {}
+            changed = []
+            for kind in PERSONNEL_KINDS + (USERS,):
+                signature = storage.signature(kind)
+                if kind in self._signatures and self._signatures[kind] == signature:
+                    continue
+                self._frames[kind] = self._load(kind, signature)
+                self._signatures[kind] = signature
+                changed.append(kind)
+            if USERS in changed:
+                self._index_users()
+            if any(kind in changed for kind in PERSONNEL_KINDS):
+                self._index_personnel()
+
+    def _load(self, kind, signature):
+        if kind == USERS:
+            return data_handler.load_users()
+        if signature is None:
+            return pd.DataFrame(columns=["RUN", "Nombre"])
+        return data_handler.load_personnel(kind)
+
+    def _index_users(self):
+        self._users = {
+            str(row["ID"]): {"ID": str(row["ID"]), "Nombre": row["Nombre"], "Rol": row["Rol"],
+                             "Huella": row.get("Huella", "")}
+            for row in self._frames[USERS].to_dict("records")
+        }
+
+    def _index_personnel(self):
+        self._personnel = {}
+        for kind in PERSONNEL_KINDS:
+            for row in self._frames[kind].to_dict("records"):
+                self._personnel[str(row["RUN"])] = self._personnel_entry(kind, row)
+
+    def _personnel_entry(self, kind, row):
+        return {"ID": str(row["RUN"]), "Nombre": row["Nombre"], "Rol": _role(kind, row), "Tipo": kind,
+                "Horas de Contrato": row.get("Horas de Contrato")}
+
+    def _saved(self, kind, frame):
+        """Guarda un archivo y registra su nueva firma para no volver a leerlo."""
+        if kind == USERS:
+            data_handler.save_user(frame)
+        else:
+            data_handler.save_personnel(kind, frame)
+        self._frames[kind] = frame
+        self._signatures[kind] = self._storage.signature(kind)
+
+    def in_personnel(self, user_id):
+        """Indica si el RUT está en los archivos de personal."""
+        self.refresh()
+        return str(user_id) in self._personnel
+
+    def in_users(self, user_id):
+        """Indica si el ID está en usuarios.xlsx."""
+        self.refresh()
+        return str(user_id) in self._users
+
+    def __contains__(self, user_id):
+        self.refresh()
+        return str(user_id) in self._personnel or str(user_id) in self._users
+
+    def get(self, user_id):
+        """Datos del usuario (personal o usuarios.xlsx) o None."""
+        self.refresh()
+        user_id = str(user_id)
+        return self._personnel.get(user_id) or self._users.get(user_id)
+
+    def personnel(self):
+        """Lista del personal (docentes y asistentes) en el orden de los archivos."""
+        self.refresh()
+        return list(self._personnel.values())
+
+    def entries(self):
+        """Todos los usuarios como {ID: datos}; el personal tiene prioridad, igual que en get()."""
+        with self._lock:
+            self.refresh()
+            return {**self._users, **self._personnel}
+
+    def add_user(self, user_id, nombre, rol):
+        """Agrega un usuario al archivo de personal según su rol y a usuarios.xlsx."""
+        with self._lock:
+            self.refresh()
+            kind = "docente" if rol == "Docente" else "asistente"
+            row = {"RUN": user_id, "Nombre": nombre}
+            if kind == "asistente":
+                row["Estamento"] = rol
+            self._saved(kind, pd.concat([self._frames[kind], pd.DataFrame([row])], ignore_index=True))
+            self._personnel[str(user_id)] = self._personnel_entry(kind, row)
+
+            user = {"ID": user_id, "Nombre": nombre, "Rol": rol, "Huella": ""}
+            self._saved(USERS, pd.concat([self._frames[USERS], pd.DataFrame([user])], ignore_index=True))
+            self._users[str(user_id)] = {**user, "ID": str(user_id)}
+
+    def update_user(self, user_id, nombre=None, rol=None):
+        """Actualiza nombre y/o rol en usuarios.xlsx; retorna False si el usuario no está ahí."""
+        with self._lock:
+            self.refresh()
+            user_id = str(user_id)
+            if user_id not in self._users:
+                return False
+            frame = self._frames[USERS].copy()
+            mask = frame["ID"].astype(str) == user_id
+            if nombre:
+                frame.loc[mask, "Nombre"] = nombre
+            if rol:
+                frame.loc[mask, "Rol"] = rol
+            self._saved(USERS, frame)
+            self._users[user_id].update({k: v for k, v in (("Nombre", nombre), ("Rol", rol)) if v})
+            return True
+
+    def delete_user(self, user_id):
+        """Elimina al usuario de usuarios.xlsx; retorna False si no está ahí."""
+        with self._lock:
+            self.refresh()
+            user_id = str(user_id)
+            if self._users.pop(user_id, None) is None:
+                return False
+            frame = self._frames[USERS]
+            self._saved(USERS, frame[frame["ID"].astype(str) != user_id].reset_index(drop=True))
+            return True
+
+
+_roster = None
+_roster_lock = threading.Lock()
+
+def get_roster():
+    """Obtiene la caché de personal compartida."""
+    global _roster
+    with _roster_lock:
+        if _roster is None:
+            _roster = RosterCache()
+        return _roster
@@ -0,0 +1,249 @@
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from database.storage import CsvStorage, RECORD_COLUMNS, USER_COLUMNS, as_iso_date
+
+DB_FILENAME = "reloj_control.db"
+# 1: importación de los archivos del almacenamiento CSV; 2: columnas Lector y Clave de registros
+SCHEMA_VERSION = 2
+
+# El índice compuesto (RUT, Fecha) también atiende las búsquedas sólo por RUT
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    ID TEXT PRIMARY KEY,
+    Nombre TEXT,
+    Rol TEXT,
+    Huella TEXT
+);
+CREATE TABLE IF NOT EXISTS registros (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    RUT TEXT,
+    Nombre TEXT,
+    Fecha TEXT,
+    Hora TEXT,
+    Accion TEXT,
+    Metodo TEXT,
+    Lector TEXT,
+    Clave TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_registros_fecha ON registros (Fecha);
+CREATE INDEX IF NOT EXISTS idx_registros_rut_fecha ON registros (RUT, Fecha);
+CREATE TABLE IF NOT EXISTS personal (
+    Tipo TEXT NOT NULL,
+    RUN TEXT NOT NULL,
+    Nombre TEXT,
+    Datos TEXT NOT NULL,
+    PRIMARY KEY (Tipo, RUN)
+);
+CREATE INDEX IF NOT EXISTS idx_personal_run ON personal (RUN);
+CREATE TABLE IF NOT EXISTS versiones (
+    Tabla TEXT PRIMARY KEY,
+    Version INTEGER NOT NULL
+);
+"""
+
+INSERT_RECORD = (f"INSERT INTO registros ({', '.join(RECORD_COLUMNS)}) "
+                 f"VALUES ({', '.join('?' * len(RECORD_COLUMNS))})")
+
+
+def _rows(df, columns):
+    """Convierte las columnas de un DataFrame en tuplas aptas para sqlite (NaN -> NULL)."""
+    df = df.reindex(columns=columns).astype(object)
+    return list(df.where(df.notna(), None).itertuples(index=False, name=None))
+
+
+class SQLiteStorage:
+    """Almacenamiento en una base SQLite en modo WAL.
+
+    Cada hilo usa su propia conexión, de modo que el quiosco puede escribir
+    marcas mientras el panel de administración consulta. Al crear la base se
+    importan por única vez los archivos existentes (xlsx/CSV).
+    """
+
+    name = "sqlite"
+    # Los ids de registros no cambian: no hay reescrituras que invaliden posiciones
+    epoch = 0
+
+    def __init__(self, data_dir, personnel_files, filename=DB_FILENAME):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, filename)
+        self.personnel_files = personnel_files
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        os.makedirs(data_dir, exist_ok=True)
+        self._init_schema()
+
+    def connect(self):
+        """Obtiene la conexión del hilo actual."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _init_schema(self):
+        conn = self.connect()
+        conn.executescript(SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        # La migración y el cambio de versión van en una sola transacción: un corte
+        # a medias no deja datos importados con la versión anterior (que se reimportarían)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Otro proceso pudo migrar mientras se esperaba el bloqueo
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                self._import_legacy_files(conn)
+            if version < 2:
+                # Bases creadas antes de que registros tuviera Lector y Clave
+                existing = {row[1] for row in conn.execute("PRAGMA table_info(registros)")}
+                for column in ("Lector", "Clave"):
+                    if column not in existing:
+                        conn.execute(f"ALTER TABLE registros ADD COLUMN {column} TEXT")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _import_legacy_files(self, conn):
+        """Importa usuarios, personal y registros desde los archivos del almacenamiento CSV (sin confirmar)."""
+        legacy = CsvStorage(self.data_dir, self.personnel_files)
+        self._write_users(conn, legacy.load_users())
+        for kind, path in self.personnel_files.items():
+            if os.path.exists(path):
+                self._write_personnel(conn, kind, legacy.load_personnel(kind))
+        if os.path.exists(legacy.records_path):
+            for chunk in pd.read_csv(legacy.records_path, chunksize=50000, dtype=str):
+                conn.executemany(INSERT_RECORD, _rows(chunk, RECORD_COLUMNS))
+
+    def _bump_version(self, conn, kind):
+        conn.execute("INSERT INTO versiones (Tabla, Version) VALUES (?, 1) "
+                     "ON CONFLICT (Tabla) DO UPDATE SET Version = Version + 1", (kind,))
+
+    def signature(self, kind):
+        """Versión de 'usuarios', 'registros' o del personal de un tipo; cambia con cada escritura."""
+        if kind == "registros":
+            # Los ids son AUTOINCREMENT: el máximo cambia con cada inserción o reemplazo
+            return self.connect().execute("SELECT MAX(id) FROM registros").fetchone()[0]
+        row = self.connect().execute("SELECT Version FROM versiones WHERE Tabla = ?", (kind,)).fetchone()
+        return row[0] if row else None
+
+    def load_users(self):
+        """Carga la lista de usuarios."""
+        df = pd.read_sql_query("SELECT ID, Nombre, Rol, Huella FROM usuarios ORDER BY rowid",
+                               self.connect())
+        df['Huella'] = df['Huella'].astype(str)
+        return df
+
+    def save_user(self, df):
+        """Reemplaza la lista de usuarios."""
+        conn = self.connect()
+        with conn:
+            self._write_users(conn, df)
+
+    def _write_users(self, conn, df):
+        conn.execute("DELETE FROM usuarios")
+        conn.executemany("INSERT OR REPLACE INTO usuarios (ID, Nombre, Rol, Huella) VALUES (?, ?, ?, ?)",
+                         _rows(df, USER_COLUMNS))
+        self._bump_version(conn, "usuarios")
+
+    def load_personnel(self, kind):
+        """Carga el personal de un tipo ('docente' o 'asistente') con sus columnas originales."""
+        rows = self.connect().execute(
+            "SELECT Datos FROM personal WHERE Tipo = ? ORDER BY rowid", (kind,)).fetchall()
+        return pd.DataFrame([json.loads(datos) for (datos,) in rows])
+
+    def save_personnel(self, kind, df):
+        """Reemplaza el personal de un tipo."""
+        conn = self.connect()
+        with conn:
+            self._write_personnel(conn, kind, df)
+
+    def _write_personnel(self, conn, kind, df):
+        df = df.astype(object).where(df.notna(), None)
+        rows = [(kind, str(row["RUN"]), row.get("Nombre"), json.dumps(row, ensure_ascii=False))
+                for row in df.to_dict("records")]
+        conn.execute("DELETE FROM personal WHERE Tipo = ?", (kind,))
+        conn.executemany("INSERT OR REPLACE INTO personal (Tipo, RUN, Nombre, Datos) VALUES (?, ?, ?, ?)",
+                         rows)
+        self._bump_version(conn, kind)
+
+    def load_records(self, fecha_desde=None, fecha_hasta=None, rut=None):
+        """Carga los registros; los filtros se resuelven con los índices de Fecha y (RUT, Fecha)."""
+        clauses, params = [], []
+        if rut is not None:
+            clauses.append("RUT = ?")
+            params.append(str(rut))
+        if fecha_desde not in (None, ""):
+            clauses.append("Fecha >= ?")
+            params.append(as_iso_date(fecha_desde))
+        if fecha_hasta not in (None, ""):
+            clauses.append("Fecha <= ?")
+            params.append(as_iso_date(fecha_hasta))
+        query = f"SELECT {', '.join(RECORD_COLUMNS)} FROM registros"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        return pd.read_sql_query(query + " ORDER BY id", self.connect(), params=params)
+
+    def iter_records(self, chunksize=50000):
+        """Recorre los registros en bloques de a lo más `chunksize` filas."""
+        yield from pd.read_sql_query(f"SELECT {', '.join(RECORD_COLUMNS)} FROM registros ORDER BY id",
+                                     self.connect(), chunksize=chunksize)
+
+    def scan_records(self, position=0):
+        """Recorre los registros con id mayor a `position`; entrega pares (registro, id)."""
+        cursor = self.connect().execute(
+            f"SELECT id, {', '.join(RECORD_COLUMNS)} FROM registros WHERE id > ? ORDER BY id", (position or 0,))
+        for row in cursor:
+            yield dict(zip(RECORD_COLUMNS, row[1:])), row[0]
+
+    def records_position(self):
+        """Id del último registro, desde donde `scan_records` entrega lo que se anexe después."""
+        return self.connect().execute("SELECT MAX(id) FROM registros").fetchone()[0] or 0
+
+    def count_records(self):
+        """Cuenta los registros."""
+        return self.connect().execute("SELECT COUNT(*) FROM registros").fetchone()[0]
+
+    def archive_closed(self, before=None):
+        """Sin efecto: las consultas por fecha ya usan el índice de Fecha en vez de leer todo el historial."""
+        return 0
+
+    def save_record(self, df):
+        """Reemplaza todos los registros."""
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM registros")
+            conn.executemany(INSERT_RECORD, _rows(df, RECORD_COLUMNS))
+
+    def append_record(self, record):
+        """Inserta un registro y retorna su id."""
+        conn = self.connect()
+        with conn:
+            cursor = conn.execute(
+                INSERT_RECORD,
+                tuple(record.get(column) for column in RECORD_COLUMNS))
+        return cursor.lastrowid
+
+    def append_records(self, records):
+        """Inserta varios registros en una sola transacción y retorna sus ids."""
+        conn = self.connect()
+        ids = []
+        with conn:
+            for record in records:
+                ids.append(conn.execute(INSERT_RECORD, tuple(record.get(column) for column in RECORD_COLUMNS)).lastrowid)
+        return ids
+
+    def close(self):
+        """Cierra todas las conexiones abiertas."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
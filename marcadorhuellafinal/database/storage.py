@@ -0,0 +1,230 @@
+import csv
+import datetime
+import os
+import threading
+
+import pandas as pd
+
+from database.journal import PunchJournal
+from database.partitions import ARCHIVE_DIR, PartitionArchive
+
+USER_COLUMNS = ["ID", "Nombre", "Rol", "Huella"]
+RECORD_COLUMNS = ["RUT", "Nombre", "Fecha", "Hora", "Accion", "Metodo", "Lector", "Clave"]
+
+
+def as_iso_date(value):
+    """Normaliza una fecha (str, date o Timestamp) al formato AAAA-MM-DD usado en los registros."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and len(value) == 10 and value[4] == "-" and value[7] == "-":
+        return value
+    if isinstance(value, str) and "/" in value:
+        return pd.to_datetime(value, dayfirst=True).strftime('%Y-%m-%d')
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def filter_records(df, fecha_desde=None, fecha_hasta=None, rut=None):
+    """Filtra un DataFrame de registros por rango de fechas (inclusivo) y RUT."""
+    fecha_desde, fecha_hasta = as_iso_date(fecha_desde), as_iso_date(fecha_hasta)
+    if fecha_desde is None and fecha_hasta is None and rut is None:
+        return df
+    mask = pd.Series(True, index=df.index)
+    fechas = df["Fecha"].astype(str)
+    if fecha_desde is not None:
+        mask &= fechas >= fecha_desde
+    if fecha_hasta is not None:
+        mask &= fechas <= fecha_hasta
+    if rut is not None:
+        mask &= df["RUT"].astype(str) == str(rut)
+    return df[mask].reset_index(drop=True)
+
+
+def _safe_iso_date(value):
+    try:
+        return as_iso_date(value)
+    except (ValueError, TypeError):
+        return None
+
+
+class CsvStorage:
+    """Almacenamiento en archivos: usuarios.xlsx, CSV de personal y diario CSV de registros.
+
+    El diario guarda sólo los meses abiertos; los meses cerrados se archivan
+    comprimidos por mes en `archivo/` (ver `archive_closed`) y las consultas
+    por fecha sólo descomprimen las particiones que cruzan el rango.
+    """
+
+    name = "csv"
+
+    def __init__(self, data_dir, personnel_files):
+        self.data_dir = data_dir
+        self.users_path = os.path.join(data_dir, "usuarios.xlsx")
+        self.records_path = os.path.join(data_dir, "registros_huellas.csv")
+        self.personnel_files = personnel_files
+        self.archive = PartitionArchive(os.path.join(data_dir, ARCHIVE_DIR))
+        self._journal = None
+        self._lock = threading.Lock()
+
+    @property
+    def epoch(self):
+        """Cambia cuando se reescribe el diario (archivación): invalida las posiciones guardadas."""
+        return self.archive.generation
+
+    def signature(self, kind):
+        """Firma (mtime, tamaño) del archivo de 'usuarios', 'registros' o de personal; None si no existe."""
+        if kind == "usuarios":
+            path = self.users_path
+        elif kind == "registros":
+            path = self.records_path
+        else:
+            path = self.personnel_files[kind]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load_users(self):
+        """Carga la lista de usuarios desde el archivo."""
+        if os.path.exists(self.users_path):
+            df = pd.read_excel(self.users_path)
+            # Asegurar que la columna 'Huella' sea de tipo string para evitar incompatibilidades
+            if 'Huella' in df.columns:
+                df['Huella'] = df['Huella'].astype(str)
+            return df
+        return pd.DataFrame(columns=USER_COLUMNS)
+
+    def save_user(self, df):
+        """Guarda la lista de usuarios en el archivo."""
+        os.makedirs(self.data_dir, exist_ok=True)
+        df.to_excel(self.users_path, index=False)
+
+    def load_personnel(self, kind):
+        """Carga el CSV de personal ('docente' o 'asistente')."""
+        return pd.read_csv(self.personnel_files[kind])
+
+    def save_personnel(self, kind, df):
+        """Guarda el CSV de personal ('docente' o 'asistente')."""
+        df.to_csv(self.personnel_files[kind], index=False)
+
+    def load_records(self, fecha_desde=None, fecha_hasta=None, rut=None):
+        """Carga los registros desde el archivo, opcionalmente filtrados.
+
+        Sólo se leen las particiones archivadas cuyo rango de fechas (según el
+        manifiesto) se cruza con el pedido, además del diario de meses abiertos.
+        """
+        fecha_desde, fecha_hasta = as_iso_date(fecha_desde), as_iso_date(fecha_hasta)
+        frames = [self.archive.read(key) for key in self.archive.select(fecha_desde, fecha_hasta)]
+        if os.path.exists(self.records_path):
+            frames.append(pd.read_csv(self.records_path))
+        frames = [filter_records(df, fecha_desde, fecha_hasta, rut) for df in frames]
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=RECORD_COLUMNS)
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    def iter_records(self, chunksize=50000):
+        """Recorre los registros (meses archivados y luego el diario) en bloques de a lo más `chunksize` filas."""
+        for key in self.archive.select():
+            yield from self.archive.read(key, chunksize=chunksize)
+        if os.path.exists(self.records_path):
+            yield from pd.read_csv(self.records_path, chunksize=chunksize)
+
+    def scan_records(self, position=0):
+        """Recorre el diario desde una posición en bytes; entrega pares (registro, posición siguiente).
+
+        Desde el inicio se entregan primero los meses archivados, todos con la
+        posición del fin del encabezado del diario.
+        """
+        if not os.path.exists(self.records_path) and not self.archive.partitions:
+            return
+        # Abrir el diario garantiza que la última línea termine en salto de línea
+        self.get_journal()
+        with open(self.records_path, "rb") as f:
+            fields = next(csv.reader([f.readline().decode("utf-8-sig")]), [])
+            if position < f.tell():
+                for key in self.archive.select():
+                    for record in self.archive.records(key):
+                        yield record, f.tell()
+            elif position > f.tell():
+                f.seek(position)
+            offset = f.tell()
+            tail = b""
+            # Se lee por bloques y se interpreta cada bloque de líneas completas de una vez
+            for block in iter(lambda: f.read(1 << 20), b""):
+                block = tail + block
+                cut = block.rfind(b"\n") + 1
+                block, tail = block[:cut], block[cut:]
+                if not block:
+                    continue
+                lines = block.split(b"\n")[:-1]
+                for line, values in zip(lines, csv.reader(block.decode("utf-8").split("\n")[:-1])):
+                    offset += len(line) + 1
+                    if values:
+                        yield dict(zip(fields, values)), offset
+
+    def records_position(self):
+        """Posición del final del diario, desde donde `scan_records` entrega lo que se anexe después."""
+        return self.get_journal().position()
+
+    def count_records(self):
+        """Cuenta los registros sin interpretarlos (filas del manifiesto más líneas del diario sin encabezado)."""
+        archived = self.archive.count()
+        if not os.path.exists(self.records_path):
+            return archived
+        lines = 0
+        last = b"\n"
+        with open(self.records_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                lines += block.count(b"\n")
+                last = block[-1:]
+        if last != b"\n":
+            lines += 1
+        return archived + max(lines - 1, 0)
+
+    def save_record(self, df):
+        """Reescribe el archivo de registros completo (los meses archivados se descartan)."""
+        self.close()
+        os.makedirs(self.data_dir, exist_ok=True)
+        df.to_csv(self.records_path, index=False)
+        if self.archive.partitions:
+            self.archive.clear()
+
+    def archive_closed(self, before=None):
+        """Archiva comprimidos los registros anteriores a `before` (por defecto, el mes en curso).
+
+        Retorna la cantidad de registros archivados; las filas con fecha
+        ilegible quedan en el diario.
+        """
+        before = as_iso_date(before) or datetime.date.today().replace(day=1).isoformat()
+        if not os.path.exists(self.records_path):
+            return 0
+
+        def closed(record):
+            fecha = _safe_iso_date(record.get("Fecha"))
+            return fecha is not None and fecha < before
+
+        return self.get_journal().extract(
+            closed, lambda fields, rows: self.archive.store(fields, rows, lambda record: _safe_iso_date(record["Fecha"])))
+
+    def get_journal(self):
+        """Obtiene el diario de marcas abierto sobre el archivo de registros."""
+        with self._lock:
+            if self._journal is None:
+                self._journal = PunchJournal(self.records_path, RECORD_COLUMNS).open()
+            return self._journal
+
+    def append_record(self, record):
+        """Anexa un registro al diario."""
+        return self.get_journal().append(record)
+
+    def append_records(self, records):
+        """Anexa varios registros con una sola escritura; retorna sus posiciones."""
+        return self.get_journal().append_many(records)
+
+    def close(self):
+        """Cierra el diario de marcas (se reabre en la próxima escritura)."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
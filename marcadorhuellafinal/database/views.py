@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from database import data_handler
+
+
+class JournalView(ABC):
+    """Vista derivada del diario de marcas, mantenida en memoria de forma incremental.
+
+    Se persiste como una instantánea JSON junto con la posición del último
+    registro aplicado (byte en el CSV, id en SQLite) y la época del backend,
+    que cambia cuando se archivan meses del CSV. Al cargarse aplica sólo
+    los registros posteriores a esa posición; sin instantánea válida se
+    reconstruye recorriendo el diario una sola vez.
+    """
+
+    # Cambia cuando el CSV de registros gana columnas (se mueven las posiciones en bytes):
+    # 2 agregó Lector y 3 agregó Clave
+    version = 3
+
+    def __init__(self, path, save_every=200):
+        self.path = path
+        self.save_every = save_every
+        self.position = None
+        self._pending = 0
+        self.storage = None
+        self._lock = threading.RLock()
+        self.reset()
+
+    # Métodos que implementa cada vista
+    @abstractmethod
+    def reset(self):
+        """Deja la vista vacía, como antes del primer registro."""
+
+    @abstractmethod
+    def apply(self, record):
+        """Incorpora un registro del diario."""
+
+    @abstractmethod
+    def state(self):
+        """Estado serializable en JSON para la instantánea."""
+
+    @abstractmethod
+    def restore(self, state):
+        """Recupera el estado guardado por `state`."""
+
+    def load(self, storage):
+        """Carga la instantánea (si corresponde al backend) y aplica los registros pendientes."""
+        with self._lock:
+            self.storage = storage
+            self.reset()
+            self.position = 0
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                if (snapshot.get("version") == self.version and snapshot.get("storage") == storage.name
+                        and snapshot.get("epoch", 0) == storage.epoch):
+                    self.restore(snapshot["state"])
+                    self.position = snapshot["position"]
+            except (OSError, ValueError, KeyError, TypeError):
+                self.reset()
+                self.position = 0
+            self._catch_up(storage)
+        return self
+
+    def rebuild(self, storage):
+        """Reconstruye la vista recorriendo todo el diario en una pasada."""
+        with self._lock:
+            self.storage = storage
+            self.reset()
+            self.position = 0
+            self._catch_up(storage)
+            self.save()
+        return self
+
+    def _catch_up(self, storage):
+        applied = 0
+        for record, position in storage.scan_records(self.position):
+            self.apply(record)
+            self.position = position
+            applied += 1
+        if applied:
+            self.save()
+
+    def record_appended(self, record, position):
+        """Aplica un registro recién anexado (ignora posiciones ya aplicadas)."""
+        with self._lock:
+            if self.position is None or position is None or position <= self.position:
+                return
+            self.apply(record)
+            self.position = position
+            self._pending += 1
+            if self._pending >= self.save_every:
+                self.save()
+
+    def save(self):
+        """Guarda la instantánea de forma atómica."""
+        with self._lock:
+            if self.position is None:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "storage": self.storage.name, "epoch": self.storage.epoch,
+                           "position": self.position, "state": self.state()}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._pending = 0
+
+
+def attach_view(current, factory):
+    """Retorna la vista `current` si sigue ligada al backend activo; si no, crea, registra y carga otra.
+
+    `factory(storage)` construye la vista; se registra antes de cargarla para
+    no perder marcas anexadas mientras se recorre el diario.
+    """
+    storage = data_handler.get_storage()
+    if current is not None and current.storage is storage:
+        return current
+    if current is not None:
+        data_handler.unregister_view(current)
+    view = factory(storage)
+    data_handler.register_view(view)
+    return view.load(storage)
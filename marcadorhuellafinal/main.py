@@ -3,3 +3,5 @@ import app
 if __name__ == "__main__":
     application = app.RelojControlApp()
     application.mainloop()
+    from database import data_handler
+    data_handler.close_storage()
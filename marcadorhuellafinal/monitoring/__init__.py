@@ -0,0 +1 @@
+# This file makes 'monitoring' a Python package.
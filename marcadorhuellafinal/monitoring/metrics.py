@@ -0,0 +1,193 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Etapas del registro de una marca, desde que el lector detecta el dedo hasta el panel verde del kiosko.
+# La espera del lector (sin dedo) se mide aparte y no forma parte del total.
+STAGE_CAPTURE_WAIT = "espera_lector"
+STAGE_CAPTURE = "captura"
+STAGE_IDENTIFY = "identificacion"
+STAGE_PERSIST = "persistencia"
+STAGE_UI = "interfaz"
+STAGE_TOTAL = "total"
+STAGES = (STAGE_CAPTURE_WAIT, STAGE_CAPTURE, STAGE_IDENTIFY, STAGE_PERSIST, STAGE_UI, STAGE_TOTAL)
+
+# Arranque del kiosko, medido desde el inicio del proceso
+STAGE_BOOT_SCREEN = "arranque_pantalla"
+STAGE_BOOT_READY = "arranque_listo"
+STAGE_BOOT_FIRST_PUNCH = "arranque_primera_marca"
+
+# Servicio de ingesta central: desde que llega un lote de marcas hasta que es durable
+STAGE_INGEST = "ingesta"
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Límites de los buckets: de 0,1 ms a ~100 s, cuatro por cada duplicación (error relativo < 10%)
+BUCKET_BOUNDS = tuple(0.0001 * 2 ** (i / 4) for i in range(81))
+
+PROMETHEUS_PREFIX = "reloj"
+
+
+class LatencyHistogram:
+    """Histograma de latencias con buckets logarítmicos fijos (memoria constante)."""
+
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        self.bounds = bounds
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        """Registra una duración en segundos."""
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Cuantil aproximado (interpolación geométrica dentro del bucket)."""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                if count and seen + count >= rank:
+                    if index >= len(self.bounds):
+                        return self.max
+                    upper = self.bounds[index]
+                    lower = self.bounds[index - 1] if index else upper / 2
+                    fraction = (rank - seen) / count
+                    return min(lower * (upper / lower) ** fraction, self.max)
+                seen += count
+            return self.max
+
+    def summary(self):
+        """Cantidad, promedio, máximo y cuantiles (segundos)."""
+        result = {"count": self.count, "mean": self.total / self.count if self.count else 0.0, "max": self.max}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = self.quantile(q)
+        return result
+
+
+class MetricsRegistry:
+    """Histogramas de latencia por etapa y contadores del kiosko."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.time()
+
+    def reset(self):
+        """Descarta las mediciones acumuladas."""
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.started = time.time()
+
+    def histogram(self, stage):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            return histogram
+
+    def observe(self, stage, seconds):
+        self.histogram(stage).observe(seconds)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, stage):
+        """Mide la duración del bloque y la registra en la etapa (también si lanza una excepción)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Estado actual como diccionario serializable."""
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+        return {
+            "desde": self.started,
+            "generado": time.time(),
+            "latencias": {stage: histogram.summary() for stage, histogram in histograms.items()},
+            "contadores": counters,
+        }
+
+    def to_prometheus(self):
+        """Métricas en el formato de texto de Prometheus."""
+        name = f"{PROMETHEUS_PREFIX}_latencia_segundos"
+        lines = [f"# HELP {name} Latencia por etapa del registro de marcas", f"# TYPE {name} histogram"]
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        for stage, histogram in histograms:
+            with histogram._lock:
+                counts, count, total = list(histogram.counts), histogram.count, histogram.total
+            cumulative = 0
+            for bound, bucket in zip(histogram.bounds, counts):
+                cumulative += bucket
+                lines.append(f'{name}_bucket{{etapa="{stage}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{etapa="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{etapa="{stage}"}} {total:.6f}')
+            lines.append(f'{name}_count{{etapa="{stage}"}} {count}')
+        for counter, value in counters:
+            metric = f"{PROMETHEUS_PREFIX}_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Guarda las métricas: JSON si la extensión es .json, texto Prometheus en otro caso."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            if path.lower().endswith(".json"):
+                json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+            else:
+                f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def format_table(self):
+        """Tabla de texto (ms) para mostrar en el panel de administración."""
+        snapshot = self.snapshot()
+        lines = [f"{'Etapa':<16}{'n':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'máx':>10}"]
+        stages = [s for s in STAGES if s in snapshot["latencias"]]
+        stages += sorted(set(snapshot["latencias"]) - set(STAGES))
+        for stage in stages:
+            s = snapshot["latencias"][stage]
+            lines.append(f"{stage:<16}{s['count']:>8}" + "".join(
+                f"{s[key] * 1000:>10.1f}" for key in ("p50", "p95", "p99", "max")))
+        if snapshot["contadores"]:
+            lines.append("")
+            lines.extend(f"{name:<32}{value:>8}" for name, value in sorted(snapshot["contadores"].items()))
+        return "\n".join(lines)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics():
+    """Registro de métricas del proceso."""
+    return _metrics
+
+
+def timed(stage):
+    """Atajo para `get_metrics().timer(stage)`."""
+    return _metrics.timer(stage)
@@ -3,6 +3,10 @@ import sys
 import ctypes
 from ctypes import *
 import platform
+import threading
+
+from sensors.devices import ReaderDevice
+from sensors.template_store import TEMPLATE_SIZE
 
 # Configuración de rutas para las DLLs
 LOCAL_DLL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dll")
@@ -54,10 +58,6 @@ def show_troubleshooting_guide():
     print(f"   - Arquitectura: {platform.architecture()[0]}")
     print(f"   - Python: {platform.python_version()}")
 
-# Carga las DLLs al importar el módulo
-if not load_dlls():
-    sys.exit(1)
-
 # Definiciones de tipos y estructuras necesarias
 DPFPDD_VERSION = ctypes.c_ushort * 3
 DPFPDD_DEV_INFO = ctypes.c_void_p
@@ -66,15 +66,6 @@ DPFPDD_DEV_CAPS = ctypes.c_uint
 # Constantes
 DPFPDD_SUCCESS = 0x0000
 
-# Prototipos de funciones
-dpfpdd_init = dpfpdd.dpfpdd_init
-dpfpdd_init.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_uint]
-dpfpdd_init.restype = ctypes.c_int
-
-dpfpdd_exit = dpfpdd.dpfpdd_exit
-dpfpdd_exit.argtypes = [ctypes.c_void_p]
-dpfpdd_exit.restype = ctypes.c_int
-
 # Definiciones para la captura de huellas
 class DPFP_FEATURE_TYPE:
     DPFP_FT_FINGERPRINT = 1
@@ -87,23 +78,86 @@ class DPFP_CAPTURE_RESULT(Structure):
                 ("quality", c_int),
                 ("status", c_int)]
 
-# Funciones para captura de huellas
-dpfpad_create = dpfpad.dpfpad_create
-dpfpad_create.argtypes = [c_int, c_int, c_void_p]
-dpfpad_create.restype = c_void_p
+# Largo de la muestra: el resultado de dpfpad_capture no informa su tamaño, así que se copia
+# un largo fijo (ajustable por lector con `sample_size`)
+DEFAULT_SAMPLE_SIZE = TEMPLATE_SIZE
+# Buffers del anillo de captura: una muestra sigue válida durante las siguientes N-1 capturas
+CAPTURE_BUFFERS = 4
+
+class CaptureBufferRing:
+    """Anillo de buffers ctypes preasignados para las muestras del lector.
+
+    Cada captura copia la muestra del SDK al siguiente buffer y la entrega
+    como memoryview de su largo real, sin crear objetos bytes. La vista se
+    sobrescribe cuando el anillo da la vuelta; quien necesite conservarla
+    (p. ej. el enrolamiento) debe copiarla.
+    """
+
+    def __init__(self, buffers=CAPTURE_BUFFERS, capacity=DEFAULT_SAMPLE_SIZE):
+        self.capacity = capacity
+        self._buffers = [(ctypes.c_ubyte * capacity)() for _ in range(buffers)]
+        self._views = [memoryview(buffer).cast('B') for buffer in self._buffers]
+        self._next = 0
+
+    def __len__(self):
+        return len(self._buffers)
 
-dpfpad_capture = dpfpad.dpfpad_capture
-dpfpad_capture.argtypes = [c_void_p, c_int, POINTER(DPFP_CAPTURE_RESULT)]
-dpfpad_capture.restype = c_int
+    def fill(self, address, length):
+        """Copia `length` bytes desde `address` al siguiente buffer y retorna su vista."""
+        if length > self.capacity:
+            raise RuntimeError(f"Muestra de {length} bytes excede el buffer de captura de {self.capacity}")
+        index = self._next
+        self._next = (index + 1) % len(self._buffers)
+        ctypes.memmove(self._buffers[index], address, length)
+        return self._views[index][:length]
 
-dpfpad_destroy = dpfpad.dpfpad_destroy
-dpfpad_destroy.argtypes = [c_void_p]
-dpfpad_destroy.restype = None
+# Las DLLs se cargan al crear el primer lector: importar el módulo no toca el SDK
+dpfpdd = dpfpad = None
+_sdk_loaded = False
+_sdk_lock = threading.Lock()
 
-class FingerprintReader:
-    def __init__(self):
+def load_sdk():
+    """Carga las DLLs y declara los prototipos del SDK (una sola vez)"""
+    global _sdk_loaded, dpfpdd_init, dpfpdd_exit, dpfpad_create, dpfpad_capture, dpfpad_destroy
+    with _sdk_lock:
+        if _sdk_loaded:
+            return
+        if not load_dlls():
+            raise RuntimeError("No se pudieron cargar las DLLs del lector DigitalPersona")
+
+        # Prototipos de funciones
+        dpfpdd_init = dpfpdd.dpfpdd_init
+        dpfpdd_init.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_uint]
+        dpfpdd_init.restype = ctypes.c_int
+
+        dpfpdd_exit = dpfpdd.dpfpdd_exit
+        dpfpdd_exit.argtypes = [ctypes.c_void_p]
+        dpfpdd_exit.restype = ctypes.c_int
+
+        # Funciones para captura de huellas
+        dpfpad_create = dpfpad.dpfpad_create
+        dpfpad_create.argtypes = [c_int, c_int, c_void_p]
+        dpfpad_create.restype = c_void_p
+
+        dpfpad_capture = dpfpad.dpfpad_capture
+        dpfpad_capture.argtypes = [c_void_p, c_int, POINTER(DPFP_CAPTURE_RESULT)]
+        dpfpad_capture.restype = c_int
+
+        dpfpad_destroy = dpfpad.dpfpad_destroy
+        dpfpad_destroy.argtypes = [c_void_p]
+        dpfpad_destroy.restype = None
+        _sdk_loaded = True
+
+class FingerprintReader(ReaderDevice):
+    def __init__(self, buffers=CAPTURE_BUFFERS, sample_size=DEFAULT_SAMPLE_SIZE):
         self.handle = ctypes.c_void_p()
         self.ad_handle = None
+        # Resultado y buffers reutilizados en cada captura (el proceso corre semanas sin reiniciarse)
+        self._result = DPFP_CAPTURE_RESULT()
+        self._result_ref = byref(self._result)
+        self._ring = CaptureBufferRing(buffers, sample_size)
+        self._capture_lock = threading.Lock()
+        load_sdk()
         self.initialize_reader()
     
     def initialize_reader(self):
@@ -127,23 +181,35 @@ class FingerprintReader:
     
     def capture_fingerprint(self, timeout=10000):
         """Captura una huella digital"""
+        sample = self.capture_sample(timeout)
+        return sample[0] if sample else None
+
+    def capture_sample(self, timeout=10000):
+        """Captura una huella digital; retorna (muestra, None).
+
+        La muestra es un memoryview de `sample_size` bytes sobre un buffer del
+        anillo de captura. El resultado de dpfpad_capture sólo trae indicadores
+        de calidad (una captura con problemas se rechaza por `status`), no un
+        puntaje: la calidad se retorna como None y el enrolamiento usa su
+        propia estimación.
+        """
         try:
-            result = DPFP_CAPTURE_RESULT()
-            ret = dpfpad_capture(self.ad_handle, timeout, byref(result))
-            
-            if ret != DPFPDD_SUCCESS:
-                raise RuntimeError(f"Error en captura: {ret}")
-            
-            if result.status != DPFPDD_SUCCESS:
-                raise RuntimeError(f"Calidad de huella insuficiente: {result.quality}")
-            
-            # Convertir el sample a bytes (esto puede variar según tu SDK)
-            sample_size = 2048  # Ajusta según tu dispositivo
-            sample_data = string_at(result.sample, sample_size)
-            
-            return sample_data
+            with self._capture_lock:
+                result = self._result
+                result.sample = None
+                ret = dpfpad_capture(self.ad_handle, timeout, self._result_ref)
+
+                if ret != DPFPDD_SUCCESS:
+                    raise RuntimeError(f"Error en captura: {ret}")
+
+                if result.status != DPFPDD_SUCCESS:
+                    raise RuntimeError(f"Calidad de huella insuficiente: {result.quality}")
+                if not result.sample:
+                    return None
+
+                return self._ring.fill(result.sample, self._ring.capacity), None
         except Exception as e:
-            print(f"Error en capture_fingerprint: {str(e)}", file=sys.stderr)
+            print(f"Error en capture_sample: {str(e)}", file=sys.stderr)
             raise
     
     def verify(self, template1, template2, threshold=80):
@@ -152,18 +218,30 @@ class FingerprintReader:
         similarity = self._calculate_similarity(template1, template2)
         return similarity >= threshold, similarity
     
+    def identify(self, template, gallery, threshold=80):
+        """Identifica un template contra una galería de usuarios enrolados"""
+        return gallery.identify(template, threshold)
+    
     def _calculate_similarity(self, template1, template2):
         """Calcula similitud entre templates (implementación simplificada)"""
         # En una implementación real, usarías las funciones del SDK
-        from difflib import SequenceMatcher
-        return SequenceMatcher(None, template1, template2).ratio() * 100
+        from sensors.matcher import similarity
+        return similarity(template1, template2)
     
-    def __del__(self):
-        """Libera recursos al destruir el objeto"""
+    def close(self):
+        """Libera el capturador y el lector"""
+        if not _sdk_loaded:
+            return
         if self.ad_handle:
             dpfpad_destroy(self.ad_handle)
+            self.ad_handle = None
         if hasattr(self, 'handle') and self.handle:
             dpfpdd_exit(self.handle)
+            self.handle = ctypes.c_void_p()
+
+    def __del__(self):
+        """Libera recursos al destruir el objeto"""
+        self.close()
 
 # Funciones de interfaz para tu test
 _device_instance = None
@@ -178,4 +256,9 @@ def get_biometric_device():
 def capture_fingerprint():
     """Captura una huella digital"""
     device = get_biometric_device()
-    return device.capture_fingerprint()
\ No newline at end of file
+    return device.capture_fingerprint()
+
+def capture_sample():
+    """Captura una huella digital con su calidad, para el enrolamiento"""
+    device = get_biometric_device()
+    return device.capture_sample()
\ No newline at end of file
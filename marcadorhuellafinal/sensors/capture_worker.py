@@ -0,0 +1,119 @@
+import queue
+import threading
+import time
+
+from monitoring.metrics import STAGE_CAPTURE, STAGE_CAPTURE_WAIT, get_metrics
+
+# Tipos de resultado que el hilo publica en la cola
+RESULT_VERIFIED = "verificado"
+RESULT_FAILED = "fallido"
+RESULT_ERROR = "error"
+
+
+class CaptureWorker(threading.Thread):
+    """Hilo dedicado a capturar e identificar huellas fuera del bucle de Tk.
+
+    Los resultados se publican en una cola thread-safe como tuplas
+    (tipo, usuario, mensaje); la interfaz la revisa periódicamente con
+    `after` sin bloquearse aunque el lector espere una captura.
+
+    `touch_time()` (opcional) retorna cuándo el lector detectó el dedo en la
+    última captura; sin él, la marca se mide desde que llega la muestra.
+    """
+
+    def __init__(self, capture, verify, results=None, cooldown=3, idle_delay=0.5, error_delay=2,
+                 name="CaptureWorker", touch_time=None):
+        super().__init__(name=name, daemon=True)
+        self.capture = capture
+        self.verify = verify
+        self.touch_time = touch_time
+        self.results = results if results is not None else queue.Queue()
+        self.cooldown = cooldown
+        self.idle_delay = idle_delay
+        self.error_delay = error_delay
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+        # Aumenta con cada pausa: una muestra capturada durante una pausa se descarta
+        self._pauses = 0
+
+    @property
+    def scanning(self):
+        return self._active.is_set()
+
+    def resume(self):
+        """Reanuda la captura."""
+        self._active.set()
+
+    def pause(self):
+        """Pausa la captura; la muestra del intento en curso (si llega) se descarta."""
+        self._pauses += 1
+        self._active.clear()
+
+    def stop(self):
+        """Termina el hilo después del intento en curso."""
+        self._stopped.set()
+        self._active.set()
+
+    def _wait(self, seconds):
+        self._stopped.wait(seconds)
+
+    def run(self):
+        while not self._stopped.is_set():
+            if not self._active.wait(timeout=0.5) or self._stopped.is_set():
+                continue
+            # SystemExit también se captura: un error del lector no debe cerrar el kiosko
+            metrics = get_metrics()
+            start = time.perf_counter()
+            pauses = self._pauses
+            try:
+                sample = self.capture()
+            except (Exception, SystemExit) as e:
+                metrics.increment("errores_lector")
+                self.results.put((RESULT_ERROR, None, str(e) or "Error al cargar el lector"))
+                self._wait(self.error_delay)
+                continue
+
+            if not sample:
+                self._wait(self.idle_delay)
+                continue
+            if pauses != self._pauses or self._stopped.is_set():
+                # El lector se pausó (p. ej. para enrolar) mientras se esperaba el dedo:
+                # la muestra es de otra persona o de otro uso y no se verifica
+                metrics.increment("muestras_descartadas")
+                continue
+            sampled = time.perf_counter()
+            touched = self.touch_time() if self.touch_time is not None else None
+            if touched is None or not start <= touched <= sampled:
+                touched = sampled
+            else:
+                metrics.observe(STAGE_CAPTURE, sampled - touched)
+            metrics.observe(STAGE_CAPTURE_WAIT, touched - start)
+
+            try:
+                success, user_info, message = self.verify(sample)
+            except (Exception, SystemExit) as e:
+                metrics.increment("errores_verificacion")
+                self.results.put((RESULT_ERROR, None, str(e)))
+                self._wait(self.error_delay)
+                continue
+
+            if success and user_info is not None:
+                if isinstance(user_info.get("Tiempos"), dict):
+                    # El total de la marca se mide desde el toque del dedo
+                    user_info["Tiempos"]["toque"] = touched
+                metrics.increment("marcas_verificadas")
+                self.results.put((RESULT_VERIFIED, user_info, message))
+            else:
+                metrics.increment("huellas_rechazadas")
+                self.results.put((RESULT_FAILED, None, message))
+            # Enfriamiento entre verificaciones
+            self._wait(self.cooldown)
+
+    def drain(self):
+        """Retorna (sin bloquear) todos los resultados pendientes."""
+        pending = []
+        while True:
+            try:
+                pending.append(self.results.get_nowait())
+            except queue.Empty:
+                return pending
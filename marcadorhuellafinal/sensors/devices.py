@@ -0,0 +1,275 @@
+import base64
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from sensors.template_store import TEMPLATE_SIZE
+
+# Tipos de lector configurables con "reader_device" en config.json
+DEVICE_DPFP = "dpfp"
+DEVICE_SIMULATED = "simulado"
+DEVICE_REPLAY = "replay"
+DEFAULT_DEVICE = DEVICE_DPFP
+# Variable de entorno que tiene prioridad sobre config.json (p. ej. en equipos de prueba Linux)
+DEVICE_ENV = "RELOJ_READER"
+# Varios lectores en un mismo proceso: "readers" en config.json ({lector: dispositivo})
+# o RELOJ_READERS="Principal=dpfp,Patio=simulado"
+READERS_ENV = "RELOJ_READERS"
+# Lector que se usa cuando sólo hay uno configurado
+DEFAULT_READER_ID = "Principal"
+
+
+class ReaderDevice(ABC):
+    """Interfaz común de los lectores de huella.
+
+    `capture_sample` retorna (template, calidad) o None si nadie puso el dedo
+    antes del timeout (en milisegundos, como el SDK); la calidad va de 0 a
+    100, o es None si el lector no informa un puntaje. Los lectores
+    que saben cuándo se apoyó el dedo lo dejan en `touched_at`
+    (time.perf_counter) para separar la espera de la adquisición.
+    """
+
+    touched_at = None
+
+    @abstractmethod
+    def capture_sample(self, timeout=10000):
+        """Captura una muestra: (template, calidad) o None si venció el timeout."""
+
+    def capture_fingerprint(self, timeout=10000):
+        """Captura sólo el template (None si no hubo captura)."""
+        sample = self.capture_sample(timeout)
+        return sample[0] if sample else None
+
+    def close(self):
+        pass
+
+
+class SyntheticSource:
+    """Lecturas sintéticas: cada muestra es una copia ruidosa del template de un usuario al azar."""
+
+    def __init__(self, ids, templates, noise=0.05, seed=None):
+        self.ids = list(ids)
+        self.templates = templates
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+        self.last_id = None
+
+    @classmethod
+    def from_store(cls, store, noise=0.05, seed=None):
+        """Fuente con los usuarios enrolados en el almacén de templates."""
+        ids = store.ids()
+        return cls(ids, [store.get(user_id) for user_id in ids], noise, seed)
+
+    def next_sample(self, quality):
+        """Retorna (template, None); la calidad baja aumenta el ruido de la lectura."""
+        noise = min(self.noise * (1 + (100 - quality) / 25), 1.0)
+        if not self.ids:
+            self.last_id = None
+            return self.rng.integers(0, 256, TEMPLATE_SIZE, dtype=np.uint8).tobytes(), None
+        index = int(self.rng.integers(len(self.ids)))
+        self.last_id = self.ids[index]
+        template = np.frombuffer(self.templates[index], dtype=np.uint8).copy()
+        changed = self.rng.random(template.size) < noise
+        template[changed] = self.rng.integers(0, 256, int(changed.sum()), dtype=np.uint8)
+        return template.tobytes(), None
+
+
+class ReplaySource:
+    """Reproduce un flujo grabado con `record_stream` (una captura JSON por línea)."""
+
+    def __init__(self, path, loop=True):
+        self.path = path
+        self.loop = loop
+        with open(path, "r", encoding="utf-8") as f:
+            self.samples = [json.loads(line) for line in f if line.strip()]
+        if not self.samples:
+            raise ValueError(f"Flujo de capturas vacío: {path}")
+        self._position = 0
+        self.last_id = None
+
+    def next_sample(self, quality):
+        """Retorna (template, calidad grabada); la calidad recibida se ignora."""
+        if self._position >= len(self.samples):
+            if not self.loop:
+                return None, None
+            self._position = 0
+        sample = self.samples[self._position]
+        self._position += 1
+        self.last_id = sample.get("id")
+        return base64.b64decode(sample["template"]), sample.get("quality")
+
+
+def record_stream(path, samples):
+    """Graba capturas [(template, calidad, id esperado o None), ...] para reproducirlas después."""
+    with open(path, "w", encoding="utf-8") as f:
+        for template, quality, user_id in samples:
+            f.write(json.dumps({"template": base64.b64encode(bytes(template)).decode("ascii"),
+                                "quality": quality, "id": user_id}) + "\n")
+
+
+class SimulatedReader(ReaderDevice):
+    """Lector por software para pruebas y carga sin hardware ni DLLs.
+
+    Las llegadas de dedos siguen un proceso de Poisson de `rate` marcas por
+    minuto (None = siempre hay un dedo esperando); cada captura demora
+    `latency` segundos más un jitter uniforme, y la calidad se sortea de una
+    normal (media, desviación) acotada a 0-100.
+    """
+
+    def __init__(self, source, rate=None, latency=0.05, jitter=0.02, quality=(85, 10), seed=None):
+        self.source = source
+        self.rate = rate
+        self.latency = latency
+        self.jitter = jitter
+        self.quality = quality
+        self.rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._next_arrival = time.monotonic()
+        self.captured = 0
+        self._closed = threading.Event()
+
+    def _schedule_next(self):
+        # Las llegadas no dependen del lector: si está ocupado, las personas se acumulan en la fila
+        if self.rate:
+            self._next_arrival += self.rng.exponential(60 / self.rate)
+
+    @property
+    def backlog(self):
+        """Segundos de atraso de la fila respecto de las llegadas (0 si el lector está al día)."""
+        return max(0.0, time.monotonic() - self._next_arrival)
+
+    def capture_sample(self, timeout=10000):
+        with self._lock:
+            wait = self._next_arrival - time.monotonic()
+            if wait > timeout / 1000:
+                self._closed.wait(timeout / 1000)
+                return None
+            if wait > 0 and self._closed.wait(wait):
+                return None
+            self.touched_at = time.perf_counter()
+            delay = self.latency + self.rng.uniform(0, self.jitter) if self.latency else 0
+            if delay and self._closed.wait(delay):
+                return None
+            mean, sd = self.quality
+            quality = float(np.clip(self.rng.normal(mean, sd), 0, 100))
+            template, recorded_quality = self.source.next_sample(quality)
+            if template is None:
+                return None
+            self._schedule_next()
+            self.captured += 1
+            return template, quality if recorded_quality is None else recorded_quality
+
+    @property
+    def last_id(self):
+        """ID del usuario al que corresponde la última muestra (para medir aciertos)."""
+        return self.source.last_id
+
+    def close(self):
+        self._closed.set()
+
+
+_readers = None
+_reader_lock = threading.Lock()
+
+
+def _load_config():
+    from database import data_handler
+    try:
+        with open(os.path.join(data_handler.DATA_DIR, data_handler.CONFIG_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _configured_device():
+    device = os.environ.get(DEVICE_ENV)
+    if device:
+        return device
+    return _load_config().get("reader_device") or DEFAULT_DEVICE
+
+
+def configured_readers():
+    """Lectores configurados como {lector: dispositivo}, en orden; el primero es el principal."""
+    spec = os.environ.get(READERS_ENV)
+    if spec:
+        readers = {}
+        for item in spec.split(","):
+            reader_id, _, device = item.partition("=")
+            if not device:
+                raise ValueError(f"Lector mal definido en {READERS_ENV}: {item}")
+            readers[reader_id.strip()] = device.strip()
+        return readers
+    readers = None if os.environ.get(DEVICE_ENV) else _load_config().get("readers")
+    return dict(readers) if readers else {DEFAULT_READER_ID: _configured_device()}
+
+
+def create_reader(device):
+    """Crea el lector indicado: 'dpfp', 'simulado' o 'replay:<ruta del flujo>'."""
+    if device == DEVICE_DPFP:
+        from sensors.biometric import get_biometric_device
+        return get_biometric_device()
+    if device == DEVICE_SIMULATED:
+        from sensors.template_store import get_template_store
+        return SimulatedReader(SyntheticSource.from_store(get_template_store()), rate=6, latency=0.3)
+    if device.startswith(DEVICE_REPLAY + ":"):
+        return SimulatedReader(ReplaySource(device.split(":", 1)[1]), rate=6, latency=0.3)
+    raise ValueError(f"Lector desconocido: {device}")
+
+
+def create_readers(devices):
+    """Crea los lectores de {lector: dispositivo}; el SDK de DigitalPersona atiende un solo lector."""
+    if sum(device == DEVICE_DPFP for device in devices.values()) > 1:
+        raise ValueError("El SDK de DigitalPersona de este equipo sólo atiende un lector por proceso")
+    readers = {}
+    try:
+        for reader_id, device in devices.items():
+            readers[reader_id] = create_reader(device)
+    except Exception:
+        for reader in readers.values():
+            reader.close()
+        raise
+    return readers
+
+
+def get_readers():
+    """Lectores configurados como {lector: ReaderDevice} (se crean en el primer uso)."""
+    global _readers
+    with _reader_lock:
+        if _readers is None:
+            _readers = create_readers(configured_readers())
+        return dict(_readers)
+
+
+def get_reader():
+    """Lector principal (el primero configurado)."""
+    return next(iter(get_readers().values()))
+
+
+def set_readers(readers):
+    """Reemplaza los lectores activos {lector: ReaderDevice}; None vuelve a los configurados."""
+    global _readers
+    with _reader_lock:
+        keep = list(readers.values()) if readers else []
+        for reader in (_readers or {}).values():
+            if not any(reader is other for other in keep):
+                reader.close()
+        _readers = dict(readers) if readers else None
+
+
+def set_reader(reader):
+    """Reemplaza el lector activo (pruebas y arneses de carga); None vuelve al configurado."""
+    set_readers(None if reader is None else {DEFAULT_READER_ID: reader})
+
+
+def capture_fingerprint():
+    """Captura un template con el lector configurado (None si no hubo dedo)."""
+    return get_reader().capture_fingerprint()
+
+
+def capture_sample():
+    """Captura (template, calidad) con el lector configurado."""
+    return get_reader().capture_sample()
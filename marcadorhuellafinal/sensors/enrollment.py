@@ -0,0 +1,150 @@
+import queue
+import threading
+
+import numpy as np
+
+from sensors.matcher import extract_features
+
+# Mensajes que publica el hilo de enrolamiento
+ENROLL_SAMPLE = "muestra"
+ENROLL_REJECTED = "rechazada"
+ENROLL_DONE = "listo"
+ENROLL_ERROR = "error"
+
+DEFAULT_SAMPLES = 3
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_MIN_QUALITY = 40
+# Similitud promedio mínima entre la referencia y las demás muestras aceptadas
+DEFAULT_MIN_CONSISTENCY = 60
+
+
+def _as_bytes(template):
+    """Normaliza un template (str, bytes, memoryview o arreglo uint8) a bytes."""
+    if isinstance(template, str):
+        return template.encode("latin-1")
+    return bytes(memoryview(template))
+
+
+def estimate_quality(template):
+    """Calidad (0-100) estimada del template: entropía normalizada de sus bytes.
+
+    Capturas vacías, saturadas o truncadas tienen poca variedad de valores y
+    quedan con puntaje bajo.
+    """
+    data = np.frombuffer(_as_bytes(template), dtype=np.uint8)
+    if data.size < 2:
+        return 0.0
+    counts = np.bincount(data, minlength=256)
+    p = counts[counts > 0] / data.size
+    entropy = float(-(p * np.log2(p)).sum())
+    return min(entropy / min(8.0, np.log2(data.size)), 1.0) * 100
+
+
+class EnrollmentSession:
+    """Acumula varias muestras de una huella y elige la referencia a enrolar.
+
+    Las muestras de baja calidad se descartan apenas llegan (antes de extraer
+    características). La referencia es la muestra más parecida al resto
+    (medoide por similitud coseno), y se exige que las muestras sean
+    consistentes entre sí.
+    """
+
+    def __init__(self, samples=DEFAULT_SAMPLES, min_quality=DEFAULT_MIN_QUALITY,
+                 min_consistency=DEFAULT_MIN_CONSISTENCY):
+        self.samples = samples
+        self.min_quality = min_quality
+        self.min_consistency = min_consistency
+        self._templates = []
+        self._vectors = []
+
+    @property
+    def complete(self):
+        return len(self._templates) >= self.samples
+
+    @property
+    def accepted(self):
+        return len(self._templates)
+
+    def add_sample(self, template, quality=None):
+        """Agrega una muestra; retorna (aceptada, mensaje)."""
+        template = _as_bytes(template) if template is not None else b""
+        if not template:
+            return False, "Captura vacía"
+        score = estimate_quality(template)
+        if quality is not None:
+            score = min(score, float(quality))
+        if score < self.min_quality:
+            return False, f"Calidad insuficiente ({score:.0f}), intente nuevamente"
+        _, vector = extract_features(template)
+        self._templates.append(template)
+        self._vectors.append(vector)
+        return True, f"Muestra {len(self._templates)} de {self.samples} aceptada (calidad {score:.0f})"
+
+    def fuse(self):
+        """Elige la muestra de referencia; retorna (template, consistencia) o lanza ValueError."""
+        if not self._templates:
+            raise ValueError("No hay muestras aceptadas")
+        if len(self._templates) == 1:
+            return self._templates[0], 100.0
+        vectors = np.vstack(self._vectors)
+        scores = np.clip(vectors @ vectors.T, 0, None) * 100
+        np.fill_diagonal(scores, np.nan)
+        mean_scores = np.nanmean(scores, axis=1)
+        best = int(np.argmax(mean_scores))
+        consistency = float(mean_scores[best])
+        if consistency < self.min_consistency:
+            raise ValueError(f"Las muestras no coinciden entre sí ({consistency:.0f}); repita el registro")
+        return self._templates[best], consistency
+
+
+class EnrollmentWorker(threading.Thread):
+    """Hilo que captura las muestras, elige la referencia y la registra.
+
+    Publica en `messages` tuplas (tipo, muestras aceptadas, detalle) para que
+    la interfaz muestre el avance sin bloquearse.
+    """
+
+    def __init__(self, user_id, capture, register, session=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        super().__init__(name="EnrollmentWorker", daemon=True)
+        self.user_id = user_id
+        self.capture = capture
+        self.register = register
+        self.session = session if session is not None else EnrollmentSession()
+        self.max_attempts = max_attempts
+        self.messages = queue.Queue()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Cancela el enrolamiento después de la captura en curso."""
+        self._cancelled.set()
+
+    def run(self):
+        session = self.session
+        try:
+            attempts = 0
+            while not session.complete and attempts < self.max_attempts and not self._cancelled.is_set():
+                attempts += 1
+                try:
+                    sample = self.capture()
+                except Exception as e:
+                    # Una captura fallida cuenta como muestra rechazada
+                    self.messages.put((ENROLL_REJECTED, session.accepted, str(e)))
+                    continue
+                # El lector puede entregar (template, calidad) o sólo el template
+                template, quality = sample if isinstance(sample, tuple) else (sample, None)
+                accepted, message = session.add_sample(template, quality)
+                self.messages.put((ENROLL_SAMPLE if accepted else ENROLL_REJECTED, session.accepted, message))
+
+            if self._cancelled.is_set():
+                self.messages.put((ENROLL_ERROR, session.accepted, "Registro cancelado"))
+                return
+            if not session.complete:
+                self.messages.put((ENROLL_ERROR, session.accepted,
+                                   f"Sólo {session.accepted} de {session.samples} muestras con calidad suficiente"))
+                return
+            template, consistency = session.fuse()
+            success, message = self.register(self.user_id, template)
+            self.messages.put((ENROLL_DONE if success else ENROLL_ERROR, session.accepted,
+                               f"{message} (consistencia {consistency:.0f})" if success else message))
+        except (Exception, SystemExit) as e:
+            self.messages.put((ENROLL_ERROR, session.accepted, str(e) or "Error al capturar la huella"))
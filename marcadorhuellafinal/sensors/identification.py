@@ -0,0 +1,53 @@
+import sys
+import time
+
+from database.punch_state import record_punch
+from database.roster import get_roster
+from monitoring.metrics import STAGE_IDENTIFY, STAGE_PERSIST, get_metrics
+from sensors.template_store import enroll_template, get_gallery
+
+DEFAULT_THRESHOLD = 80
+
+
+def verify_fingerprint(template, threshold=DEFAULT_THRESHOLD):
+    """Identifica un template contra la galería; retorna (success, user_info, message)."""
+    user_id, score = get_gallery().identify(template, threshold)
+    if user_id is None:
+        return False, None, f"Huella no reconocida (puntaje {score:.0f})"
+    user_info = get_roster().get(user_id)
+    if user_info is None:
+        return False, None, f"Huella de un usuario que ya no está registrado: {user_id}"
+    return True, dict(user_info, Puntaje=score), "Huella verificada"
+
+
+def verify_and_record(template, lector=None):
+    """Identifica el template y guarda la marca con la acción que corresponde.
+
+    Es la etapa de verificación del hilo de captura: mide identificación y
+    persistencia, y agrega a los datos del usuario la acción registrada, el
+    lector y los tiempos para medir la actualización de la interfaz.
+    """
+    metrics = get_metrics()
+    sampled = time.perf_counter()
+    with metrics.timer(STAGE_IDENTIFY):
+        success, user_info, message = verify_fingerprint(template)
+    if not success or user_info is None:
+        return success, user_info, message
+    # La acción sale de la tabla de estado, sin releer el historial
+    with metrics.timer(STAGE_PERSIST):
+        saved, message, accion = record_punch(user_info['ID'], user_info['Nombre'], lector=lector)
+    if not saved:
+        metrics.increment("errores_persistencia")
+        return False, None, message
+    timings = {"muestra": sampled, "guardado": time.perf_counter()}
+    return True, dict(user_info, Accion=accion, Lector=lector, Tiempos=timings), message
+
+
+def register_fingerprint(user_id, fingerprint_data):
+    """Guarda el template de un usuario en el almacén binario de templates."""
+    try:
+        enroll_template(user_id, fingerprint_data)
+        return True, "Huella registrada correctamente"
+    except Exception as e:
+        print(f"Error en register_fingerprint: {str(e)}", file=sys.stderr)
+        return False, f"Error al registrar huella: {str(e)}"
@@ -0,0 +1,176 @@
+import threading
+
+import numpy as np
+
+# Dimensión del vector de características y bits de la firma compacta
+FEATURE_DIM = 256
+SIGNATURE_BITS = 64
+
+# Número de candidatos que pasan del prefiltro a la etapa de puntaje fino
+DEFAULT_CANDIDATES = 32
+
+# Proyecciones aleatorias fijas (semilla constante) para la firma SimHash
+_PROJECTION = np.random.default_rng(20250415).standard_normal(
+    (FEATURE_DIM, SIGNATURE_BITS)).astype(np.float32)
+_BIT_WEIGHTS = np.left_shift(np.uint64(1), np.arange(SIGNATURE_BITS, dtype=np.uint64))
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _as_array(template):
+    """Convierte un template (bytes, bytearray, memoryview o str) a un arreglo uint8 sin copiar."""
+    if isinstance(template, str):
+        template = template.encode("latin-1")
+    return np.frombuffer(template, dtype=np.uint8)
+
+
+def _bigram_bins(data):
+    """Asigna cada par de bytes consecutivos a una de las FEATURE_DIM casillas."""
+    codes = (data[..., :-1].astype(np.uint32) << np.uint32(8)) | data[..., 1:]
+    return (codes * np.uint32(2654435761)) >> np.uint32(24)
+
+
+def _finish_features(histograms):
+    """Centra y normaliza los histogramas y calcula sus firmas de 64 bits."""
+    vectors = histograms - histograms.mean(axis=-1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    bits = (vectors @ _PROJECTION) > 0
+    signatures = (bits.astype(np.uint64) * _BIT_WEIGHTS).sum(axis=-1, dtype=np.uint64)
+    return signatures, vectors
+
+
+def extract_features(template):
+    """Extrae la firma compacta y el vector normalizado de un template."""
+    data = _as_array(template)
+    if data.size < 2:
+        return np.uint64(0), np.zeros(FEATURE_DIM, dtype=np.float32)
+    histogram = np.bincount(_bigram_bins(data), minlength=FEATURE_DIM).astype(np.float32)
+    signature, vector = _finish_features(histogram[np.newaxis, :])
+    return signature[0], vector[0]
+
+
+def extract_features_batch(templates):
+    """Extrae características de una matriz (N x largo) de templates en una sola pasada."""
+    data = np.asarray(templates, dtype=np.uint8)
+    if data.ndim != 2 or data.shape[0] == 0:
+        return np.empty(0, dtype=np.uint64), np.empty((0, FEATURE_DIM), dtype=np.float32)
+    rows = data.shape[0]
+    bins = _bigram_bins(data).astype(np.int64)
+    bins += (np.arange(rows, dtype=np.int64) * FEATURE_DIM)[:, np.newaxis]
+    histograms = np.bincount(bins.ravel(), minlength=rows * FEATURE_DIM)
+    histograms = histograms.reshape(rows, FEATURE_DIM).astype(np.float32)
+    return _finish_features(histograms)
+
+
+def hamming_distances(signatures, signature):
+    """Distancia de Hamming entre una firma y un arreglo de firmas."""
+    diff = np.bitwise_xor(signatures, np.uint64(signature))
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(diff)
+    return _POPCOUNT[diff.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def similarity(template1, template2):
+    """Calcula la similitud (0-100) entre dos templates."""
+    _, vector1 = extract_features(template1)
+    _, vector2 = extract_features(template2)
+    return max(float(vector1 @ vector2), 0.0) * 100
+
+
+class FingerprintGallery:
+    """Galería en memoria de templates enrolados para identificación 1:N.
+
+    La identificación se hace en dos etapas: un prefiltro por distancia de
+    Hamming entre firmas de 64 bits sobre toda la galería, y un puntaje fino
+    (similitud coseno) sólo sobre los mejores candidatos.
+    """
+
+    def __init__(self, candidates=DEFAULT_CANDIDATES):
+        self.candidates = candidates
+        self._lock = threading.RLock()
+        self._ids = []
+        self._index = {}
+        self._signatures = np.empty(0, dtype=np.uint64)
+        self._vectors = np.empty((0, FEATURE_DIM), dtype=np.float32)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, user_id):
+        return user_id in self._index
+
+    def _reserve(self, size):
+        """Asegura capacidad para `size` filas duplicando los arreglos si hace falta."""
+        capacity = len(self._signatures)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 64)
+        signatures = np.empty(capacity, dtype=np.uint64)
+        vectors = np.empty((capacity, FEATURE_DIM), dtype=np.float32)
+        count = len(self._ids)
+        signatures[:count] = self._signatures[:count]
+        vectors[:count] = self._vectors[:count]
+        self._signatures, self._vectors = signatures, vectors
+
+    def add(self, user_id, template):
+        """Agrega (o reemplaza) el template de un usuario."""
+        signature, vector = extract_features(template)
+        self._put(user_id, signature, vector)
+
+    def add_many(self, user_ids, templates):
+        """Agrega varios templates del mismo largo extrayendo características en lote."""
+        signatures, vectors = extract_features_batch(templates)
+        with self._lock:
+            self._reserve(len(self._ids) + len(signatures))
+            for user_id, signature, vector in zip(user_ids, signatures, vectors):
+                self._put(user_id, signature, vector)
+
+    def _put(self, user_id, signature, vector):
+        with self._lock:
+            row = self._index.get(user_id)
+            if row is None:
+                row = len(self._ids)
+                self._reserve(row + 1)
+                self._ids.append(user_id)
+                self._index[user_id] = row
+            self._signatures[row] = signature
+            self._vectors[row] = vector
+
+    def remove(self, user_id):
+        """Elimina un usuario moviendo la última fila a su posición."""
+        with self._lock:
+            row = self._index.pop(user_id, None)
+            if row is None:
+                return False
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._ids[row] = moved
+                self._index[moved] = row
+                self._signatures[row] = self._signatures[last]
+                self._vectors[row] = self._vectors[last]
+            self._ids.pop()
+            return True
+
+    def identify(self, template, threshold=80):
+        """Identifica un template contra toda la galería.
+
+        Retorna (user_id, puntaje); user_id es None si ningún candidato
+        alcanza el umbral.
+        """
+        signature, vector = extract_features(template)
+        with self._lock:
+            count = len(self._ids)
+            if count == 0:
+                return None, 0.0
+            if count > self.candidates:
+                distances = hamming_distances(self._signatures[:count], signature)
+                rows = np.argpartition(distances, self.candidates - 1)[:self.candidates]
+            else:
+                rows = np.arange(count)
+            scores = self._vectors[rows] @ vector
+            best = int(np.argmax(scores))
+            score = max(float(scores[best]), 0.0) * 100
+            if score >= threshold:
+                return self._ids[rows[best]], score
+            return None, score
@@ -0,0 +1,63 @@
+import functools
+import queue
+
+from sensors.capture_worker import CaptureWorker
+
+
+class ReaderPool:
+    """Varios lectores (entradas) atendidos por un mismo proceso.
+
+    Cada lector tiene su propio CaptureWorker; todos comparten la galería,
+    la tabla de estado de marcas y la cola de resultados. `verify` recibe
+    el identificador del lector como argumento `lector`, para guardarlo en
+    la marca. Expone la misma interfaz que un CaptureWorker.
+    """
+
+    def __init__(self, readers, verify, results=None, **options):
+        self.readers = dict(readers)
+        self.results = results if results is not None else queue.Queue()
+        self.workers = {
+            reader_id: CaptureWorker(reader.capture_fingerprint, functools.partial(verify, lector=reader_id),
+                                     self.results, name=f"CaptureWorker-{reader_id}",
+                                     touch_time=functools.partial(getattr, reader, "touched_at", None), **options)
+            for reader_id, reader in self.readers.items()
+        }
+
+    def __len__(self):
+        return len(self.workers)
+
+    @property
+    def scanning(self):
+        return any(worker.scanning for worker in self.workers.values())
+
+    def start(self):
+        for worker in self.workers.values():
+            worker.start()
+
+    def resume(self):
+        """Reanuda la captura en todos los lectores."""
+        for worker in self.workers.values():
+            worker.resume()
+
+    def pause(self):
+        """Pausa la captura en todos los lectores (se descartan las muestras en curso)."""
+        for worker in self.workers.values():
+            worker.pause()
+
+    def stop(self):
+        """Termina los hilos después del intento en curso."""
+        for worker in self.workers.values():
+            worker.stop()
+
+    def join(self, timeout=None):
+        for worker in self.workers.values():
+            worker.join(timeout)
+
+    def drain(self):
+        """Retorna (sin bloquear) todos los resultados pendientes de todos los lectores."""
+        pending = []
+        while True:
+            try:
+                pending.append(self.results.get_nowait())
+            except queue.Empty:
+                return pending
@@ -0,0 +1,259 @@
+import os
+import struct
+import sys
+import threading
+
+import numpy as np
+
+TEMPLATE_FILE = "huellas.bin"
+TEMPLATE_SIZE = 2048
+ID_SIZE = 32
+
+_MAGIC = b"RCHT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_HEADER_SIZE = 64
+_MIN_SLOTS = 64
+# Templates por lote al cargar la galería (acota la memoria temporal de la extracción)
+_LOAD_BATCH = 1024
+
+
+def slot_dtype(template_size=TEMPLATE_SIZE):
+    """Estructura de un slot: ID, largo real del template, marca de uso y datos."""
+    return np.dtype([("id", f"S{ID_SIZE}"), ("length", "<u4"), ("used", "u1"), ("_pad", "V11"),
+                     ("data", "u1", (template_size,))])
+
+
+class TemplateStore:
+    """Almacén binario de templates en slots de tamaño fijo de un solo archivo mapeado en memoria.
+
+    El archivo tiene un encabezado y luego los slots; el índice ID→slot se
+    arma al abrir leyendo sólo la columna de IDs. Enrolar una huella escribe
+    un único slot y la matriz de templates se expone sin copias.
+    """
+
+    def __init__(self, path, template_size=TEMPLATE_SIZE):
+        self.path = path
+        self.template_size = template_size
+        self._lock = threading.RLock()
+        self._slots = None
+        self._index = {}
+        self._free = []
+        self._stat = None
+        self.open()
+
+    def open(self):
+        """Abre (o crea) el archivo y reconstruye el índice ID→slot."""
+        with self._lock:
+            if not os.path.exists(self.path):
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "wb") as f:
+                    f.write(_HEADER.pack(_MAGIC, _VERSION, self.template_size).ljust(_HEADER_SIZE, b"\0"))
+                    f.truncate(_HEADER_SIZE + _MIN_SLOTS * slot_dtype(self.template_size).itemsize)
+            with open(self.path, "rb") as f:
+                magic, version, template_size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"Archivo de templates inválido: {self.path}")
+            self.template_size = template_size
+            self._map()
+            used = np.flatnonzero(self._slots["used"])
+            ids = self._slots["id"][used]
+            self._index = {user_id.decode("utf-8"): int(slot) for user_id, slot in zip(ids, used)}
+            self._free = sorted(set(range(len(self._slots))) - set(self._index.values()), reverse=True)
+            self._stat = self._file_stat()
+
+    def _file_stat(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """Relee el índice si el archivo cambió (p. ej. otro proceso enroló huellas); retorna True si lo releyó."""
+        with self._lock:
+            if self._slots is not None and self._file_stat() == self._stat:
+                return False
+            self.close()
+            self.open()
+            return True
+
+    def _map(self):
+        dtype = slot_dtype(self.template_size)
+        capacity = (os.path.getsize(self.path) - _HEADER_SIZE) // dtype.itemsize
+        self._slots = np.memmap(self.path, dtype=dtype, mode="r+", offset=_HEADER_SIZE, shape=(capacity,))
+
+    def _grow(self):
+        """Duplica la cantidad de slots extendiendo el archivo."""
+        capacity = len(self._slots)
+        self._slots.flush()
+        self._slots = None
+        with open(self.path, "r+b") as f:
+            f.truncate(_HEADER_SIZE + capacity * 2 * slot_dtype(self.template_size).itemsize)
+        self._map()
+        self._free = list(range(capacity * 2 - 1, capacity - 1, -1))
+
+    def close(self):
+        with self._lock:
+            if self._slots is not None:
+                self._slots.flush()
+                self._slots = None
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, user_id):
+        return str(user_id) in self._index
+
+    def ids(self):
+        """IDs enrolados en orden de slot."""
+        with self._lock:
+            return sorted(self._index, key=self._index.get)
+
+    def put(self, user_id, template):
+        """Guarda (o reemplaza) el template de un usuario escribiendo un único slot."""
+        user_id = str(user_id)
+        encoded_id = user_id.encode("utf-8")
+        if len(encoded_id) > ID_SIZE:
+            raise ValueError(f"ID demasiado largo para el almacén de templates: {user_id}")
+        data = np.frombuffer(template.encode("latin-1") if isinstance(template, str) else template, dtype=np.uint8)
+        if data.size > self.template_size:
+            raise ValueError(f"Template de {data.size} bytes excede el slot de {self.template_size}")
+        with self._lock:
+            slot = self._index.get(user_id)
+            if slot is None:
+                if not self._free:
+                    self._grow()
+                slot = self._free.pop()
+            slots = self._slots
+            slots["used"][slot] = 0
+            slots["id"][slot] = encoded_id
+            slots["length"][slot] = data.size
+            slots["data"][slot, :data.size] = data
+            slots["data"][slot, data.size:] = 0
+            # Los datos llegan a disco antes que la marca de uso: un corte a medio
+            # escribir deja el slot libre en vez de uno marcado con datos a medias
+            slots.flush()
+            slots["used"][slot] = 1
+            slots.flush()
+            self._index[user_id] = slot
+
+    def get(self, user_id):
+        """Template de un usuario (bytes) o None."""
+        with self._lock:
+            slot = self._index.get(str(user_id))
+            if slot is None:
+                return None
+            return self._slots["data"][slot, :self._slots["length"][slot]].tobytes()
+
+    def delete(self, user_id):
+        """Libera el slot de un usuario."""
+        with self._lock:
+            slot = self._index.pop(str(user_id), None)
+            if slot is None:
+                return False
+            self._slots["used"][slot] = 0
+            self._slots.flush()
+            self._free.append(slot)
+            return True
+
+    def matrix(self):
+        """Matriz (slots x tamaño) de todos los templates, como vista del archivo mapeado."""
+        return self._slots["data"]
+
+    def load_gallery(self, gallery):
+        """Carga todos los templates en una galería extrayendo características en lotes."""
+        with self._lock:
+            slots = sorted(self._index.values())
+            ids = {slot: user_id for user_id, slot in self._index.items()}
+            lengths = self._slots["length"]
+            data = self.matrix()
+            full = [slot for slot in slots if lengths[slot] == self.template_size]
+            for start in range(0, len(full), _LOAD_BATCH):
+                batch = full[start:start + _LOAD_BATCH]
+                # Slots contiguos se pasan como vista del mapa; el resto se copia por índice
+                rows = (data[batch[0]:batch[-1] + 1] if batch[-1] - batch[0] + 1 == len(batch)
+                        else data[batch])
+                gallery.add_many([ids[slot] for slot in batch], rows)
+            for slot in slots:
+                if lengths[slot] != self.template_size:
+                    gallery.add(ids[slot], data[slot, :lengths[slot]])
+        return gallery
+
+
+_store = None
+_store_lock = threading.Lock()
+_gallery = None
+
+
+def import_user_templates(store, users):
+    """Migra los templates guardados como texto en la columna Huella de usuarios.
+
+    Las filas que no caben en un slot (template o ID demasiado largos, o
+    texto que no se puede codificar) se informan y se omiten.
+    """
+    imported = 0
+    for row in users.to_dict("records"):
+        huella = row.get("Huella")
+        if isinstance(huella, str) and huella and huella != "nan" and str(row["ID"]) not in store:
+            try:
+                store.put(row["ID"], huella)
+            except ValueError as e:
+                print(f"[WARN] No se migra el template de {row['ID']}: {e}", file=sys.stderr)
+                continue
+            imported += 1
+    return imported
+
+
+def get_template_store():
+    """Almacén de templates del directorio de datos activo (se crea e importa usuarios la primera vez)."""
+    global _store, _gallery
+    from database import data_handler
+    path = os.path.join(data_handler.DATA_DIR, TEMPLATE_FILE)
+    with _store_lock:
+        if _store is None or _store.path != path:
+            if _store is not None:
+                _store.close()
+                _store = None
+            _gallery = None
+            if not os.path.exists(path):
+                # Se importa en un archivo temporal: el almacén sólo aparece con la migración completa,
+                # y si ésta se interrumpe se repite en el próximo inicio
+                tmp_path = path + ".tmp"
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                staging = TemplateStore(tmp_path)
+                try:
+                    import_user_templates(staging, data_handler.load_users())
+                finally:
+                    staging.close()
+                os.replace(tmp_path, path)
+            _store = TemplateStore(path)
+        return _store
+
+
+def get_gallery():
+    """Galería de identificación cargada desde el almacén de templates."""
+    global _gallery
+    store = get_template_store()
+    with _store_lock:
+        if _gallery is None:
+            from sensors.matcher import FingerprintGallery
+            _gallery = store.load_gallery(FingerprintGallery())
+        return _gallery
+
+
+def enroll_template(user_id, template):
+    """Guarda el template en el almacén y lo agrega a la galería cargada."""
+    get_template_store().put(user_id, template)
+    with _store_lock:
+        if _gallery is not None:
+            _gallery.add(str(user_id), template)
+
+
+def remove_template(user_id):
+    """Elimina el template del almacén y de la galería cargada."""
+    removed = get_template_store().delete(user_id)
+    with _store_lock:
+        if _gallery is not None:
+            _gallery.remove(str(user_id))
+    return removed
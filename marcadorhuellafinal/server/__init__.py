@@ -0,0 +1 @@
+# This file makes 'server' a Python package.
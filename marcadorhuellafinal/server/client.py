@@ -0,0 +1,96 @@
+import base64
+import itertools
+import socket
+import threading
+
+from server.protocol import (DEFAULT_HOST, DEFAULT_PORT, OP_GALLERY, OP_PING, OP_PUNCHES, OP_ROSTER, decode,
+                             encode)
+
+
+class IngestClient:
+    """Cliente (bloqueante) del servicio central de ingesta, para los hilos del kiosko.
+
+    Mantiene una conexión abierta y la reabre una vez si el servidor la
+    cerró. Los métodos retornan (success, message) como el resto del
+    proyecto, o lanzan OSError si el servidor no responde.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._socket = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _connect(self):
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._socket.makefile("rb")
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+            self._socket = self._file = None
+
+    def request(self, op, **fields):
+        """Envía un mensaje y espera su respuesta (un diccionario)."""
+        message = dict(fields, op=op, id=next(self._ids))
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._socket is None:
+                        self._connect()
+                    self._socket.sendall(encode(message))
+                    line = self._file.readline()
+                    if not line:
+                        raise ConnectionError("El servidor cerró la conexión")
+                    return decode(line)
+                except (OSError, ValueError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def ping(self):
+        return self.request(OP_PING).get("ok", False)
+
+    def send_punches(self, records):
+        """Envía un lote de marcas; el servidor responde cuando quedaron guardadas (o ya lo estaban)."""
+        response = self.request(OP_PUNCHES, marcas=list(records))
+        if not response.get("ok"):
+            return False, response.get("error", "Error desconocido del servidor")
+        message = f"{response['guardadas']} marcas guardadas en el servidor"
+        if response.get("duplicadas"):
+            message += f" ({response['duplicadas']} ya estaban guardadas)"
+        return True, message
+
+    def roster_delta(self, since=0, epoch=None):
+        """Cambios del personal desde la revisión `since` (respuesta completa del servidor)."""
+        return self.request(OP_ROSTER, desde=since, epoca=epoch)
+
+    def gallery_delta(self, since=0, epoch=None):
+        """Huellas cambiadas desde la revisión `since`; los templates vienen en base64."""
+        return self.request(OP_GALLERY, desde=since, epoca=epoch)
+
+
+def pull_gallery(client, since=0, epoch=None):
+    """Aplica en el almacén local las huellas cambiadas en el servidor; retorna (revisión, época)."""
+    from sensors.template_store import enroll_template, get_template_store, remove_template
+    delta = client.gallery_delta(since, epoch)
+    if not delta.get("ok"):
+        raise RuntimeError(delta.get("error", "Error al sincronizar huellas"))
+    if delta["completo"]:
+        # Otra época del servidor: se eliminan las huellas locales que ya no existen allá
+        for user_id in set(get_template_store().ids()) - set(delta["cambios"]):
+            remove_template(user_id)
+    for user_id in delta["eliminados"]:
+        remove_template(user_id)
+    for user_id, template in delta["cambios"].items():
+        enroll_template(user_id, base64.b64decode(template))
+    return delta["revision"], delta["epoca"]
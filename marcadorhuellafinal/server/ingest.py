@@ -0,0 +1,377 @@
+"""Servicio central de ingesta de marcas para varios kioscos.
+
+Uso (desde marcadorhuellafinal/):
+    python -m server.ingest [--host 127.0.0.1] [--port 8765] [--data-dir data]
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from database import data_handler
+from database.punch_keys import get_punch_keys
+from monitoring.metrics import STAGE_INGEST, get_metrics
+from server.protocol import (DEFAULT_HOST, DEFAULT_PORT, MAX_LINE, OP_GALLERY, OP_PING, OP_PUNCHES, OP_ROSTER,
+                             decode, encode, invalid_punch)
+
+DEFAULT_BATCH_SIZE = 500
+# Espera adicional para juntar marcas; con 0 se escribe apenas el escritor queda libre y las
+# marcas que llegan durante una escritura forman el lote siguiente
+DEFAULT_BATCH_DELAY = 0.0
+# Segundos mínimos entre relecturas del personal y de las huellas al responder sincronizaciones
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+
+class DeltaLog:
+    """Revisiones de un catálogo (personal o huellas) para sincronizar por diferencias.
+
+    Cada clave guarda la revisión en que cambió por última vez y un digest de
+    su contenido; las claves eliminadas quedan como lápidas para informarlas
+    a los kioscos que aún las tienen.
+    """
+
+    def __init__(self):
+        self.revision = 0
+        self._entries = {}
+
+    def update(self, digests):
+        """Compara el contenido actual {clave: digest}; retorna True si asignó una revisión nueva."""
+        changed = [key for key, digest in digests.items() if self._entries.get(key, (None, None))[1] != digest]
+        removed = [key for key, (_, digest) in self._entries.items() if digest is not None and key not in digests]
+        if not changed and not removed:
+            return False
+        self.revision += 1
+        for key in changed:
+            self._entries[key] = (self.revision, digests[key])
+        for key in removed:
+            self._entries[key] = (self.revision, None)
+        return True
+
+    def since(self, revision):
+        """Claves cambiadas y eliminadas después de `revision`, como (cambiadas, eliminadas)."""
+        changed, removed = [], []
+        for key, (key_revision, digest) in self._entries.items():
+            if key_revision > revision:
+                (removed if digest is None else changed).append(key)
+        return changed, removed
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _roster_snapshot():
+    """Personal actual como ({ID: digest}, {ID: datos})."""
+    from database.roster import get_roster
+    entries = get_roster().entries()
+    digests = {user_id: _digest(json.dumps(entry, sort_keys=True, default=str).encode("utf-8"))
+               for user_id, entry in entries.items()}
+    return digests, entries
+
+
+def _gallery_snapshot():
+    """Huellas enroladas como ({ID: digest}, almacén de templates)."""
+    from sensors.template_store import get_template_store
+    store = get_template_store()
+    store.refresh()
+    return {user_id: _digest(store.get(user_id) or b"") for user_id in store.ids()}, store
+
+
+class IngestServer:
+    """Servidor asyncio que recibe marcas de varios kioscos y las guarda en el almacén central.
+
+    Las marcas de todas las conexiones que llegan mientras se escribe el lote
+    anterior (o durante `batch_delay` segundos) se escriben juntas con una
+    sola escritura y un fsync en un hilo dedicado; cada kiosco recibe la
+    confirmación cuando su lote es durable. También responde sincronizaciones de personal y huellas
+    con las diferencias desde la revisión que el kiosco ya tiene.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, batch_size=DEFAULT_BATCH_SIZE,
+                 batch_delay=DEFAULT_BATCH_DELAY, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.refresh_interval = refresh_interval
+        # Identifica esta ejecución: las revisiones se reinician al reiniciar el servidor
+        self.epoch = uuid.uuid4().hex
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="IngestWriter")
+        self._catalogs = {OP_ROSTER: DeltaLog(), OP_GALLERY: DeltaLog()}
+        self._refreshed = {}
+        self._sources = {}
+        self._pending = []
+        self._pending_count = 0
+        # Claves ya guardadas (vista del diario) y claves en un lote que aún se está escribiendo
+        self._keys = None
+        self._inflight = {}
+        self._connections = set()
+        self._server = None
+        self._batcher = None
+        self._closing = False
+
+    async def start(self):
+        """Abre el puerto (port=0 elige uno libre) y lanza el escritor de lotes."""
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._refresh_lock = asyncio.Lock()
+        self._keys = await asyncio.get_running_loop().run_in_executor(self._writer, get_punch_keys)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._batcher = asyncio.create_task(self._write_batches())
+        return self
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Deja de aceptar conexiones, guarda las marcas pendientes y cierra."""
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        self._closing = True
+        self._has_pending.set()
+        await self._batcher
+        self._writer.shutdown(wait=True)
+
+    async def _handle(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(encode({"ok": False, "error": "Mensaje demasiado largo"}))
+                    break
+                if not line:
+                    break
+                try:
+                    message = decode(line)
+                    response = await self._dispatch(message)
+                    response["id"] = message.get("id")
+                except (ValueError, TypeError) as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, message):
+        op = message.get("op")
+        if op == OP_PING:
+            return {"ok": True, "epoca": self.epoch}
+        if op == OP_PUNCHES:
+            return await self._receive_punches(message.get("marcas"))
+        if op in self._catalogs:
+            return await self._sync(op, message.get("desde", 0), message.get("epoca"))
+        return {"ok": False, "error": f"Operación desconocida: {op}"}
+
+    async def _receive_punches(self, records):
+        if not isinstance(records, list) or not records:
+            return {"ok": False, "error": "Se esperaba una lista de marcas"}
+        for record in records:
+            reason = invalid_punch(record)
+            if reason:
+                return {"ok": False, "error": reason}
+        received = time.perf_counter()
+        # Reenvíos: las claves ya guardadas se descartan y las que se están escribiendo esperan ese lote
+        fresh, keys, waiting, duplicates = [], set(), [], 0
+        for record in records:
+            key = record.get("Clave")
+            if key and (key in keys or key in self._keys):
+                duplicates += 1
+            elif key and key in self._inflight:
+                waiting.append(self._inflight[key])
+            else:
+                fresh.append(record)
+                if key:
+                    keys.add(key)
+        results = []
+        if fresh:
+            future = asyncio.get_running_loop().create_future()
+            for key in keys:
+                self._inflight[key] = future
+            self._pending.append((fresh, future))
+            self._pending_count += len(fresh)
+            self._has_pending.set()
+            if self._pending_count >= self.batch_size:
+                self._batch_full.set()
+            try:
+                results.append(await future)
+            finally:
+                for key in keys:
+                    self._inflight.pop(key, None)
+        for future in waiting:
+            results.append(await future)
+        get_metrics().observe(STAGE_INGEST, time.perf_counter() - received)
+        for saved, message in results:
+            if not saved:
+                return {"ok": False, "error": message}
+        duplicates += len(waiting)
+        if duplicates:
+            get_metrics().increment("marcas_duplicadas", duplicates)
+        return {"ok": True, "guardadas": len(fresh), "duplicadas": duplicates}
+
+    async def _write_batches(self):
+        """Escribe las marcas pendientes por lotes; mientras un lote se escribe, el siguiente se acumula."""
+        loop = asyncio.get_running_loop()
+        metrics = get_metrics()
+        while True:
+            await self._has_pending.wait()
+            if self.batch_delay and not self._closing and self._pending_count < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.batch_delay)
+                except asyncio.TimeoutError:
+                    pass
+            batch, self._pending, self._pending_count = self._pending, [], 0
+            self._has_pending.clear()
+            self._batch_full.clear()
+            if batch:
+                records = [record for records, _ in batch for record in records]
+                try:
+                    saved, message, self._keys = await loop.run_in_executor(self._writer, _store, records)
+                except Exception as e:
+                    saved, message = False, f"Error al guardar registros: {str(e)}"
+                if saved:
+                    metrics.increment("marcas_recibidas", len(records))
+                    metrics.increment("lotes_ingesta")
+                else:
+                    print(message, file=sys.stderr)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result((saved, message))
+            if self._closing and not self._pending:
+                return
+
+    async def _refresh(self, op):
+        """Relee el catálogo (en otro hilo) si pasó el intervalo de refresco."""
+        async with self._refresh_lock:
+            now = time.monotonic()
+            if op in self._refreshed and now - self._refreshed[op] < self.refresh_interval:
+                return
+            snapshot = _roster_snapshot if op == OP_ROSTER else _gallery_snapshot
+            digests, self._sources[op] = await asyncio.get_running_loop().run_in_executor(None, snapshot)
+            self._catalogs[op].update(digests)
+            self._refreshed[op] = now
+
+    async def _sync(self, op, since, epoch):
+        """Diferencias del catálogo desde la revisión `since` (todo si el kiosco viene de otra época)."""
+        try:
+            await self._refresh(op)
+        except Exception as e:
+            return {"ok": False, "error": f"Error al leer {op}: {str(e)}"}
+        full = epoch != self.epoch or not isinstance(since, int)
+        catalog = self._catalogs[op]
+        changed, removed = catalog.since(0 if full else since)
+        source = self._sources[op]
+        if op == OP_ROSTER:
+            changes = {user_id: source[user_id] for user_id in changed if user_id in source}
+        else:
+            changes = await asyncio.get_running_loop().run_in_executor(None, _encode_templates, source, changed)
+        return {"ok": True, "epoca": self.epoch, "revision": catalog.revision, "completo": full,
+                "cambios": changes, "eliminados": [] if full else removed}
+
+
+def _store(records):
+    """Guarda un lote en el almacén central (hilo escritor); retorna también la vista de claves vigente."""
+    saved, message = data_handler.add_records(records)
+    return saved, message, get_punch_keys()
+
+
+def _encode_templates(store, user_ids):
+    templates = {}
+    for user_id in user_ids:
+        template = store.get(user_id)
+        if template is not None:
+            templates[user_id] = base64.b64encode(template).decode("ascii")
+    return templates
+
+
+class ServerThread(threading.Thread):
+    """Ejecuta un IngestServer en su propio bucle asyncio (pruebas, arneses de carga y equipos de prueba)."""
+
+    def __init__(self, host=DEFAULT_HOST, port=0, **options):
+        super().__init__(name="IngestServer", daemon=True)
+        self.server = IngestServer(host, port, **options)
+        self.loop = None
+        self._ready = threading.Event()
+        self._error = None
+
+    @property
+    def port(self):
+        return self.server.port
+
+    def start(self):
+        """Inicia el hilo y espera a que el puerto esté abierto."""
+        super().start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.server.start())
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            self.loop.close()
+            return
+        self._ready.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(self.server.close())
+        pending = [task for task in asyncio.all_tasks(self.loop) if not task.done()]
+        for task in pending:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.close()
+
+    def stop(self, timeout=10):
+        """Detiene el servidor guardando las marcas pendientes."""
+        if self.loop is not None and self.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join(timeout)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """Ejecuta el servidor hasta que se interrumpa."""
+    server = await IngestServer(host, port, **options).start()
+    print(f"Servicio de ingesta escuchando en {server.host}:{server.port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        data_handler.close_storage()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", default=data_handler.DATA_DIR, help="Directorio del almacén central")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--batch-delay", type=float, default=DEFAULT_BATCH_DELAY, help="Segundos de espera por lote")
+    args = parser.parse_args(argv)
+    data_handler.DATA_DIR = args.data_dir
+    # El almacén central acumula todos los kioscos: los meses cerrados se archivan al iniciar
+    print(data_handler.archive_records()[1])
+    try:
+        asyncio.run(serve(args.host, args.port, batch_size=args.batch_size, batch_delay=args.batch_delay))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import json
+import math
+
+# Dirección por defecto del servicio de ingesta (sólo localhost si no se indica otra)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Largo máximo de una línea (un lote de marcas o una respuesta con la galería)
+MAX_LINE = 64 * 1024 * 1024
+
+# Operaciones: cada mensaje es un objeto JSON en una línea con la clave "op"
+OP_PING = "ping"
+OP_PUNCHES = "marcas"
+OP_ROSTER = "personal"
+OP_GALLERY = "huellas"
+
+# Columnas obligatorias de una marca recibida
+REQUIRED_FIELDS = ("RUT", "Fecha", "Hora", "Accion")
+
+
+def _jsonable(value):
+    """Convierte NaN y escalares de numpy (también dentro de listas y diccionarios) a valores JSON."""
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return _jsonable(value.item())
+    return value
+
+
+def encode(message):
+    """Serializa un mensaje como una línea JSON (bytes)."""
+    return json.dumps(_jsonable(message), ensure_ascii=False, separators=(",", ":"),
+                      default=str).encode("utf-8") + b"\n"
+
+
+def decode(line):
+    """Interpreta una línea JSON recibida."""
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("El mensaje debe ser un objeto JSON")
+    return message
+
+
+def invalid_punch(record):
+    """Motivo por el que una marca recibida no es válida, o None."""
+    if not isinstance(record, dict):
+        return "La marca debe ser un objeto JSON"
+    missing = [field for field in REQUIRED_FIELDS if not record.get(field)]
+    if missing:
+        return f"Faltan campos en la marca: {', '.join(missing)}"
+    return None
@@ -0,0 +1,113 @@
+import json
+import os
+import random
+import sys
+import threading
+
+from monitoring.metrics import get_metrics
+from server.protocol import DEFAULT_PORT
+
+# Servidor central: "central_server" en config.json ("host:puerto") o esta variable de entorno
+SERVER_ENV = "RELOJ_SERVER"
+DEFAULT_SYNC_BATCH = 100
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+
+def parse_address(address):
+    """Convierte "host:puerto" (o sólo "host") en (host, puerto)."""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return address, DEFAULT_PORT
+    return host, int(port)
+
+
+def configured_server():
+    """Dirección (host, puerto) del servidor central, o None si el kiosko trabaja solo."""
+    address = os.environ.get(SERVER_ENV)
+    if not address:
+        from database import data_handler
+        try:
+            with open(os.path.join(data_handler.DATA_DIR, data_handler.CONFIG_FILE), "r", encoding="utf-8") as f:
+                address = json.load(f).get("central_server")
+        except (OSError, ValueError):
+            address = None
+    return parse_address(address) if address else None
+
+
+class OutboxSyncer(threading.Thread):
+    """Hilo que envía al servidor central las marcas de la bandeja de salida.
+
+    Envía lotes de hasta `batch_size` marcas (un viaje por lote) y sólo los
+    confirma en la bandeja cuando el servidor los guardó. Si el servidor no
+    responde reintenta con espera exponencial con jitter, entre
+    `min_backoff` y `max_backoff` segundos; el kiosko sigue marcando mientras
+    tanto.
+    """
+
+    def __init__(self, outbox, client, batch_size=DEFAULT_SYNC_BATCH, min_backoff=MIN_BACKOFF,
+                 max_backoff=MAX_BACKOFF):
+        super().__init__(name="OutboxSyncer", daemon=True)
+        self.outbox = outbox
+        self.client = client
+        self.batch_size = batch_size
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.backoff = 0.0
+        self.last_error = None
+        self._stopped = threading.Event()
+
+    @property
+    def online(self):
+        """Indica si el último envío llegó al servidor."""
+        return self.last_error is None
+
+    def stop(self):
+        self._stopped.set()
+
+    def sync_once(self):
+        """Envía un lote pendiente; retorna la cantidad confirmada (0 si no había) o lanza el error."""
+        records, position = self.outbox.pending(self.batch_size)
+        if not records:
+            return 0
+        success, message = self.client.send_punches(records)
+        if not success:
+            raise RuntimeError(message)
+        self.outbox.acknowledge(position, len(records))
+        return len(records)
+
+    def run(self):
+        metrics = get_metrics()
+        while not self._stopped.is_set():
+            if not self.outbox.wait(timeout=0.5):
+                continue
+            try:
+                sent = self.sync_once()
+            except (OSError, RuntimeError, ValueError) as e:
+                if self.last_error is None:
+                    print(f"Servidor central no disponible; las marcas quedan en la bandeja: {e}", file=sys.stderr)
+                self.last_error = str(e)
+                metrics.increment("errores_sincronizacion")
+                self.backoff = min(max(self.backoff * 2, self.min_backoff), self.max_backoff)
+                self._stopped.wait(self.backoff * random.uniform(0.5, 1.0))
+                continue
+            if sent:
+                metrics.increment("marcas_sincronizadas", sent)
+            self.last_error = None
+            self.backoff = 0.0
+        self.client.close()
+
+
+def start_outbox_sync(address=None, **options):
+    """Activa la bandeja de salida del directorio de datos y lanza su hilo de envío; None si no hay servidor."""
+    from database import data_handler
+    from database.outbox import OUTBOX_FILE, PunchOutbox
+    from server.client import IngestClient
+    address = address or configured_server()
+    if address is None:
+        return None
+    outbox = PunchOutbox(os.path.join(data_handler.DATA_DIR, OUTBOX_FILE))
+    data_handler.set_outbox(outbox)
+    syncer = OutboxSyncer(outbox, IngestClient(*address), **options)
+    syncer.start()
+    return syncer
@@ -0,0 +1,49 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_suite import bench_storage
+from benchmarks.synthetic import rut_check_digit, synthetic_punches, write_dataset
+from database import data_handler
+
+class TestSyntheticData(unittest.TestCase):
+    def test_rut_check_digit(self):
+        self.assertEqual(rut_check_digit(17200884), "4")
+        self.assertEqual(rut_check_digit(20140424), "K")
+        self.assertEqual(rut_check_digit(9802068), "3")
+
+    def test_punches_are_chronological_daily_cycles(self):
+        punches = synthetic_punches(["1-9", "2-7"], ["Ana", "Beto"], 20, seed=3)
+        self.assertEqual(len(punches), 20)
+        self.assertEqual(list(punches.columns), data_handler.RECORD_COLUMNS)
+        stamps = (punches["Fecha"] + " " + punches["Hora"]).tolist()
+        self.assertEqual(stamps, sorted(stamps))
+        ana = punches[(punches["RUT"] == "1-9") & (punches["Fecha"] == punches["Fecha"].iloc[0])]
+        self.assertEqual(ana["Accion"].tolist(), ["Entrada", "Colación", "Entrada", "Salida"])
+
+    def test_dataset_matches_personnel_format(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(data_handler, 'DATA_DIR', tmp):
+            self.addCleanup(data_handler.close_storage)
+            docentes, asistentes, _ = write_dataset(tmp, 40, 500, seed=1)
+            self.assertEqual(len(docentes) + len(asistentes), 40)
+            loaded = data_handler.load_personnel("asistente")
+            self.assertIn("Estamento", loaded.columns)
+            self.assertEqual(len(data_handler.load_records()), 500)
+
+class TestBenchSuite(unittest.TestCase):
+    def test_bench_storage_runs_headless(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_dataset(tmp, 10, 300, seed=2)
+            results = bench_storage(tmp, "csv", 300, appends=5, repeat=1)
+        self.assertEqual(results["load_records"]["rows"], 300)
+        self.assertIn("p95_ms", results["add_record"])
+        self.assertEqual(results["exportacion_csv"]["rows"], 300)
+        self.assertEqual(data_handler.DATA_DIR, "data")
+
+if __name__ == "__main__":
+    unittest.main()
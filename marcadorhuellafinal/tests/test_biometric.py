@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import patch
+import ctypes
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+from sensors import biometric
+from sensors.matcher import FingerprintGallery
+
+class TestLazySdk(unittest.TestCase):
+    def test_import_does_not_load_sdk(self):
+        self.assertFalse(biometric._sdk_loaded)
+
+    def test_missing_dlls_raise_instead_of_exit(self):
+        with patch.object(biometric, 'DPFP_DD_DLL', os.path.join(PROJECT_DIR, 'no_existe.dll')), \
+             patch('builtins.print'), \
+             patch.object(biometric, '_device_instance', None):
+            with self.assertRaises(RuntimeError):
+                biometric.get_biometric_device()
+            self.assertIsNone(biometric._device_instance)
+        self.assertFalse(biometric._sdk_loaded)
+
+class TestCaptureBuffers(unittest.TestCase):
+    def setUp(self):
+        self.source = (ctypes.c_ubyte * 1024)(*np.random.default_rng(3).integers(0, 256, 1024, dtype=np.uint8))
+        self.address = ctypes.addressof(self.source)
+
+    def test_ring_reuses_buffers(self):
+        ring = biometric.CaptureBufferRing(buffers=2, capacity=1024)
+        first = ring.fill(self.address, 600)
+        second = ring.fill(self.address, 100)
+        self.assertEqual(len(first), 600)
+        self.assertEqual(first.tobytes(), bytes(self.source)[:600])
+        self.assertEqual(len(second), 100)
+        third = ring.fill(self.address + 10, 50)
+        # El tercer relleno vuelve al primer buffer
+        self.assertEqual(first[:50].tobytes(), bytes(self.source)[10:60])
+        self.assertEqual(len(third), 50)
+
+    def test_ring_rejects_oversized_sample(self):
+        ring = biometric.CaptureBufferRing(buffers=1, capacity=100)
+        with self.assertRaises(RuntimeError):
+            ring.fill(self.address, 101)
+
+    def _reader(self, sample_size=1024):
+        address = self.address
+
+        def fake_capture(handle, timeout, result_ref):
+            result = result_ref._obj
+            result.sample = address
+            result.quality = 0
+            result.status = biometric.DPFPDD_SUCCESS
+            return biometric.DPFPDD_SUCCESS
+
+        patchers = [patch.object(biometric, 'load_sdk'),
+                    patch.object(biometric, 'dpfpdd_init', lambda handle, flags: 0, create=True),
+                    patch.object(biometric, 'dpfpad_create', lambda *args: 1, create=True),
+                    patch.object(biometric, 'dpfpad_capture', fake_capture, create=True),
+                    patch.object(biometric, '_sdk_loaded', False),
+                    patch('builtins.print')]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return biometric.FingerprintReader(buffers=2, sample_size=sample_size)
+
+    def test_capture_uses_configured_sample_size(self):
+        reader = self._reader(600)
+        sample, quality = reader.capture_sample()
+        self.assertIsInstance(sample, memoryview)
+        self.assertEqual(len(sample), 600)
+        # El SDK no informa un puntaje de calidad
+        self.assertIsNone(quality)
+        self.assertEqual(sample.tobytes(), bytes(self.source)[:600])
+        self.assertEqual(len(self._reader().capture_fingerprint()), 1024)
+
+    def test_sample_matches_without_copy(self):
+        reader = self._reader(600)
+        gallery = FingerprintGallery()
+        gallery.add("U1", bytes(self.source)[:600])
+        user_id, score = gallery.identify(reader.capture_fingerprint())
+        self.assertEqual(user_id, "U1")
+        self.assertGreater(score, 99)
+
+class TestStartupImports(unittest.TestCase):
+    def test_app_import_defers_heavy_modules(self):
+        code = ("import sys, app; "
+                "print(','.join(m for m in ('pandas', 'numpy', 'sensors.biometric', 'database.data_handler') "
+                "if m in sys.modules))")
+        try:
+            result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR,
+                                    capture_output=True, text=True, timeout=60)
+        except subprocess.TimeoutExpired:
+            self.skipTest("Importar la aplicación tardó demasiado")
+        if result.returncode != 0:
+            self.skipTest(f"No se pudo importar la aplicación: {result.stderr.strip()[-200:]}")
+        self.assertEqual(result.stdout.strip(), "")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from monitoring.metrics import STAGE_CAPTURE, STAGE_CAPTURE_WAIT, get_metrics
+from sensors.capture_worker import CaptureWorker, RESULT_ERROR, RESULT_FAILED, RESULT_VERIFIED
+
+def wait_for_results(worker, count, timeout=2):
+    results = []
+    deadline = time.monotonic() + timeout
+    while len(results) < count and time.monotonic() < deadline:
+        results.extend(worker.drain())
+        time.sleep(0.01)
+    return results
+
+class TestCaptureWorker(unittest.TestCase):
+    def make_worker(self, capture, verify):
+        worker = CaptureWorker(capture, verify, cooldown=0, idle_delay=0.01, error_delay=0.01)
+        worker.start()
+        self.addCleanup(worker.stop)
+        return worker
+
+    def test_results_are_queued(self):
+        samples = iter([b"a", b"b"])
+        worker = self.make_worker(
+            lambda: next(samples, None),
+            lambda sample: (sample == b"a", {"ID": "1-9"} if sample == b"a" else None, "sin coincidencia"))
+        worker.resume()
+        results = wait_for_results(worker, 2)
+        self.assertEqual([kind for kind, _, _ in results], [RESULT_VERIFIED, RESULT_FAILED])
+        self.assertEqual(results[0][1]["ID"], "1-9")
+
+    def test_blocked_capture_does_not_block_caller(self):
+        release = threading.Event()
+
+        def blocking_capture():
+            release.wait(5)
+            return None
+
+        worker = self.make_worker(blocking_capture, lambda sample: (False, None, ""))
+        start = time.monotonic()
+        worker.resume()
+        self.assertEqual(worker.drain(), [])
+        self.assertLess(time.monotonic() - start, 0.1)
+        release.set()
+
+    def test_errors_are_reported_and_pause_stops_capture(self):
+        calls = []
+
+        def failing_capture():
+            calls.append(1)
+            raise SystemExit(1)
+
+        worker = self.make_worker(failing_capture, lambda sample: (False, None, ""))
+        worker.resume()
+        results = wait_for_results(worker, 1)
+        self.assertEqual(results[0][0], RESULT_ERROR)
+        worker.pause()
+        time.sleep(0.05)
+        count = len(calls)
+        time.sleep(0.1)
+        self.assertEqual(len(calls), count)
+
+    def test_capture_stage_starts_at_touch(self):
+        touch = {}
+
+        def capture():
+            time.sleep(0.05)
+            touch["at"] = time.perf_counter()
+            time.sleep(0.01)
+            return b"dedo"
+
+        get_metrics().reset()
+        worker = CaptureWorker(capture, lambda sample: (True, {"ID": "1-9", "Tiempos": {"muestra": 0}}, ""),
+                               cooldown=5, touch_time=lambda: touch.get("at"))
+        worker.start()
+        self.addCleanup(worker.stop)
+        worker.resume()
+        results = wait_for_results(worker, 1)
+        self.assertEqual(results[0][1]["Tiempos"]["toque"], touch["at"])
+        latencies = get_metrics().snapshot()["latencias"]
+        self.assertLess(latencies[STAGE_CAPTURE]["max"], 0.04)
+        self.assertGreaterEqual(latencies[STAGE_CAPTURE_WAIT]["max"], 0.04)
+
+    def test_sample_captured_during_pause_is_discarded(self):
+        capturing = threading.Event()
+        release = threading.Event()
+        verified = []
+
+        def slow_capture():
+            capturing.set()
+            release.wait(5)
+            return b"dedo"
+
+        worker = self.make_worker(slow_capture, lambda sample: verified.append(sample) or (True, {"ID": "1-9"}, ""))
+        worker.resume()
+        self.assertTrue(capturing.wait(2))
+        # El enrolamiento pausa el kiosko mientras éste espera un dedo
+        worker.pause()
+        release.set()
+        time.sleep(0.1)
+        self.assertEqual(verified, [])
+        self.assertEqual(worker.drain(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import write_dataset
+from database import columnar, data_handler
+from database.reports import daily_attendance, load_schedule
+
+class TestColumnarStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.close_storage)
+        _, _, self.punches = write_dataset(self.tmpdir.name, 15, 3000)
+        self.path = os.path.join(self.tmpdir.name, columnar.HISTORY_DIR)
+
+    def _history(self, chunksize=700):
+        csv_path = os.path.join(self.tmpdir.name, "registros_huellas.csv")
+        self.assertEqual(columnar.convert_csv(csv_path, self.path, chunksize), len(self.punches))
+        return columnar.load_history()
+
+    def test_round_trip(self):
+        history = self._history()
+        self.assertEqual(len(history), len(self.punches))
+        self.assertTrue(history.manifest["ordenado"])
+        self.assertEqual(history.manifest["desde"], self.punches["Fecha"].min())
+        frame = history.to_frame()
+        for column in ["RUT", "Nombre", "Fecha", "Hora", "Accion", "Metodo", "Lector"]:
+            self.assertEqual(frame[column].astype(object).tolist(), self.punches[column].astype(str).tolist(), column)
+        # Las columnas se mapean en memoria, sin copiarlas
+        self.assertIsInstance(history.codes("RUT"), np.memmap)
+        self.assertEqual(history.codes("Accion").dtype, np.int32)
+
+    def test_missing_values_and_text(self):
+        records = pd.DataFrame([
+            {"RUT": "1-9", "Nombre": "Ana", "Fecha": "2023-12-31", "Hora": "08:00:00", "Accion": "Entrada",
+             "Metodo": "Huella", "Lector": None, "Clave": "ñandú"},
+            {"RUT": "2-7", "Nombre": "Luis", "Fecha": "no es fecha", "Hora": "", "Accion": "Salida",
+             "Metodo": "Manual", "Lector": "Patio", "Clave": None},
+        ])
+        self.assertEqual(columnar.convert_records(self.path, [records]), 2)
+        history = columnar.load_history()
+        self.assertFalse(history.manifest["ordenado"])
+        frame = history.to_frame()
+        self.assertEqual(frame["Clave"][0], "ñandú")
+        self.assertEqual(frame["Fecha"][0], "2023-12-31")
+        self.assertTrue(pd.isna(frame["Clave"][1]) and pd.isna(frame["Fecha"][1]) and pd.isna(frame["Lector"][0]))
+        self.assertEqual(len(history.date_rows("2023-12-31", "2023-12-31")), 1)
+
+    def test_projection_and_date_range(self):
+        history = self._history()
+        frame = history.to_frame(["RUT", "Fecha"], "2024-03-05", "2024-03-07")
+        expected = self.punches[(self.punches["Fecha"] >= "2024-03-05") & (self.punches["Fecha"] <= "2024-03-07")]
+        self.assertEqual(list(frame.columns), ["RUT", "Fecha"])
+        self.assertEqual(frame["RUT"].astype(object).tolist(), expected["RUT"].tolist())
+        self.assertNotIn("Nombre", history._arrays)
+
+    def test_yearly_attendance_matches_daily_report(self):
+        history = self._history()
+        yearly = columnar.yearly_attendance(history)
+        daily = daily_attendance(self.punches, load_schedule({}))
+        daily = daily[daily["primera_entrada"].notna()]
+        expected = daily.assign(anio=daily["primera_entrada"].dt.year).groupby(["RUT", "anio"]).agg(
+            dias=("Fecha", "size"),
+            atrasos=("minutos_atraso", lambda s: int((s > 0).sum())),
+            minutos_atraso=("minutos_atraso", "sum")).reset_index()
+        self.assertEqual(yearly["RUT"].tolist(), expected["RUT"].tolist())
+        self.assertEqual(yearly["dias"].tolist(), expected["dias"].tolist())
+        self.assertEqual(yearly["atrasos"].tolist(), expected["atrasos"].tolist())
+        np.testing.assert_allclose(yearly["minutos_atraso"], expected["minutos_atraso"], atol=0.01)
+
+        rut = self.punches["RUT"].iloc[0]
+        self.assertEqual(columnar.yearly_attendance(history, rut=rut)["RUT"].tolist(), [rut])
+        self.assertTrue(columnar.yearly_attendance(history, rut="no-existe").empty)
+
+    def test_converts_whole_history_from_backend(self):
+        data_handler.archive_records("2024-03-15")
+        self.assertEqual(columnar.main(["--data-dir", self.tmpdir.name]), len(self.punches))
+        self.assertEqual(len(columnar.load_history(self.path)), len(self.punches))
+
+if __name__ == '__main__':
+    unittest.main()
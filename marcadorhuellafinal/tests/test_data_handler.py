@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import data_handler
+
+class TestAddRecord(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.close_storage)
+        self.path = os.path.join(self.tmpdir.name, "registros_huellas.csv")
+
+    def test_add_record_creates_file(self):
+        success, _ = data_handler.add_record("12345678-9", "Test User", "Entrada")
+        self.assertTrue(success)
+        df = data_handler.load_records()
+        self.assertEqual(list(df.columns), data_handler.RECORD_COLUMNS)
+        self.assertEqual(df.iloc[0]["RUT"], "12345678-9")
+        self.assertEqual(df.iloc[0]["Metodo"], "Huella")
+
+    def test_add_record_does_not_reread_history(self):
+        data_handler.add_record("1-9", "Uno", "Entrada")
+        with patch('pandas.read_csv', side_effect=AssertionError("historial releído")):
+            for _ in range(5):
+                success, message = data_handler.add_record("2-7", "Dos", "Salida")
+                self.assertTrue(success, message)
+        self.assertEqual(len(data_handler.load_records()), 6)
+
+    def test_add_record_respects_existing_header(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("RUT,Huella,Fecha,Hora,Nombre,Accion,Metodo\n")
+            f.write("17200884-4,,2025-04-15,15:58:07,ÁLVAREZ,Registro Huella,Huella")
+        data_handler.add_record("Diego01", "Diego, Guzman", "Entrada", metodo="Manual")
+        df = data_handler.load_records()
+        self.assertEqual(len(df), 2)
+        self.assertEqual(df.iloc[1]["Nombre"], "Diego, Guzman")
+        self.assertEqual(df.iloc[1]["Accion"], "Entrada")
+        self.assertTrue(pd.isna(df.iloc[1]["Huella"]))
+
+    def test_add_record_extends_old_header_with_reader(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("RUT,Nombre,Fecha,Hora,Accion,Metodo\n")
+            f.write("1-9,Uno,2025-04-15,08:00:00,Entrada,Huella\n")
+        data_handler.add_record("2-7", "Dos", "Entrada", lector="Patio")
+        df = data_handler.load_records()
+        self.assertEqual(list(df.columns), data_handler.RECORD_COLUMNS)
+        self.assertTrue(pd.isna(df.iloc[0]["Lector"]))
+        self.assertEqual(df.iloc[1]["Lector"], "Patio")
+
+if __name__ == '__main__':
+    unittest.main()
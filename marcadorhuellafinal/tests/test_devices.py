@@ -0,0 +1,134 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_rush import enroll_staff, run_rush
+from benchmarks.synthetic import synthetic_templates, write_dataset
+from database import data_handler
+from sensors.devices import (DEFAULT_READER_ID, ReaderDevice, ReplaySource, SimulatedReader, SyntheticSource,
+                             configured_readers, create_readers, record_stream)
+from sensors.identification import verify_fingerprint
+
+class TestSimulatedReader(unittest.TestCase):
+    def setUp(self):
+        self.templates = synthetic_templates(5, seed=11)
+        self.source = SyntheticSource([f"U{i}" for i in range(5)], [t.tobytes() for t in self.templates], seed=1)
+
+    def test_samples_with_quality(self):
+        reader = SimulatedReader(self.source, latency=0, quality=(90, 0), seed=2)
+        template, quality = reader.capture_sample()
+        self.assertEqual(len(template), 2048)
+        self.assertEqual(quality, 90)
+        self.assertIn(reader.last_id, self.source.ids)
+        self.assertEqual(reader.capture_fingerprint().__class__, bytes)
+
+    def test_timeout_without_arrivals(self):
+        reader = SimulatedReader(self.source, rate=0.001, latency=0, seed=3)
+        reader.capture_sample()
+        start = time.monotonic()
+        self.assertIsNone(reader.capture_sample(timeout=50))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_rate_limits_throughput(self):
+        reader = SimulatedReader(self.source, rate=1200, latency=0, seed=4)
+        start = time.monotonic()
+        for _ in range(10):
+            reader.capture_sample()
+        self.assertGreater(time.monotonic() - start, 0.1)
+
+    def test_reader_without_capture_fails_on_creation(self):
+        class SilentReader(ReaderDevice):
+            pass
+
+        with self.assertRaises(TypeError):
+            SilentReader()
+
+    def test_replay_recorded_stream(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "flujo.jsonl")
+            record_stream(path, [(self.templates[0], 70, "U0"), (self.templates[1], 95, None)])
+            reader = SimulatedReader(ReplaySource(path, loop=False), latency=0)
+            self.assertEqual(reader.capture_sample(), (self.templates[0].tobytes(), 70))
+            self.assertEqual(reader.last_id, "U0")
+            self.assertEqual(reader.capture_sample()[1], 95)
+            self.assertIsNone(reader.capture_sample())
+
+class TestCapturePipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.close_storage)
+        write_dataset(self.tmpdir.name, 20, 100, seed=5)
+        self.store = enroll_staff(self.tmpdir.name, seed=5)
+        self.addCleanup(self.store.close)
+
+    def test_verify_fingerprint_uses_gallery_and_roster(self):
+        user_id = self.store.ids()[3]
+        success, user_info, _ = verify_fingerprint(self.store.get(user_id))
+        self.assertTrue(success)
+        self.assertEqual(user_info["ID"], user_id)
+        self.assertFalse(verify_fingerprint(np.zeros(2048, dtype=np.uint8).tobytes())[0])
+
+    def test_rush_persists_punches(self):
+        reader = SimulatedReader(SyntheticSource.from_store(self.store, seed=6), latency=0.001, jitter=0,
+                                 quality=(95, 0), seed=6)
+        counts = run_rush(reader, duration=0.5)
+        self.assertGreater(counts["verificadas"], 0)
+        self.assertEqual(counts["incorrectas"], 0)
+        self.assertEqual(data_handler.count_records(), 100 + counts["verificadas"])
+
+    def test_reader_pool_tags_punches_with_reader(self):
+        readers = {
+            name: SimulatedReader(SyntheticSource.from_store(self.store, seed=seed), latency=0.001, jitter=0,
+                                  quality=(95, 0), seed=seed)
+            for seed, name in enumerate(["Principal", "Patio", "Gimnasio"], start=7)
+        }
+        counts = run_rush(readers, duration=0.5)
+        self.assertEqual(counts["incorrectas"], 0)
+        self.assertTrue(all(count > 0 for count in counts["por_lector"].values()))
+        records = data_handler.load_records()
+        new = records.iloc[100:]
+        self.assertEqual(new["Lector"].value_counts().to_dict(), counts["por_lector"])
+
+class TestReaderConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop("RELOJ_READER", None)
+        os.environ.pop("RELOJ_READERS", None)
+
+    def test_single_reader_by_default(self):
+        self.assertEqual(configured_readers(), {DEFAULT_READER_ID: "dpfp"})
+        os.environ["RELOJ_READER"] = "simulado"
+        self.assertEqual(configured_readers(), {DEFAULT_READER_ID: "simulado"})
+
+    def test_readers_from_config_and_environment(self):
+        with open(os.path.join(self.tmpdir.name, "config.json"), "w", encoding="utf-8") as f:
+            f.write('{"readers": {"Principal": "dpfp", "Patio": "simulado"}}')
+        self.assertEqual(list(configured_readers()), ["Principal", "Patio"])
+        os.environ["RELOJ_READERS"] = "Norte=simulado, Sur=replay:flujo.jsonl"
+        self.assertEqual(configured_readers(), {"Norte": "simulado", "Sur": "replay:flujo.jsonl"})
+
+    def test_only_one_sdk_reader(self):
+        with self.assertRaises(ValueError):
+            create_readers({"A": "dpfp", "B": "dpfp"})
+
+if __name__ == "__main__":
+    unittest.main()
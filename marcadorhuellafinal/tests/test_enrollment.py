@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import noisy_copy, synthetic_templates
+from sensors.enrollment import (EnrollmentSession, EnrollmentWorker, estimate_quality,
+                                ENROLL_DONE, ENROLL_ERROR, ENROLL_REJECTED, ENROLL_SAMPLE)
+
+def run_worker(worker, timeout=5):
+    worker.start()
+    worker.join(timeout)
+    messages = []
+    while not worker.messages.empty():
+        messages.append(worker.messages.get_nowait())
+    return messages
+
+class TestEnrollment(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.base = synthetic_templates(2, seed=7)
+
+    def test_quality_estimate(self):
+        self.assertGreater(estimate_quality(self.base[0]), 90)
+        self.assertLess(estimate_quality(bytes(2048)), 1)
+        self.assertLess(estimate_quality(b"\x00\xff" * 1024), 40)
+
+    def test_low_quality_rejected_before_fusion(self):
+        session = EnrollmentSession(samples=2)
+        self.assertFalse(session.add_sample(bytes(2048))[0])
+        self.assertFalse(session.add_sample(self.base[0], quality=0)[0])
+        self.assertTrue(session.add_sample(self.base[0])[0])
+        self.assertEqual(session.accepted, 1)
+
+    def test_fuse_picks_the_medoid(self):
+        session = EnrollmentSession(samples=3)
+        samples = [noisy_copy(self.base[0], 0.03, self.rng), self.base[0], noisy_copy(self.base[0], 0.03, self.rng)]
+        for sample in samples:
+            session.add_sample(sample)
+        template, consistency = session.fuse()
+        self.assertEqual(template, self.base[0].tobytes())
+        self.assertGreater(consistency, 90)
+
+    def test_inconsistent_samples_fail(self):
+        session = EnrollmentSession(samples=2)
+        session.add_sample(self.base[0])
+        session.add_sample(self.base[1])
+        with self.assertRaises(ValueError):
+            session.fuse()
+
+    def test_worker_retries_and_registers(self):
+        samples = iter([bytes(2048), (self.base[0], 100), RuntimeError("sin dedo"),
+                        noisy_copy(self.base[0], 0.03, self.rng), noisy_copy(self.base[0], 0.03, self.rng)])
+        registered = {}
+
+        def capture():
+            sample = next(samples)
+            if isinstance(sample, Exception):
+                raise sample
+            return sample
+
+        def register(user_id, template):
+            registered[user_id] = template
+            return True, "Huella registrada correctamente"
+
+        messages = run_worker(EnrollmentWorker("1-9", capture, register))
+        kinds = [kind for kind, _, _ in messages]
+        self.assertEqual(kinds, [ENROLL_REJECTED, ENROLL_SAMPLE, ENROLL_REJECTED, ENROLL_SAMPLE, ENROLL_SAMPLE,
+                                 ENROLL_DONE])
+        self.assertIn("1-9", registered)
+
+    def test_worker_gives_up_after_max_attempts(self):
+        messages = run_worker(EnrollmentWorker("1-9", lambda: bytes(2048), lambda *_: (True, ""), max_attempts=3))
+        self.assertEqual(messages[-1][0], ENROLL_ERROR)
+        self.assertEqual(len(messages), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+import importlib.util
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import data_handler
+from database import export
+from database.export import ExportWorker, EXPORT_DONE, EXPORT_PROGRESS, export_records
+
+class TestExportRecords(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.close_storage)
+        self.records = pd.DataFrame({
+            "RUT": [f"{i}-K" for i in range(250)],
+            "Nombre": [f"Persona {i}" for i in range(250)],
+            "Fecha": ["2025-04-15"] * 250,
+            "Hora": ["08:00:00"] * 250,
+            "Accion": ["Entrada"] * 250,
+            "Metodo": ["Huella"] * 250,
+        })
+        data_handler.save_record(self.records)
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_csv_in_chunks_with_progress(self):
+        progress = []
+        rows = export_records(self.path("salida.csv"), chunksize=100,
+                              progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual(rows, 250)
+        self.assertEqual(progress, [(100, 250), (200, 250), (250, 250)])
+        pd.testing.assert_frame_equal(pd.read_csv(self.path("salida.csv")), self.records)
+
+    def test_failed_export_keeps_previous_file(self):
+        with open(self.path("salida.csv"), "w") as f:
+            f.write("anterior\n")
+
+        def failing_chunks():
+            yield self.records.head(10)
+            raise OSError("disco lleno")
+
+        with self.assertRaises(OSError):
+            export_records(self.path("salida.csv"), chunks=failing_chunks())
+        with open(self.path("salida.csv")) as f:
+            self.assertEqual(f.read(), "anterior\n")
+        self.assertFalse(os.path.exists(self.path("salida.csv.tmp")))
+
+    @unittest.skipUnless(importlib.util.find_spec("openpyxl"), "requiere openpyxl")
+    def test_excel_splits_sheets_at_row_limit(self):
+        with patch.object(export, 'EXCEL_MAX_ROWS', 100):
+            export_records(self.path("salida.xlsx"), chunksize=60)
+        sheets = pd.read_excel(self.path("salida.xlsx"), sheet_name=None)
+        self.assertEqual(list(sheets), ["Registros", "Registros 2", "Registros 3"])
+        self.assertEqual(sum(len(df) for df in sheets.values()), 250)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "requiere pyarrow")
+    def test_parquet(self):
+        export_records(self.path("salida.parquet"), chunksize=100)
+        df = pd.read_parquet(self.path("salida.parquet"))
+        self.assertEqual(df["RUT"].tolist(), self.records["RUT"].tolist())
+
+    def test_background_worker_reports_completion(self):
+        worker = ExportWorker(self.path("salida.csv"), chunksize=100)
+        worker.start()
+        worker.join(5)
+        messages = []
+        while not worker.messages.empty():
+            messages.append(worker.messages.get_nowait())
+        self.assertEqual(messages[0][0], EXPORT_PROGRESS)
+        self.assertEqual(messages[-1], (EXPORT_DONE, 250, self.path("salida.csv")))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_records(self.path("salida.txt"))
+
+if __name__ == '__main__':
+    unittest.main()
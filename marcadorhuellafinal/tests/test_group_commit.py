@@ -0,0 +1,151 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import threading
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import data_handler
+from database.group_commit import DEFAULT_COMMIT_DELAY, GroupCommitWriter
+from database.outbox import PunchOutbox
+from database.punch_state import get_punch_state, record_punch
+from database.punch_keys import get_punch_keys
+
+def run_threads(count, target):
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+class TestGroupCommitWriter(unittest.TestCase):
+    def test_concurrent_submits_share_writes(self):
+        written = []
+        lock = threading.Lock()
+
+        def write(records):
+            with lock:
+                start = len(written)
+                written.extend(records)
+            return list(range(start + 1, start + len(records) + 1))
+
+        writer = GroupCommitWriter(write, delay=0.005)
+        positions = []
+        run_threads(8, lambda index: positions.extend(writer.submit(f"{index}-{i}") for i in range(20)))
+        self.assertEqual(writer.records, 160)
+        self.assertLess(writer.batches, 160)
+        self.assertEqual(sorted(positions), list(range(1, 161)))
+        self.assertEqual(sorted(written), sorted(f"{index}-{i}" for index in range(8) for i in range(20)))
+
+    def test_write_error_reaches_every_member(self):
+        def write(records):
+            raise OSError("disco lleno")
+
+        writer = GroupCommitWriter(write, delay=0.05)
+        errors = []
+
+        def submit(index):
+            try:
+                writer.submit(index)
+            except OSError as e:
+                errors.append(str(e))
+
+        run_threads(4, submit)
+        self.assertEqual(errors, ["disco lleno"] * 4)
+
+    def test_respects_max_batch(self):
+        sizes = []
+        writer = GroupCommitWriter(lambda records: sizes.append(len(records)) or list(records),
+                                   delay=0.05, max_batch=3)
+        run_threads(6, lambda index: writer.submit(index))
+        self.assertEqual(sum(sizes), 6)
+        self.assertLessEqual(max(sizes), 3)
+
+class TestAddRecordGroupCommit(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.close_storage)
+        self.addCleanup(data_handler.set_commit_delay, DEFAULT_COMMIT_DELAY)
+
+    def _burst(self, threads=8, punches=25):
+        results = []
+        run_threads(threads, lambda index: results.extend(
+            data_handler.add_record(f"{index}-{i}", f"Persona {index}", "Entrada", lector=f"L{index}")
+            for i in range(punches)))
+        return results
+
+    def _check_backend(self, backend):
+        data_handler.set_storage_backend(backend)
+        self.addCleanup(data_handler.set_storage_backend, None)
+        data_handler.set_commit_delay(0.002)
+        keys = get_punch_keys()
+        results = self._burst()
+        self.assertTrue(all(success for success, _ in results))
+        df = data_handler.load_records()
+        self.assertEqual(len(df), 200)
+        self.assertEqual(df["Clave"].nunique(), 200)
+        # La vista alimentada por el group commit coincide con una reconstrucción
+        self.assertEqual(len(keys), 200)
+        self.assertTrue(all(key in keys for key in df["Clave"]))
+        self.assertLess(data_handler._committer.batches, 200)
+
+    def test_csv_burst(self):
+        self._check_backend("csv")
+
+    def test_sqlite_burst(self):
+        self._check_backend("sqlite")
+
+    def test_burst_goes_to_outbox(self):
+        outbox = PunchOutbox(os.path.join(self.tmpdir.name, "bandeja_salida.jsonl"))
+        self.addCleanup(outbox.close)
+        data_handler.set_outbox(outbox)
+        self.addCleanup(data_handler.set_outbox, None)
+        self._burst(threads=4, punches=10)
+        records, _ = outbox.pending(limit=100)
+        self.assertEqual(sorted(record["Clave"] for record in records),
+                         sorted(data_handler.load_records()["Clave"]))
+
+    def test_record_punch_coalesces_across_people(self):
+        data_handler.set_commit_delay(0.002)
+        get_punch_state()
+        results = []
+        run_threads(8, lambda index: results.extend(
+            record_punch(f"{index}-{i}", f"Persona {index}", lector=f"L{index}") for i in range(10)))
+        self.assertTrue(all(success for success, _, _ in results))
+        self.assertEqual(data_handler._committer.records, 80)
+        self.assertLess(data_handler._committer.batches, 80)
+
+    def test_record_punch_same_person_takes_next_action(self):
+        get_punch_state()
+        actions = []
+        run_threads(4, lambda index: actions.append(record_punch("1-9", "Ana")[2]))
+        self.assertEqual(sorted(actions), sorted(["Entrada", "Colación", "Entrada", "Salida"]))
+
+    def test_without_delay_writes_each_punch(self):
+        data_handler.set_commit_delay(None)
+        success, _ = data_handler.add_record("1-9", "Ana", "Entrada")
+        self.assertTrue(success)
+        self.assertIsNone(data_handler._committer)
+        self.assertEqual(len(data_handler.load_records()), 1)
+
+    def test_failed_write_reports_error(self):
+        with patch.object(data_handler.get_storage(), 'append_records', side_effect=OSError("disco lleno")):
+            success, message = data_handler.add_record("1-9", "Ana", "Entrada")
+        self.assertFalse(success)
+        self.assertIn("disco lleno", message)
+
+if __name__ == '__main__':
+    unittest.main()
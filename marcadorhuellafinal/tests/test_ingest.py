@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch
+import base64
+import os
+import sys
+import tempfile
+import threading
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_ingest import run_ingest
+from benchmarks.synthetic import synthetic_templates, write_dataset
+from database import data_handler
+from database.roster import get_roster
+from server.client import IngestClient
+from server.ingest import DeltaLog, ServerThread
+from sensors.template_store import get_template_store
+
+def punch(rut, lector="Kiosco 1"):
+    return {"RUT": rut, "Nombre": "", "Fecha": "2025-04-15", "Hora": "08:00:00", "Accion": "Entrada",
+            "Metodo": "Huella", "Lector": lector}
+
+class TestDeltaLog(unittest.TestCase):
+    def test_changes_and_tombstones(self):
+        log = DeltaLog()
+        self.assertTrue(log.update({"a": "1", "b": "1"}))
+        self.assertFalse(log.update({"a": "1", "b": "1"}))
+        self.assertTrue(log.update({"a": "2"}))
+        self.assertEqual(log.since(0), (["a"], ["b"]))
+        self.assertEqual(log.since(1), (["a"], ["b"]))
+        self.assertEqual(log.since(2), ([], []))
+
+class TestIngestServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        personnel = {kind: os.path.join(self.tmpdir.name, name) for kind, name in data_handler.PERSONNEL_FILES.items()}
+        for patcher in (patch.object(data_handler, 'DATA_DIR', self.tmpdir.name),
+                        patch.object(data_handler, 'PERSONNEL_FILES', personnel)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.close_storage)
+        write_dataset(self.tmpdir.name, 10, 0, seed=2)
+        self.server = ServerThread(refresh_interval=0).start()
+        self.addCleanup(self.server.stop)
+        self.client = IngestClient(port=self.server.port)
+        self.addCleanup(self.client.close)
+
+    def test_punches_from_many_clients_are_stored(self):
+        def kiosk(index):
+            client = IngestClient(port=self.server.port)
+            for i in range(20):
+                self.assertTrue(client.send_punches([punch(f"{index}-{i}", f"Kiosco {index}")])[0])
+            client.close()
+
+        threads = [threading.Thread(target=kiosk, args=(index,)) for index in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(self.client.send_punches([punch("9-9"), punch("8-8")])[0])
+        records = data_handler.load_records()
+        self.assertEqual(len(records), 102)
+        self.assertEqual(records["Lector"].value_counts()["Kiosco 3"], 20)
+
+    def test_invalid_punch_is_rejected(self):
+        success, message = self.client.send_punches([{"RUT": "1-9"}])
+        self.assertFalse(success)
+        self.assertIn("Fecha", message)
+        self.assertFalse(self.client.request("desconocida")["ok"])
+        self.assertEqual(data_handler.count_records(), 0)
+
+    def test_roster_delta(self):
+        full = self.client.roster_delta()
+        self.assertTrue(full["completo"])
+        self.assertEqual(len(full["cambios"]), 10)
+        get_roster().add_user("11111111-1", "Nueva Persona", "Docente")
+        delta = self.client.roster_delta(full["revision"], full["epoca"])
+        self.assertFalse(delta["completo"])
+        self.assertEqual(list(delta["cambios"]), ["11111111-1"])
+        # Eliminar sólo quita usuarios.xlsx; el personal se edita aparte
+        get_roster().delete_user("11111111-1")
+        docentes = data_handler.load_personnel("docente")
+        data_handler.save_personnel("docente", docentes[docentes["RUN"].astype(str) != "11111111-1"])
+        delta = self.client.roster_delta(delta["revision"], delta["epoca"])
+        self.assertEqual(delta["eliminados"], ["11111111-1"])
+        # Una época distinta (servidor reiniciado) recibe todo de nuevo
+        self.assertTrue(self.client.roster_delta(delta["revision"], "otra")["completo"])
+
+    def test_gallery_delta(self):
+        store = get_template_store()
+        self.addCleanup(store.close)
+        templates = synthetic_templates(2, seed=4)
+        store.put("1-9", templates[0])
+        first = self.client.gallery_delta()
+        self.assertEqual(base64.b64decode(first["cambios"]["1-9"]), templates[0].tobytes())
+        store.put("2-7", templates[1])
+        store.delete("1-9")
+        delta = self.client.gallery_delta(first["revision"], first["epoca"])
+        self.assertEqual(list(delta["cambios"]), ["2-7"])
+        self.assertEqual(delta["eliminados"], ["1-9"])
+
+    def test_client_reconnects(self):
+        self.assertTrue(self.client.ping())
+        self.client._socket.close()
+        self.assertTrue(self.client.ping())
+
+class TestIngestLoad(unittest.TestCase):
+    def test_sustains_thousands_per_minute(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(data_handler, 'DATA_DIR', tmp):
+            self.addCleanup(data_handler.close_storage)
+            result = run_ingest(kiosks=8, rate=0, duration=1, staff=20)
+            self.assertEqual(result["errores"], 0)
+            self.assertGreater(result["marcas_por_minuto"], 2000)
+            self.assertEqual(data_handler.count_records(), result["marcas"])
+            data_handler.close_storage()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import noisy_copy, synthetic_templates
+from sensors.matcher import FingerprintGallery, similarity
+
+class TestFingerprintGallery(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.templates = synthetic_templates(500, seed=3)
+        self.ids = [f"{i}-K" for i in range(500)]
+        self.gallery = FingerprintGallery(candidates=16)
+        self.gallery.add_many(self.ids, self.templates)
+
+    def test_identify_noisy_sample(self):
+        for target in (0, 123, 499):
+            probe = noisy_copy(self.templates[target], 0.05, self.rng)
+            user_id, score = self.gallery.identify(probe)
+            self.assertEqual(user_id, self.ids[target])
+            self.assertGreaterEqual(score, 80)
+
+    def test_unknown_sample_rejected(self):
+        unknown = synthetic_templates(1, seed=99)[0].tobytes()
+        user_id, score = self.gallery.identify(unknown)
+        self.assertIsNone(user_id)
+        self.assertLess(score, 80)
+
+    def test_remove_and_replace(self):
+        probe = noisy_copy(self.templates[10], 0.05, self.rng)
+        self.assertTrue(self.gallery.remove(self.ids[10]))
+        self.assertIsNone(self.gallery.identify(probe)[0])
+        self.assertEqual(len(self.gallery), 499)
+        self.gallery.add("nuevo", self.templates[10].tobytes())
+        self.assertEqual(self.gallery.identify(probe)[0], "nuevo")
+        # La fila movida al eliminar sigue siendo identificable
+        moved = noisy_copy(self.templates[499], 0.05, self.rng)
+        self.assertEqual(self.gallery.identify(moved)[0], self.ids[499])
+
+    def test_similarity_matches_batch_features(self):
+        template = self.templates[5].tobytes()
+        self.assertAlmostEqual(similarity(template, template), 100, places=3)
+        self.assertGreater(similarity(template, noisy_copy(self.templates[5], 0.05, self.rng)), 80)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from monitoring.metrics import LatencyHistogram, MetricsRegistry
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_quantiles_within_bucket_error(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.observe(ms / 1000)
+        for q, expected in ((0.5, 0.5), (0.95, 0.95), (0.99, 0.99)):
+            self.assertAlmostEqual(histogram.quantile(q), expected, delta=expected * 0.1)
+        self.assertEqual(histogram.summary()["count"], 1000)
+        self.assertAlmostEqual(histogram.summary()["max"], 1.0)
+
+    def test_empty_and_out_of_range(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.quantile(0.5), 0.0)
+        histogram.observe(500.0)
+        self.assertEqual(histogram.quantile(0.99), 500.0)
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsRegistry()
+        with self.assertRaises(RuntimeError):
+            with self.metrics.timer("captura"):
+                raise RuntimeError("lector desconectado")
+        self.metrics.observe("persistencia", 0.004)
+        self.metrics.increment("marcas_verificadas")
+        self.metrics.increment("marcas_verificadas")
+
+    def test_snapshot(self):
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["latencias"]["captura"]["count"], 1)
+        self.assertEqual(snapshot["contadores"]["marcas_verificadas"], 2)
+        self.assertIn("persistencia", self.metrics.format_table())
+
+    def test_prometheus_text(self):
+        text = self.metrics.to_prometheus()
+        self.assertIn('reloj_latencia_segundos_count{etapa="persistencia"} 1', text)
+        self.assertIn('reloj_latencia_segundos_bucket{etapa="persistencia",le="+Inf"} 1', text)
+        self.assertIn("reloj_marcas_verificadas_total 2", text)
+
+    def test_dump_formats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "metricas.json")
+            prom_path = os.path.join(tmp, "metricas.prom")
+            self.metrics.dump(json_path)
+            self.metrics.dump(prom_path)
+            with open(json_path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["contadores"]["marcas_verificadas"], 2)
+            with open(prom_path, encoding="utf-8") as f:
+                self.assertTrue(f.read().startswith("# HELP"))
+
+if __name__ == "__main__":
+    unittest.main()
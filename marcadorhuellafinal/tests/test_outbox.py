@@ -0,0 +1,185 @@
+import unittest
+from unittest.mock import patch
+import os
+import socket
+import sys
+import tempfile
+import time
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import data_handler
+from database.outbox import PunchOutbox
+from database.punch_keys import get_punch_keys
+from server.client import IngestClient
+from server.ingest import ServerThread
+from server.sync import OutboxSyncer, parse_address
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+class TestPunchOutbox(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "bandeja_salida.jsonl")
+
+    def test_pending_survives_reopen(self):
+        outbox = PunchOutbox(self.path)
+        for i in range(5):
+            outbox.put({"RUT": f"{i}-9", "Clave": f"k{i}"})
+        records, position = outbox.pending(limit=3)
+        self.assertEqual([record["Clave"] for record in records], ["k0", "k1", "k2"])
+        outbox.acknowledge(position, len(records))
+        outbox.close()
+
+        outbox = PunchOutbox(self.path)
+        self.addCleanup(outbox.close)
+        self.assertEqual(len(outbox), 2)
+        records, _ = outbox.pending()
+        self.assertEqual([record["Clave"] for record in records], ["k3", "k4"])
+
+    def test_compacts_when_fully_acknowledged(self):
+        outbox = PunchOutbox(self.path, compact_bytes=100)
+        self.addCleanup(outbox.close)
+        for i in range(10):
+            outbox.put({"RUT": f"{i}-9", "Clave": f"k{i}"})
+        records, position = outbox.pending()
+        outbox.acknowledge(position, len(records))
+        self.assertEqual(os.path.getsize(self.path), 0)
+        self.assertFalse(outbox.wait(0))
+        outbox.put({"RUT": "1-9", "Clave": "nueva"})
+        self.assertEqual(outbox.pending()[0], [{"RUT": "1-9", "Clave": "nueva"}])
+
+    def test_ignores_torn_last_line(self):
+        outbox = PunchOutbox(self.path)
+        outbox.put({"Clave": "k0"})
+        outbox.close()
+        with open(self.path, "ab") as f:
+            f.write(b'{"Clave": "k1"')
+        outbox = PunchOutbox(self.path)
+        self.addCleanup(outbox.close)
+        self.assertEqual(len(outbox.pending()[0]), 1)
+
+    def test_staged_punches_are_hidden_until_published(self):
+        outbox = PunchOutbox(self.path)
+        self.addCleanup(outbox.close)
+        outbox.put({"Clave": "k0"})
+        start = outbox.stage([{"Clave": "k1"}])
+        self.assertEqual([record["Clave"] for record in outbox.pending()[0]], ["k0"])
+        outbox.discard(start)
+        outbox.stage([{"Clave": "k2"}])
+        outbox.publish()
+        self.assertEqual([record["Clave"] for record in outbox.pending()[0]], ["k0", "k2"])
+        self.assertEqual(len(outbox), 2)
+
+class TestOutboxSync(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.central = os.path.join(self.tmpdir.name, "central")
+        self.kiosk = os.path.join(self.tmpdir.name, "kiosco")
+        os.makedirs(self.central)
+        os.makedirs(self.kiosk)
+        self.outbox = PunchOutbox(os.path.join(self.kiosk, "bandeja_salida.jsonl"))
+        self.addCleanup(self.outbox.close)
+        # El servidor de prueba comparte el proceso: el almacén activo es el central
+        patcher = patch.object(data_handler, 'DATA_DIR', self.central)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.close_storage)
+
+    def kiosk_punch(self, rut):
+        # Lo que hace add_record en el kiosko: la marca con su clave queda en la bandeja
+        self.outbox.put({"RUT": rut, "Nombre": "", "Fecha": "2025-04-15", "Hora": "08:00:00",
+                         "Accion": "Entrada", "Metodo": "Huella", "Lector": "Kiosco", "Clave": f"clave-{rut}"})
+
+    def test_syncs_after_server_comes_back(self):
+        port = free_port()
+        syncer = OutboxSyncer(self.outbox, IngestClient(port=port, timeout=2), batch_size=4,
+                              min_backoff=0.05, max_backoff=0.2)
+        syncer.start()
+        self.addCleanup(syncer.stop)
+        for i in range(10):
+            self.kiosk_punch(f"{i}-9")
+        self.assertTrue(wait_until(lambda: syncer.last_error is not None))
+        self.assertEqual(len(self.outbox), 10)
+
+        server = ServerThread(port=port).start()
+        self.addCleanup(server.stop)
+        self.assertTrue(wait_until(lambda: len(self.outbox) == 0))
+        self.assertTrue(syncer.online)
+        self.assertEqual(data_handler.count_records(), 10)
+
+    def test_resent_batches_are_deduplicated(self):
+        server = ServerThread().start()
+        self.addCleanup(server.stop)
+        client = IngestClient(port=server.port)
+        self.addCleanup(client.close)
+        for i in range(3):
+            self.kiosk_punch(f"{i}-9")
+        records, _ = self.outbox.pending()
+        self.assertTrue(client.send_punches(records)[0])
+        # Se perdió la confirmación y el kiosko reenvía, también dentro del mismo lote
+        success, message = client.send_punches(records + records[:1])
+        self.assertTrue(success)
+        self.assertIn("4 ya estaban guardadas", message)
+        self.assertEqual(data_handler.count_records(), 3)
+
+    def test_deduplication_survives_server_restart(self):
+        server = ServerThread().start()
+        self.kiosk_punch("1-9")
+        records, _ = self.outbox.pending()
+        self.assertTrue(IngestClient(port=server.port).send_punches(records)[0])
+        server.stop()
+        data_handler.close_storage()
+        os.remove(os.path.join(self.central, "claves_marcas.json"))
+
+        server = ServerThread().start()
+        self.addCleanup(server.stop)
+        self.assertTrue(IngestClient(port=server.port).send_punches(records)[0])
+        self.assertEqual(data_handler.count_records(), 1)
+        self.assertIn("clave-1-9", get_punch_keys())
+
+    def test_add_record_writes_outbox_first(self):
+        data_handler.set_outbox(self.outbox)
+        self.addCleanup(data_handler.set_outbox, None)
+        self.assertTrue(data_handler.add_record("1-9", "Uno", "Entrada", lector="Patio")[0])
+        records, _ = self.outbox.pending()
+        stored = data_handler.load_records()
+        self.assertEqual(records[0]["Clave"], stored.iloc[0]["Clave"])
+        self.assertEqual(len(records[0]["Clave"]), 32)
+
+    def test_failed_journal_write_discards_outbox_entry(self):
+        data_handler.set_outbox(self.outbox)
+        self.addCleanup(data_handler.set_outbox, None)
+        storage = data_handler.get_storage()
+        for delay in (None, 0):
+            data_handler.set_commit_delay(delay)
+            self.addCleanup(data_handler.set_commit_delay, data_handler.DEFAULT_COMMIT_DELAY)
+            with patch.object(storage, 'append_records', side_effect=OSError("disco lleno")):
+                success, _ = data_handler.add_record("1-9", "Uno", "Entrada")
+            self.assertFalse(success)
+            # La marca informada como fallida no debe llegar al servidor central
+            self.assertEqual(self.outbox.pending()[0], [])
+            self.assertEqual(len(self.outbox), 0)
+        self.assertTrue(data_handler.add_record("2-7", "Dos", "Entrada")[0])
+        self.assertEqual([record["RUT"] for record in self.outbox.pending()[0]], ["2-7"])
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address("10.0.0.5:9000"), ("10.0.0.5", 9000))
+        self.assertEqual(parse_address("central"), ("central", 8765))
+
+if __name__ == '__main__':
+    unittest.main()
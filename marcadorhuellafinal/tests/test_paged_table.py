@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ui.paged_table import PagedTableModel
+
+class TestPagedTableModel(unittest.TestCase):
+    def setUp(self):
+        self.model = PagedTableModel(page_size=10)
+        self.model.set_rows((f"{i}-K", (f"{i}-K", f"Usuario {i}", "Docente")) for i in range(25))
+
+    def test_pages(self):
+        self.assertEqual(self.model.page_count, 3)
+        self.model.set_page(2)
+        self.assertEqual([key for key, _ in self.model.page_rows()], ["20-K", "21-K", "22-K", "23-K", "24-K"])
+        self.assertEqual(self.model.set_page(7), 2)
+
+    def test_upsert_updates_in_place(self):
+        self.model.set_page(1)
+        self.assertFalse(self.model.upsert("12-K", ("12-K", "Otro Nombre", "Asistente")))
+        self.assertEqual(self.model.slot_of("12-K"), 2)
+        self.assertEqual(self.model.get("12-K")[1], "Otro Nombre")
+        self.assertTrue(self.model.upsert("99-K", ("99-K", "Nuevo", "Docente")))
+        self.assertIsNone(self.model.slot_of("99-K"))
+        self.assertEqual(len(self.model), 26)
+
+    def test_delete_clamps_page(self):
+        self.model.set_page(2)
+        for i in range(20, 25):
+            self.assertIsNotNone(self.model.delete(f"{i}-K"))
+        self.assertEqual(self.model.page, 1)
+        self.assertIsNone(self.model.delete("no-existe"))
+
+    def test_delete_shifts_following_rows(self):
+        self.assertEqual(self.model.delete("3-K"), 3)
+        self.model.set_page(1)
+        self.assertEqual(self.model.slot_of("11-K"), 0)
+        self.assertEqual(self.model.slot_of("20-K"), 9)
+        self.assertIsNone(self.model.slot_of("21-K"))
+        self.assertEqual(self.model.delete("24-K"), 23)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import write_dataset
+from database import data_handler
+from database.partitions import ARCHIVE_DIR, MANIFEST_FILE
+from database.query import get_record_index
+from database.rollups import get_rollups
+
+class TestPartitionedRecords(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.close_storage)
+        # 2024-03-01 en adelante: unos tres meses de marcas
+        _, _, self.punches = write_dataset(self.tmpdir.name, 20, 5000)
+        self.storage = data_handler.get_storage()
+
+    def _archive(self, before="2024-05-01"):
+        success, message = data_handler.archive_records(before)
+        self.assertTrue(success, message)
+        return message
+
+    def test_archive_moves_closed_months(self):
+        expected = int((self.punches["Fecha"] < "2024-05-01").sum())
+        self.assertEqual(self._archive(), f"{expected} registros archivados")
+        with open(os.path.join(self.tmpdir.name, ARCHIVE_DIR, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(sorted(manifest["particiones"]), ["2024-03", "2024-04"])
+        march = manifest["particiones"]["2024-03"]
+        self.assertEqual((march["desde"], march["hasta"]), ("2024-03-01", "2024-03-29"))
+        self.assertEqual(march["filas"], int(self.punches["Fecha"].str.startswith("2024-03").sum()))
+        hot = pd.read_csv(self.storage.records_path)
+        self.assertTrue((hot["Fecha"] >= "2024-05-01").all())
+        self.assertEqual(data_handler.count_records(), len(self.punches))
+        # Archivar de nuevo no hace nada
+        self.assertEqual(self._archive(), "0 registros archivados")
+
+    def test_queries_match_unpartitioned(self):
+        before = data_handler.load_records("2024-04-10", "2024-05-10")
+        self._archive()
+        after = data_handler.load_records("2024-04-10", "2024-05-10")
+        pd.testing.assert_frame_equal(after.reset_index(drop=True), before.reset_index(drop=True), check_dtype=False)
+        self.assertEqual(len(data_handler.load_records()), len(self.punches))
+        self.assertEqual(sum(len(chunk) for chunk in data_handler.iter_records(1000)), len(self.punches))
+
+    def test_range_query_prunes_partitions(self):
+        self._archive()
+        with patch.object(self.storage.archive, 'read', wraps=self.storage.archive.read) as read:
+            df = data_handler.load_records("2024-05-02", "2024-05-03")
+        read.assert_not_called()
+        self.assertEqual(set(df["Fecha"]), {"2024-05-02", "2024-05-03"})
+        with patch.object(self.storage.archive, 'read', wraps=self.storage.archive.read) as read:
+            data_handler.load_records("2024-04-02", "2024-04-03")
+        self.assertEqual([call.args[0] for call in read.call_args_list], ["2024-04"])
+
+    def test_record_index_for_range(self):
+        self._archive()
+        index = get_record_index("2024-03-04", "2024-03-05")
+        self.assertEqual(set(index.filter(None, "2024-03-04", "2024-03-05")["Fecha"]), {"2024-03-04", "2024-03-05"})
+
+    def test_views_rebuild_after_archive(self):
+        rollups = get_rollups()
+        counts = rollups.action_counts()
+        self._archive()
+        data_handler.add_record("1-9", "Ana", "Entrada")
+        counts["Entrada"] += 1
+        self.assertEqual(get_rollups().action_counts(), counts)
+        # Una instantánea anterior a la archivación no se reutiliza
+        data_handler.close_storage()
+        self.assertEqual(get_rollups().action_counts(), counts)
+
+    def test_late_punch_merges_into_partition(self):
+        self._archive()
+        late = {"RUT": "1-9", "Nombre": "Ana", "Fecha": "2024-04-30", "Hora": "08:00:00",
+                "Accion": "Entrada", "Metodo": "Huella", "Lector": "Principal", "Clave": "tarde"}
+        data_handler.add_records([late])
+        self._archive()
+        april = data_handler.load_records("2024-04-30", "2024-04-30")
+        self.assertIn("tarde", set(april["Clave"]))
+        self.assertEqual(data_handler.count_records(), len(self.punches) + 1)
+
+    def test_save_record_drops_archive(self):
+        self._archive()
+        data_handler.save_record(self.punches.head(10))
+        self.assertEqual(data_handler.count_records(), 10)
+        self.assertEqual(len(data_handler.load_records()), 10)
+
+if __name__ == '__main__':
+    unittest.main()
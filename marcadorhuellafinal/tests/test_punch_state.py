@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import patch
+import datetime
+import os
+import sys
+import tempfile
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import data_handler
+from database.punch_state import get_punch_state, record_punch
+
+class TestPunchState(unittest.TestCase):
+    backend = "csv"
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        data_handler.set_storage_backend(self.backend)
+        self.addCleanup(data_handler.set_storage_backend, None)
+        self.addCleanup(data_handler.close_storage)
+
+    def test_daily_cycle(self):
+        actions = [record_punch("1-9", "Ana")[2] for _ in range(5)]
+        self.assertEqual(actions, ["Entrada", "Colación", "Entrada", "Salida", "Entrada"])
+        self.assertEqual(get_punch_state().last("1-9")[0], "Entrada")
+        self.assertEqual(get_punch_state().next_action("2-7"), "Entrada")
+
+    def test_first_punch_of_the_day_is_entrada(self):
+        storage = data_handler.get_storage()
+        storage.append_record({"RUT": "1-9", "Nombre": "Ana", "Fecha": "2025-04-14", "Hora": "08:00:00",
+                               "Accion": "Entrada", "Metodo": "Huella"})
+        state = get_punch_state()
+        self.assertEqual(state.next_action("1-9", datetime.datetime(2025, 4, 14, 12)), "Colación")
+        self.assertEqual(state.next_action("1-9", datetime.datetime(2025, 4, 15, 8)), "Entrada")
+
+    def test_does_not_reread_journal_per_punch(self):
+        record_punch("1-9", "Ana")
+        with patch.object(data_handler.get_storage(), 'scan_records', side_effect=AssertionError("diario releído")):
+            self.assertEqual(record_punch("1-9", "Ana")[2], "Colación")
+
+    def test_rebuilds_from_journal_at_startup(self):
+        record_punch("1-9", "Ana")
+        record_punch("1-9", "Ana")
+        data_handler.close_storage()
+        os.remove(os.path.join(self.tmpdir.name, "estado_marcas.json"))
+        self.assertEqual(get_punch_state().next_action("1-9"), "Entrada")
+        self.assertEqual(record_punch("1-9", "Ana")[2], "Entrada")
+        self.assertEqual(record_punch("1-9", "Ana")[2], "Salida")
+
+class TestPunchStateSQLite(TestPunchState):
+    backend = "sqlite"
+
+if __name__ == "__main__":
+    unittest.main()
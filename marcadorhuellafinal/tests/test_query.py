@@ -0,0 +1,115 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import data_handler
+from database.query import RecordIndex, get_record_index
+
+class TestRecordIndex(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "RUT": ["17200884-4", "20140424-K", "17200884-4", "9802068-3", "20140424-K"],
+            "Nombre": ["ÁLVAREZ CUEVAS BRAULIO", "BARRIENTOS MELLADO SANDRA", "ÁLVAREZ CUEVAS BRAULIO",
+                       "CARRASCO VÁSQUEZ VÍCTOR", "BARRIENTOS MELLADO SANDRA"],
+            "Fecha": ["2025-04-15", "2025-03-01", "2025-05-02", "2025-04-20", "sin fecha"],
+            "Hora": ["08:00:00"] * 5,
+            "Accion": ["Entrada"] * 5,
+        })
+        self.index = RecordIndex(self.df)
+
+    def test_date_range_by_binary_search(self):
+        result = self.index.filter(fecha_desde="2025-04-01", fecha_hasta="30/04/2025")
+        self.assertEqual(result.index.tolist(), [0, 3])
+        self.assertEqual(self.index.filter(fecha_desde="2025-05-01").index.tolist(), [2])
+
+    def test_substring_search(self):
+        self.assertEqual(self.index.filter("cuevas").index.tolist(), [0, 2])
+        self.assertEqual(self.index.filter("0424").index.tolist(), [1, 4])
+        self.assertEqual(self.index.filter("-3").index.tolist(), [3])
+        self.assertTrue(self.index.filter("zzz").empty)
+
+    def test_combined_filters_keep_original_order(self):
+        result = self.index.filter("álvarez", fecha_desde="2025-01-01", fecha_hasta="2025-12-31")
+        self.assertEqual(result.index.tolist(), [0, 2])
+
+    def test_one_person_in_large_history(self):
+        size = 300_000
+        rng = np.random.default_rng(0)
+        ids = rng.integers(0, 500, size)
+        days = rng.integers(0, 365, size)
+        df = pd.DataFrame({
+            "RUT": [f"{i}-K" for i in ids],
+            "Nombre": [f"PERSONA {i}" for i in ids],
+            "Fecha": (np.datetime64("2024-01-01") + days).astype(str),
+            "Hora": "08:00:00",
+            "Accion": "Entrada",
+        })
+        index = RecordIndex(df)
+        start = time.perf_counter()
+        result = index.filter("PERSONA 42", "2024-03-01", "2024-06-30")
+        elapsed = time.perf_counter() - start
+        expected = df[df["Nombre"].str.contains("PERSONA 42") &
+                      (df["Fecha"] >= "2024-03-01") & (df["Fecha"] <= "2024-06-30")]
+        self.assertEqual(result.index.tolist(), expected.index.tolist())
+        self.assertLess(elapsed, 0.1)
+
+    def test_extend_matches_full_index(self):
+        index = RecordIndex(self.df.iloc[:3])
+        index.extend(self.df.iloc[3:], position=42)
+        full = RecordIndex(self.df)
+        self.assertEqual(index.position, 42)
+        self.assertEqual(index.order.tolist(), full.order.tolist())
+        self.assertEqual(index.filter("0424", "2025-01-01").index.tolist(), [1])
+        self.assertEqual(index.filter("víctor").index.tolist(), [3])
+
+class TestGetRecordIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.set_storage_backend, None)
+
+    def check_backend(self, backend):
+        data_handler.set_storage_backend(backend)
+        data_handler.add_record("17200884-4", "ÁLVAREZ CUEVAS BRAULIO", "Entrada")
+        index = get_record_index()
+        self.assertEqual(len(index), 1)
+        data_handler.add_record("9802068-3", "CARRASCO VÁSQUEZ VÍCTOR", "Entrada", lector="patio")
+        # Las marcas nuevas se agregan al mismo índice en vez de reconstruirlo
+        self.assertIs(get_record_index(), index)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.filter("víctor")["Lector"].tolist(), ["patio"])
+        data_handler.save_record(index.frame.iloc[:1])
+        self.assertEqual(len(get_record_index()), 1)
+
+    def test_punch_during_load_is_indexed_once(self):
+        data_handler.add_record("17200884-4", "ÁLVAREZ CUEVAS BRAULIO", "Entrada")
+        load_records = data_handler.load_records
+
+        def load_with_punch(*args):
+            data_handler.add_record("9802068-3", "CARRASCO VÁSQUEZ VÍCTOR", "Entrada")
+            return load_records(*args)
+
+        with patch.object(data_handler, 'load_records', load_with_punch):
+            index = get_record_index()
+        self.assertEqual(index.frame["RUT"].tolist(), ["17200884-4", "9802068-3"])
+
+    def test_csv_index_follows_journal(self):
+        self.check_backend("csv")
+
+    def test_sqlite_index_follows_journal(self):
+        self.check_backend("sqlite")
+
+if __name__ == '__main__':
+    unittest.main()
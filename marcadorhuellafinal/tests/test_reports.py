@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.reports import build_report, write_report
+
+CONFIG = {"entry_time": "08:00", "exit_time": "17:00", "break_duration": "60"}
+
+def punches(rows):
+    return pd.DataFrame(rows, columns=["RUT", "Nombre", "Fecha", "Hora", "Accion"])
+
+class TestReports(unittest.TestCase):
+    def test_daily_pairs_and_lateness(self):
+        records = punches([
+            ["1-9", "Ana", "2025-04-14", "08:10:00", "Entrada"],
+            ["1-9", "Ana", "2025-04-14", "13:00:00", "Colación"],
+            ["1-9", "Ana", "2025-04-14", "13:45:00", "Entrada"],
+            ["1-9", "Ana", "2025-04-14", "17:10:00", "Salida"],
+            ["2-7", "Beto", "2025-04-14", "07:55:00", "Entrada"],
+            ["2-7", "Beto", "2025-04-14", "16:30:00", "Salida"],
+            ["2-7", "Beto", "2025-04-15", "07:50:00", "Entrada"],
+            ["2-7", "Beto", "2025-04-15", "10:00:00", "Registro Huella"],
+        ])
+        daily, summary = build_report(records, CONFIG)
+        ana = daily[daily["RUT"] == "1-9"].iloc[0]
+        self.assertEqual(ana["primera_entrada"], pd.Timestamp("2025-04-14 08:10:00"))
+        self.assertEqual(ana["minutos_colacion"], 45)
+        self.assertEqual(ana["minutos_atraso"], 10)
+        self.assertAlmostEqual(ana["horas_trabajadas"], 8.25)
+        beto = daily[daily["RUT"] == "2-7"].set_index("Fecha")
+        self.assertEqual(beto.loc["2025-04-14", "minutos_salida_anticipada"], 30)
+        self.assertAlmostEqual(beto.loc["2025-04-14", "horas_trabajadas"], 7.58)
+        self.assertTrue(beto.loc["2025-04-15", "incompleto"])
+        self.assertEqual(summary.set_index("RUT").loc["1-9", "atrasos"], 1)
+
+    def test_contract_compliance(self):
+        rows = []
+        for day in ("2025-04-14", "2025-04-15", "2025-04-16", "2025-04-17", "2025-04-18"):
+            rows += [["1-9", "Ana", day, "08:00:00", "Entrada"], ["1-9", "Ana", day, "17:00:00", "Salida"]]
+        personnel = pd.DataFrame({"RUT": ["1-9"], "Horas de Contrato": [44]})
+        _, summary = build_report(punches(rows), {"break_duration": ""}, personnel)
+        row = summary.iloc[0]
+        self.assertEqual(row["promedio_horas_semana"], 40)
+        self.assertEqual(row["cumplimiento_pct"], round(40 / 44 * 100, 1))
+
+    def test_full_year_under_a_second(self):
+        staff, days = 150, pd.bdate_range("2024-03-01", "2024-12-20")
+        rng = np.random.default_rng(1)
+        ruts = np.repeat([f"{i}-K" for i in range(staff)], len(days) * 2)
+        fechas = np.tile(np.repeat(days.strftime("%Y-%m-%d"), 2), staff)
+        minutes = rng.integers(-10, 15, len(ruts))
+        base = np.tile([8 * 60, 17 * 60], staff * len(days)) + minutes
+        horas = [f"{m // 60:02d}:{m % 60:02d}:00" for m in base]
+        records = pd.DataFrame({"RUT": ruts, "Nombre": ruts, "Fecha": fechas, "Hora": horas,
+                                "Accion": np.tile(["Entrada", "Salida"], staff * len(days))})
+        start = time.perf_counter()
+        daily, summary = build_report(records, CONFIG)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(len(summary), staff)
+        self.assertEqual(len(daily), staff * len(days))
+
+    def test_write_text_report(self):
+        records = punches([["1-9", "Ana", "2025-04-14", "08:00:00", "Entrada"]])
+        daily, summary = build_report(records, CONFIG)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "reporte.txt")
+            write_report(path, records, daily, summary)
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+        self.assertIn("Total de registros: 1", content)
+        self.assertIn("Ana", content)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import data_handler
+from database.reports import daily_attendance, load_schedule
+from database.rollups import get_rollups
+from database.views import JournalView
+
+PUNCHES = [
+    ["1-9", "Ana", "2025-04-14", "08:10:00", "Entrada"],
+    ["2-7", "Beto", "2025-04-14", "07:55:00", "Entrada"],
+    ["1-9", "Ana", "2025-04-14", "13:00:00", "Colación"],
+    ["1-9", "Ana", "2025-04-14", "13:45:00", "Entrada"],
+    ["2-7", "Beto", "2025-04-14", "16:30:00", "Salida"],
+    ["1-9", "Ana", "2025-04-14", "17:10:00", "Salida"],
+    ["2-7", "Beto", "2025-04-15", "07:50:00", "Entrada"],
+    ["2-7", "Beto", "2025-04-15", "10:00:00", "Registro Huella"],
+]
+
+def as_record(row):
+    return dict(zip(["RUT", "Nombre", "Fecha", "Hora", "Accion"], row), Metodo="Huella")
+
+class TestDailyRollups(unittest.TestCase):
+    backend = "csv"
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        patcher = patch.object(data_handler, 'DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        data_handler.set_storage_backend(self.backend)
+        self.addCleanup(data_handler.set_storage_backend, None)
+        self.addCleanup(data_handler.close_storage)
+
+    def append(self, rows):
+        storage = data_handler.get_storage()
+        for row in rows:
+            storage.append_record(as_record(row))
+
+    def test_rebuild_matches_vectorized_report(self):
+        self.append(PUNCHES)
+        schedule = load_schedule({})
+        expected = daily_attendance(pd.DataFrame(PUNCHES, columns=["RUT", "Nombre", "Fecha", "Hora", "Accion"]),
+                                    schedule)
+        pd.testing.assert_frame_equal(get_rollups().daily(), expected, check_dtype=False)
+        ana = get_rollups().get("1-9", "14/04/2025")
+        self.assertEqual((ana["primera_entrada"], ana["minutos_colacion"], ana["marcas"]), ("08:10:00", 45, 4))
+        self.assertTrue(ana["atrasado"])
+        self.assertEqual(get_rollups().action_counts()["Registro Huella"], 1)
+
+    def test_add_record_updates_rollups_incrementally(self):
+        rollups = get_rollups()
+        data_handler.add_record("3-5", "Carla", "Entrada")
+        with patch.object(data_handler.get_storage(), 'scan_records', side_effect=AssertionError("diario releído")):
+            data_handler.add_record("3-5", "Carla", "Salida")
+        today = pd.Timestamp.now().strftime('%Y-%m-%d')
+        self.assertEqual(rollups.get("3-5", today)["marcas"], 2)
+        self.assertIsNotNone(rollups.get("3-5", today)["ultima_salida"])
+
+    def test_snapshot_replays_only_the_tail(self):
+        self.append(PUNCHES[:4])
+        get_rollups()
+        data_handler.close_storage()
+        # Marcas escritas con las vistas cerradas (p. ej. otro proceso)
+        self.append(PUNCHES[4:])
+        rollups = get_rollups()
+        self.assertEqual(len(rollups.daily()), 3)
+        self.assertEqual(rollups.get("1-9", "2025-04-14")["ultima_salida"], "17:10:00")
+
+    def test_save_record_rebuilds(self):
+        self.append(PUNCHES)
+        rollups = get_rollups()
+        data_handler.save_record(pd.DataFrame([as_record(PUNCHES[1])]))
+        self.assertIsNone(rollups.get("1-9", "2025-04-14"))
+        self.assertEqual(rollups.get("2-7", "2025-04-14")["marcas"], 1)
+
+    def test_view_missing_hooks_fails_on_creation(self):
+        class IncompleteView(JournalView):
+            def reset(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            IncompleteView(os.path.join(self.tmpdir.name, "vista.json"))
+
+class TestDailyRollupsSQLite(TestDailyRollups):
+    backend = "sqlite"
+
+if __name__ == "__main__":
+    unittest.main()
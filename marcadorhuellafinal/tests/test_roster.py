@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import data_handler
+from database.roster import RosterCache
+
+class TestRosterCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.personnel = {
+            "docente": os.path.join(self.tmpdir.name, "personal_docente.csv"),
+            "asistente": os.path.join(self.tmpdir.name, "personal_asistente.csv"),
+        }
+        pd.DataFrame({"RUN": ["1-9"], "Nombre": ["Docente Uno"], "Horas de Contrato": [44]}).to_csv(
+            self.personnel["docente"], index=False)
+        pd.DataFrame({"RUN": ["2-7"], "Nombre": ["Asistente Dos"], "Estamento": ["Paradocente"]}).to_csv(
+            self.personnel["asistente"], index=False)
+        for patcher in (patch.object(data_handler, 'DATA_DIR', self.tmpdir.name),
+                        patch.object(data_handler, 'PERSONNEL_FILES', self.personnel),
+                        patch.object(data_handler, 'load_users',
+                                     side_effect=lambda: pd.DataFrame(columns=["ID", "Nombre", "Rol", "Huella"])),
+                        patch.object(data_handler, 'save_user')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(data_handler.close_storage)
+        self.roster = RosterCache()
+
+    def test_lookups_do_not_reread_files(self):
+        self.assertTrue(self.roster.in_personnel("1-9"))
+        with patch('pandas.read_csv', side_effect=AssertionError("archivo releído")):
+            self.assertEqual(self.roster.get("2-7")["Rol"], "Paradocente")
+            self.assertFalse(self.roster.in_personnel("3-5"))
+            self.assertEqual(self.roster.get("1-9")["Horas de Contrato"], 44)
+
+    def test_external_change_invalidates(self):
+        self.assertFalse(self.roster.in_personnel("3-5"))
+        time.sleep(0.01)
+        with open(self.personnel["docente"], "a", encoding="utf-8") as f:
+            f.write("3-5,Docente Tres,30\n")
+        self.assertTrue(self.roster.in_personnel("3-5"))
+
+    def test_writes_update_index_in_place(self):
+        self.roster.add_user("4-3", "Nueva Asistente", "Asistente")
+        with patch('pandas.read_csv', side_effect=AssertionError("archivo releído")):
+            self.assertTrue(self.roster.in_personnel("4-3"))
+            self.assertTrue(self.roster.in_users("4-3"))
+            self.assertTrue(self.roster.update_user("4-3", "Asistente Renombrada"))
+            self.assertEqual(self.roster.entries()["4-3"]["Nombre"], "Nueva Asistente")
+            self.assertEqual(self.roster._users["4-3"]["Nombre"], "Asistente Renombrada")
+            self.assertTrue(self.roster.delete_user("4-3"))
+            self.assertFalse(self.roster.in_users("4-3"))
+            self.assertFalse(self.roster.delete_user("no-existe"))
+
+    def test_edit_and_delete_only_touch_users_file(self):
+        # Igual que antes de la caché: el personal sólo cambia al agregar usuarios
+        self.assertFalse(self.roster.update_user("1-9", "Docente Renombrado"))
+        self.assertFalse(self.roster.delete_user("2-7"))
+        self.assertEqual(pd.read_csv(self.personnel["asistente"])["RUN"].tolist(), ["2-7"])
+        self.assertEqual(self.roster.get("1-9")["Nombre"], "Docente Uno")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import threading
+
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import data_handler
+from database.sqlite_storage import SQLiteStorage
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.personnel = {
+            "docente": os.path.join(self.tmpdir.name, "personal_docente.csv"),
+            "asistente": os.path.join(self.tmpdir.name, "personal_asistente.csv"),
+        }
+        pd.DataFrame({"RUN": ["1-9"], "Nombre": ["Docente Uno"], "Horas de Contrato": [44]}).to_csv(
+            self.personnel["docente"], index=False)
+        with open(os.path.join(self.tmpdir.name, "registros_huellas.csv"), "w", encoding="utf-8") as f:
+            f.write("RUT,Huella,Fecha,Hora,Nombre,Accion,Metodo\n")
+            f.write("1-9,,2025-04-15,08:01:00,Docente Uno,Entrada,Huella\n")
+
+    def open_storage(self):
+        storage = SQLiteStorage(self.tmpdir.name, self.personnel)
+        self.addCleanup(storage.close)
+        return storage
+
+    def test_wal_mode_and_legacy_import(self):
+        storage = self.open_storage()
+        mode = storage.connect().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+        records = storage.load_records()
+        self.assertEqual(records.iloc[0]["Accion"], "Entrada")
+        personal = storage.load_personnel("docente")
+        self.assertEqual(list(personal.columns), ["RUN", "Nombre", "Horas de Contrato"])
+        # La importación se hace una sola vez
+        storage.close()
+        self.assertEqual(len(self.open_storage().load_records()), 1)
+
+    def test_failed_import_is_retried_whole(self):
+        with patch('database.sqlite_storage.pd.read_csv', side_effect=OSError("disco")):
+            with self.assertRaises(OSError):
+                SQLiteStorage(self.tmpdir.name, self.personnel).close()
+        import sqlite3
+        conn = sqlite3.connect(os.path.join(self.tmpdir.name, "reloj_control.db"))
+        self.addCleanup(conn.close)
+        # Ni el personal ni la versión quedaron confirmados: la importación se repite completa
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM personal").fetchone()[0], 0)
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 0)
+        storage = self.open_storage()
+        self.assertEqual(storage.connect().execute("PRAGMA user_version").fetchone()[0], 2)
+        self.assertEqual(len(storage.load_records()), 1)
+        self.assertEqual(len(storage.load_personnel("docente")), 1)
+
+    def test_adds_reader_column_to_old_database(self):
+        import sqlite3
+        conn = sqlite3.connect(os.path.join(self.tmpdir.name, "reloj_control.db"))
+        conn.execute("CREATE TABLE registros (id INTEGER PRIMARY KEY AUTOINCREMENT, RUT TEXT, Nombre TEXT, "
+                     "Fecha TEXT, Hora TEXT, Accion TEXT, Metodo TEXT)")
+        conn.execute("INSERT INTO registros (RUT, Nombre, Fecha, Hora, Accion, Metodo) "
+                     "VALUES ('1-9', 'Uno', '2025-04-15', '08:00:00', 'Entrada', 'Huella')")
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+        conn.close()
+        storage = self.open_storage()
+        storage.append_record({"RUT": "2-7", "Nombre": "Dos", "Fecha": "2025-04-15", "Hora": "08:01:00",
+                               "Accion": "Entrada", "Metodo": "Huella", "Lector": "Patio"})
+        records = storage.load_records()
+        self.assertEqual(len(records), 2)
+        self.assertTrue(pd.isna(records.iloc[0]["Lector"]))
+        self.assertEqual(records.iloc[1]["Lector"], "Patio")
+
+    def test_date_range_queries_use_indexes(self):
+        storage = self.open_storage()
+        plan = storage.connect().execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM registros WHERE RUT = ? AND Fecha >= ?", ("1-9", "2025-01-01")
+        ).fetchall()
+        self.assertIn("idx_registros_rut_fecha", str(plan))
+        storage.append_record({"RUT": "2-7", "Nombre": "Dos", "Fecha": "2025-05-02",
+                               "Hora": "08:00:00", "Accion": "Entrada", "Metodo": "Huella"})
+        df = storage.load_records(fecha_desde="01/05/2025", fecha_hasta="2025-05-31")
+        self.assertEqual(df["RUT"].tolist(), ["2-7"])
+        self.assertEqual(len(storage.load_records(rut="1-9")), 1)
+
+    def test_concurrent_reader_while_writing(self):
+        writer = self.open_storage()
+        reader = self.open_storage()
+        counts = []
+
+        def read_loop():
+            for _ in range(20):
+                counts.append(len(reader.load_records()))
+
+        thread = threading.Thread(target=read_loop)
+        thread.start()
+        for i in range(50):
+            writer.append_record({"RUT": f"{i}-K", "Nombre": "N", "Fecha": "2025-06-01",
+                                  "Hora": "08:00:00", "Accion": "Entrada", "Metodo": "Huella"})
+        thread.join()
+        self.assertEqual(len(reader.load_records()), 51)
+        self.assertEqual(counts, sorted(counts))
+
+    def test_data_handler_backend_selection(self):
+        with patch.object(data_handler, 'DATA_DIR', self.tmpdir.name), \
+             patch.object(data_handler, 'PERSONNEL_FILES', self.personnel):
+            data_handler.set_storage_backend("sqlite")
+            self.addCleanup(data_handler.set_storage_backend, None)
+            success, message = data_handler.add_record("1-9", "Docente Uno", "Salida")
+            self.assertTrue(success, message)
+            self.assertIsInstance(data_handler.get_storage(), SQLiteStorage)
+            self.assertEqual(data_handler.load_records(rut="1-9")["Accion"].tolist(), ["Entrada", "Salida"])
+
+if __name__ == '__main__':
+    unittest.main()
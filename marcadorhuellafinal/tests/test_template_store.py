@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import noisy_copy, synthetic_templates
+from database import data_handler
+from sensors import template_store
+from sensors.matcher import FingerprintGallery
+from sensors.template_store import TemplateStore
+
+class TestTemplateStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "huellas.bin")
+
+    def open_store(self):
+        store = TemplateStore(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_put_get_and_reopen(self):
+        store = self.open_store()
+        templates = synthetic_templates(3, seed=1)
+        for i, template in enumerate(templates):
+            store.put(f"{i}-K", template.tobytes())
+        store.put("corto", b"\x01\x02\x03")
+        store.close()
+
+        reopened = self.open_store()
+        self.assertEqual(len(reopened), 4)
+        self.assertEqual(reopened.get("1-K"), templates[1].tobytes())
+        self.assertEqual(reopened.get("corto"), b"\x01\x02\x03")
+        self.assertIsNone(reopened.get("otro"))
+
+    def test_delete_reuses_slot_and_grows(self):
+        store = self.open_store()
+        templates = synthetic_templates(100, seed=2)
+        for i, template in enumerate(templates):
+            store.put(str(i), template)
+        size = os.path.getsize(self.path)
+        self.assertTrue(store.delete("5"))
+        store.put("nuevo", templates[5])
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertEqual(store.ids()[5], "nuevo")
+        self.assertNotIn("5", self.open_store())
+
+    def test_matrix_is_a_view_of_the_file(self):
+        store = self.open_store()
+        store.put("1-9", bytes(range(256)) * 8)
+        matrix = store.matrix()
+        self.assertIsInstance(matrix.base, np.memmap)
+        self.assertEqual(matrix[0, 255], 255)
+
+    def test_load_gallery_identifies(self):
+        store = self.open_store()
+        templates = synthetic_templates(50, seed=3)
+        for i, template in enumerate(templates):
+            store.put(f"user{i}", template)
+        store.delete("user10")
+        store.put("corto", templates[10][:1000])
+        gallery = store.load_gallery(FingerprintGallery())
+        self.assertEqual(len(gallery), 50)
+        rng = np.random.default_rng(4)
+        self.assertEqual(gallery.identify(noisy_copy(templates[20], 0.05, rng))[0], "user20")
+        self.assertEqual(gallery.identify(templates[10][:1000])[0], "corto")
+
+    def test_imports_user_templates_once(self):
+        with patch.object(data_handler, 'DATA_DIR', self.tmpdir.name):
+            self.addCleanup(data_handler.close_storage)
+            data_handler.save_user(pd.DataFrame([{"ID": "1-9", "Nombre": "Ana", "Rol": "Docente", "Huella": "abc"},
+                                                 {"ID": "2-7", "Nombre": "Beto", "Rol": "Docente", "Huella": ""}]))
+            store = template_store.get_template_store()
+            self.addCleanup(store.close)
+            self.assertEqual(store.get("1-9"), b"abc")
+            self.assertNotIn("2-7", store)
+            template_store.enroll_template("2-7", b"xyz")
+            self.assertIn("2-7", template_store.get_gallery())
+
+    def test_import_skips_rows_that_do_not_fit(self):
+        store = self.open_store()
+        users = pd.DataFrame([{"ID": "1-9", "Huella": "x" * 3000}, {"ID": "3-5", "Huella": "huella€"},
+                              {"ID": "9" * 40, "Huella": "abc"}, {"ID": "2-7", "Huella": "abc"}])
+        with patch('sys.stderr'):
+            self.assertEqual(template_store.import_user_templates(store, users), 1)
+        self.assertEqual(store.ids(), ["2-7"])
+
+    def test_interrupted_import_is_retried(self):
+        with patch.object(data_handler, 'DATA_DIR', self.tmpdir.name):
+            self.addCleanup(data_handler.close_storage)
+            data_handler.save_user(pd.DataFrame([{"ID": "1-9", "Nombre": "Ana", "Rol": "Docente", "Huella": "abc"}]))
+            with patch.object(template_store, 'import_user_templates', side_effect=RuntimeError("corte")):
+                with self.assertRaises(RuntimeError):
+                    template_store.get_template_store()
+            self.assertFalse(os.path.exists(self.path))
+            store = template_store.get_template_store()
+            self.addCleanup(store.close)
+            self.assertEqual(store.get("1-9"), b"abc")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add project directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ui.virtual_table import TableModel
+
+COLUMNS = ["RUT", "Nombre", "Fecha", "Hora", "Accion"]
+
+class TestTableModel(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "RUT": ["3-5", "1-9", "2-7", np.nan],
+            "Nombre": ["Carla", "Ana", "Beto", "Dora"],
+            "Fecha": ["2025-04-03", "2025-04-01", "2025-04-02", "2025-04-04"],
+            "Hora": ["08:00:00"] * 4,
+            "Accion": ["Entrada", "Salida", "Entrada", "Colación"],
+            "Metodo": ["Huella"] * 4,
+        })
+        self.model = TableModel(COLUMNS)
+        self.model.set_data(self.df)
+
+    def test_window_formats_only_requested_rows(self):
+        self.assertEqual(len(self.model), 4)
+        rows = self.model.window(2, 5)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], "")
+        self.assertEqual(rows[0], ["2-7", "Beto", "2025-04-02", "08:00:00", "Entrada"])
+
+    def test_sort_toggles_direction(self):
+        self.model.sort_by("Nombre")
+        self.assertEqual([r[1] for r in self.model.window(0, 4)], ["Ana", "Beto", "Carla", "Dora"])
+        self.model.sort_by("Nombre")
+        self.assertTrue(self.model.descending)
+        self.assertEqual(self.model.row(0)[1], "Dora")
+        # Los valores faltantes quedan al final
+        self.model.sort_by("RUT")
+        self.assertEqual(self.model.row(3)[1], "Dora")
+
+    def test_large_table_is_cheap(self):
+        size = 500_000
+        df = pd.DataFrame({column: np.arange(size).astype(str) for column in COLUMNS})
+        start = time.perf_counter()
+        self.model.set_data(df)
+        window = self.model.window(size - 10, 15)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(len(window), 10)
+
+if __name__ == '__main__':
+    unittest.main()
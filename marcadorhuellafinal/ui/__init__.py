@@ -0,0 +1 @@
+# This file makes 'ui' a Python package.
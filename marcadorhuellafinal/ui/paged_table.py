@@ -0,0 +1,166 @@
+import customtkinter as ctk
+
+
+class PagedTableModel:
+    """Filas identificadas por clave, divididas en páginas de tamaño fijo."""
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+        self.page = 0
+        self._keys = []
+        # Posición de cada clave en _keys (evita buscarla con list.index)
+        self._positions = {}
+        self._values = {}
+
+    def set_rows(self, rows):
+        """Reemplaza todas las filas con pares (clave, valores)."""
+        self._keys = []
+        self._positions = {}
+        self._values = {}
+        for key, values in rows:
+            if key not in self._values:
+                self._positions[key] = len(self._keys)
+                self._keys.append(key)
+            self._values[key] = [str(value) for value in values]
+        self.page = min(self.page, self.page_count - 1)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    @property
+    def page_count(self):
+        return max((len(self._keys) + self.page_size - 1) // self.page_size, 1)
+
+    def set_page(self, page):
+        self.page = min(max(page, 0), self.page_count - 1)
+        return self.page
+
+    def page_rows(self):
+        """Pares (clave, valores) de la página actual."""
+        start = self.page * self.page_size
+        return [(key, self._values[key]) for key in self._keys[start:start + self.page_size]]
+
+    def slot_of(self, key):
+        """Fila (dentro de la página actual) donde se muestra `key`, o None."""
+        if key not in self._values:
+            return None
+        index = self._positions[key] - self.page * self.page_size
+        return index if 0 <= index < self.page_size else None
+
+    def get(self, key):
+        return self._values.get(key)
+
+    def upsert(self, key, values):
+        """Agrega o actualiza una fila; retorna True si la fila es nueva."""
+        is_new = key not in self._values
+        if is_new:
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
+        self._values[key] = [str(value) for value in values]
+        return is_new
+
+    def delete(self, key):
+        """Elimina una fila; retorna la posición global que ocupaba o None."""
+        if key not in self._values:
+            return None
+        index = self._positions.pop(key)
+        del self._keys[index]
+        del self._values[key]
+        for position in range(index, len(self._keys)):
+            self._positions[self._keys[position]] = position
+        self.page = min(self.page, self.page_count - 1)
+        return index
+
+
+class PagedTable(ctk.CTkFrame):
+    """Tabla paginada que recicla un número fijo de filas de etiquetas.
+
+    Agregar, editar o eliminar una fila sólo reconfigura las etiquetas
+    afectadas de la página visible; nunca se destruyen ni recrean widgets.
+    """
+
+    def __init__(self, master, columns, page_size=15, on_select=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.columns = list(columns)
+        self.model = PagedTableModel(page_size)
+        self.on_select = on_select
+
+        for col, column in enumerate(self.columns):
+            self.grid_columnconfigure(col, weight=1, uniform="columna")
+            ctk.CTkLabel(self, text=column, font=("Arial", 12, "bold")).grid(row=0, column=col, sticky="ew", pady=(0, 5))
+
+        self._slots = []
+        for slot in range(page_size):
+            labels = []
+            for col in range(len(self.columns)):
+                label = ctk.CTkLabel(self, text="", height=22)
+                label.grid(row=slot + 1, column=col, sticky="ew", pady=1)
+                label.bind("<Button-1>", lambda event, s=slot: self._on_click(s))
+                labels.append(label)
+            self._slots.append({"key": None, "labels": labels})
+
+        nav_frame = ctk.CTkFrame(self, fg_color="transparent")
+        nav_frame.grid(row=page_size + 1, column=0, columnspan=len(self.columns), pady=(5, 0))
+        ctk.CTkButton(nav_frame, text="◀ Anterior", width=90,
+                      command=lambda: self.show_page(self.model.page - 1)).pack(side="left", padx=5)
+        self.page_label = ctk.CTkLabel(nav_frame, text="")
+        self.page_label.pack(side="left", padx=10)
+        ctk.CTkButton(nav_frame, text="Siguiente ▶", width=90,
+                      command=lambda: self.show_page(self.model.page + 1)).pack(side="left", padx=5)
+        self.show_page(0)
+
+    def _on_click(self, slot):
+        key = self._slots[slot]["key"]
+        if key is not None and self.on_select is not None:
+            self.on_select(key, self.model.get(key))
+
+    def _fill_slot(self, slot, key, values):
+        entry = self._slots[slot]
+        entry["key"] = key
+        for label, value in zip(entry["labels"], values):
+            if label.cget("text") != value:
+                label.configure(text=value)
+
+    def _render_from(self, first_slot=0):
+        rows = self.model.page_rows()
+        empty = [""] * len(self.columns)
+        for slot in range(first_slot, len(self._slots)):
+            key, values = rows[slot] if slot < len(rows) else (None, empty)
+            self._fill_slot(slot, key, values)
+        self._update_page_label()
+
+    def _update_page_label(self):
+        self.page_label.configure(text=f"Página {self.model.page + 1} de {self.model.page_count} "
+                                       f"({len(self.model)} filas)")
+
+    def set_rows(self, rows):
+        """Carga todas las filas (pares clave, valores) y muestra la página actual."""
+        self.model.set_rows(rows)
+        self._render_from(0)
+
+    def show_page(self, page):
+        self.model.set_page(page)
+        self._render_from(0)
+
+    def upsert_row(self, key, values):
+        """Agrega o actualiza una fila tocando sólo su fila visible (si lo está)."""
+        self.model.upsert(key, values)
+        slot = self.model.slot_of(key)
+        if slot is not None:
+            self._fill_slot(slot, key, self.model.get(key))
+        self._update_page_label()
+
+    def delete_row(self, key):
+        """Elimina una fila; sólo se repintan las filas posteriores de la página visible."""
+        start = self.model.page * self.model.page_size
+        index = self.model.delete(key)
+        if index is None:
+            return
+        if self.model.page * self.model.page_size != start:
+            # La página dejó de existir: se muestra la anterior
+            self._render_from(0)
+        else:
+            self._render_from(max(index - start, 0))
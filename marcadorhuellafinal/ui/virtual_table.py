@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+import customtkinter as ctk
+
+
+def _display(value):
+    """Texto a mostrar en una celda (NaN como celda vacía)."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return str(value)
+
+
+class TableModel:
+    """Datos de una tabla virtual: columnas como arreglos y una permutación de orden.
+
+    Ordenar sólo recalcula la permutación; las filas se formatean a texto
+    únicamente cuando se muestran.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.set_data(None)
+
+    def set_data(self, df):
+        """Reemplaza los datos de la tabla."""
+        if df is None:
+            df = pd.DataFrame(columns=self.columns)
+        df = df.reset_index(drop=True)
+        self._frame = df
+        self._rows = len(df)
+        self._values = {
+            column: df[column].to_numpy() if column in df.columns else np.full(self._rows, "", dtype=object)
+            for column in self.columns
+        }
+        self._order = None
+        self.sort_column = None
+        self.descending = False
+
+    def __len__(self):
+        return self._rows
+
+    def sort_by(self, column, descending=None):
+        """Ordena por una columna; repetir la misma columna invierte el sentido."""
+        if descending is None:
+            descending = not self.descending if column == self.sort_column else False
+        series = self._frame[column] if column in self._frame.columns else pd.Series([""] * self._rows)
+        try:
+            ordered = series.sort_values(ascending=not descending, kind="stable", na_position="last")
+        except TypeError:
+            # Columnas con tipos mezclados: se ordenan como texto
+            ordered = series.astype(str).sort_values(ascending=not descending, kind="stable")
+        self._order = ordered.index.to_numpy()
+        self.sort_column = column
+        self.descending = descending
+
+    def position(self, index):
+        """Posición en los datos de la fila visible número `index`."""
+        return int(self._order[index]) if self._order is not None else index
+
+    def row(self, index):
+        """Valores (como texto) de la fila visible número `index`."""
+        position = self.position(index)
+        return [_display(self._values[column][position]) for column in self.columns]
+
+    def window(self, offset, count):
+        """Filas visibles desde `offset` (como máximo `count`)."""
+        end = min(offset + count, self._rows)
+        return [self.row(index) for index in range(max(offset, 0), end)]
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Tabla con desplazamiento virtual: sólo existen widgets para las filas visibles.
+
+    Las etiquetas se crean una vez y se reutilizan al desplazarse u ordenar,
+    por lo que la memoria y el tiempo de apertura no dependen del número de
+    registros.
+    """
+
+    def __init__(self, master, columns, visible_rows=15, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = TableModel(columns)
+        self.visible_rows = visible_rows
+        self.offset = 0
+        self._texts = [[None] * len(columns) for _ in range(visible_rows)]
+
+        self._headers = []
+        for col, column in enumerate(columns):
+            self.grid_columnconfigure(col, weight=1, uniform="columna")
+            header = ctk.CTkButton(self, text=column, font=("Arial", 12, "bold"), fg_color="transparent",
+                                   text_color=("#333333", "#dddddd"), hover_color=("#dddddd", "#444444"),
+                                   height=26, command=lambda c=column: self.sort_by(c))
+            header.grid(row=0, column=col, sticky="ew", pady=(0, 5))
+            self._headers.append(header)
+
+        self._cells = []
+        for row in range(visible_rows):
+            labels = []
+            for col in range(len(columns)):
+                label = ctk.CTkLabel(self, text="", height=22, anchor="center")
+                label.grid(row=row + 1, column=col, sticky="ew", pady=1)
+                self._bind_wheel(label)
+                labels.append(label)
+            self._cells.append(labels)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=len(columns), rowspan=visible_rows, sticky="ns")
+        self._bind_wheel(self)
+        self.refresh()
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        widget.bind("<Button-5>", lambda event: self.scroll_by(3))
+
+    def _on_mousewheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.model)))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def set_data(self, df):
+        """Reemplaza los datos mostrados y vuelve al inicio."""
+        self.model.set_data(df)
+        self.offset = 0
+        self._update_headers()
+        self.refresh()
+
+    def sort_by(self, column):
+        """Ordena por una columna sin recrear widgets."""
+        self.model.sort_by(column)
+        self.offset = 0
+        self._update_headers()
+        self.refresh()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, offset):
+        """Desplaza la ventana visible para que comience en `offset`."""
+        max_offset = max(len(self.model) - self.visible_rows, 0)
+        offset = min(max(offset, 0), max_offset)
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def _update_headers(self):
+        for header, column in zip(self._headers, self.model.columns):
+            arrow = ""
+            if column == self.model.sort_column:
+                arrow = " ▼" if self.model.descending else " ▲"
+            header.configure(text=column + arrow)
+
+    def refresh(self):
+        """Vuelve a pintar las filas visibles reutilizando las etiquetas existentes."""
+        rows = self.model.window(self.offset, self.visible_rows)
+        empty = [""] * len(self.model.columns)
+        for index, labels in enumerate(self._cells):
+            values = rows[index] if index < len(rows) else empty
+            for col, label in enumerate(labels):
+                # Sólo se reconfiguran las celdas cuyo texto cambió
+                if self._texts[index][col] != values[col]:
+                    label.configure(text=values[col])
+                    self._texts[index][col] = values[col]
+        total = len(self.model)
+        if total:
+            self.scrollbar.set(self.offset / total, min(self.offset + self.visible_rows, total) / total)
+        else:
+            self.scrollbar.set(0, 1)